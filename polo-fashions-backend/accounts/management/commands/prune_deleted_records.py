@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.models import DeletedRecord
+from polo_fashions.sync import TOMBSTONE_RETENTION
+
+
+class Command(BaseCommand):
+    help = 'Delete sync tombstones older than the delta-sync retention window'
+
+    def handle(self, *args, **kwargs):
+        cutoff = timezone.now() - TOMBSTONE_RETENTION
+        deleted, _ = DeletedRecord.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f'✅ Pruned {deleted} tombstones older than {cutoff:%Y-%m-%d}'))
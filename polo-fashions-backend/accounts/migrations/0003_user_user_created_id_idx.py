@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-18 16:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_alter_user_measurement_photo"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="user_created_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 6.0 on 2026-10-18 16:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0003_user_user_created_id_idx"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeletedRecord",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model", models.CharField(max_length=50)),
+                ("object_id", models.BigIntegerField()),
+                ("owner_id", models.BigIntegerField(blank=True, null=True)),
+                ("deleted_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(fields=["updated_at", "id"], name="user_updated_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="deletedrecord",
+            index=models.Index(
+                fields=["model", "deleted_at"], name="deleted_model_at_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="deletedrecord",
+            index=models.Index(
+                fields=["model", "owner_id", "deleted_at"], name="deleted_owner_at_idx"
+            ),
+        ),
+    ]
@@ -30,4 +30,31 @@ class User(AbstractUser):
         return self.email
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='user_created_id_idx'),
+            models.Index(fields=['updated_at', 'id'], name='user_updated_id_idx'),
+        ]
+
+
+class DeletedRecord(models.Model):
+    """
+    Tombstone for a deleted order, booking or user.
+
+    Lets ``?changed_since=`` delta syncs tell clients which rows to drop.
+    ``owner_id`` is the user the row belonged to, so customers only see
+    their own tombstones. Written by accounts.signals.
+    """
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    owner_id = models.BigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} deleted {self.deleted_at}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'deleted_at'], name='deleted_model_at_idx'),
+            models.Index(fields=['model', 'owner_id', 'deleted_at'], name='deleted_owner_at_idx'),
+        ]
\ No newline at end of file
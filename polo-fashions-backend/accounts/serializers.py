@@ -1,20 +1,26 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from polo_fashions.images import image_url, image_variants
 
 User = get_user_model()
 
 class UserSerializer(serializers.ModelSerializer):
     measurement_photo = serializers.SerializerMethodField()
+    measurement_photo_variants = serializers.SerializerMethodField()
     
     def get_measurement_photo(self, obj):
         """Return full Cloudinary URL for measurement photo"""
         if obj.measurement_photo:
             # ✅ This should return the full URL
-            url = obj.measurement_photo.url
+            url = image_url(obj.measurement_photo)
             print(f"📸 Measurement photo URL for {obj.username}: {url}")
             return url
         return None
+
+    def get_measurement_photo_variants(self, obj):
+        """Resized copies for srcset, from settings.IMAGE_VARIANTS"""
+        return image_variants(obj.measurement_photo)
     
     class Meta:
         model = User
@@ -28,6 +34,7 @@ class UserSerializer(serializers.ModelSerializer):
             'role',
             'measurement_status',
             'measurement_photo',
+            'measurement_photo_variants',
             'created_at',
             'is_staff',
             'is_superuser',
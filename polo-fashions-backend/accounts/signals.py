@@ -0,0 +1,33 @@
+# accounts/signals.py
+from django.db.models.signals import post_delete, post_save
+from polo_fashions.media_pipeline import optimize_on_commit
+
+from .models import DeletedRecord, User
+
+# label -> attribute holding the owning user's id
+TRACKED_DELETES = {
+    'orders.order': 'user_id',
+    'bookings.booking': 'user_id',
+    'accounts.user': 'id',
+}
+
+
+def record_tombstone(sender, instance, **kwargs):
+    label = sender._meta.label_lower
+    DeletedRecord.objects.create(
+        model=label,
+        object_id=instance.pk,
+        owner_id=getattr(instance, TRACKED_DELETES[label]),
+    )
+
+
+for _label in TRACKED_DELETES:
+    post_delete.connect(record_tombstone, sender=_label, dispatch_uid=f'tombstone:{_label}')
+
+
+def optimize_measurement_photo(sender, instance, raw=False, **kwargs):
+    if not raw:
+        optimize_on_commit(instance, 'measurement_photo')
+
+
+post_save.connect(optimize_measurement_photo, sender=User, dispatch_uid='optimize:measurement_photo')
@@ -9,6 +9,9 @@ from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model
 from rest_framework.parsers import MultiPartParser, FormParser
 
+from polo_fashions.images import image_url
+from polo_fashions.pagination import CreatedAtCursorPagination
+from polo_fashions.sync import DeltaSyncMixin
 from .serializers import UserSerializer, RegisterSerializer, UpdateMeasurementSerializer
 
 User = get_user_model()
@@ -20,10 +23,12 @@ class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(DeltaSyncMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+    sync_model_label = 'accounts.user'
 
     def get_queryset(self):
         user = self.request.user
@@ -46,7 +51,7 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response(
                 {
                 "success": True,
-                "measurement_photo": user.measurement_photo.url if user.measurement_photo else None,
+                "measurement_photo": image_url(user.measurement_photo),
                 "measurement_status": user.measurement_status,
                 }
             )
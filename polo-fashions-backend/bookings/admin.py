@@ -1,8 +1,20 @@
 from django.contrib import admin
-from .models import Booking
+from .models import Booking, BookingSlot
 
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
     list_display = ['customer_name', 'email', 'date', 'time', 'status', 'created_at']
+    raw_id_fields = ['slot']
     list_filter = ['status', 'date']
-    search_fields = ['customer_name', 'email', 'phone']
\ No newline at end of file
+    search_fields = ['customer_name', 'email', 'phone']
+
+
+@admin.register(BookingSlot)
+class BookingSlotAdmin(admin.ModelAdmin):
+    # Add a row to open an extra slot, or tick "closed" to stop new bookings
+    # (capacity can't go below the seats already booked); "booked" is
+    # maintained by bookings/slots.py
+    list_display = ['date', 'start_time', 'capacity', 'booked', 'closed']
+    list_filter = ['closed', 'date']
+    date_hierarchy = 'date'
+    readonly_fields = ['booked']
@@ -0,0 +1,103 @@
+# Generated by Django 6.0 on 2026-10-18 16:58
+
+from datetime import datetime
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Frozen copies of bookings.slots / the BOOKING_SLOTS default as they were
+# when this migration was written
+DEFAULT_CAPACITY = 1
+TIME_FORMATS = ("%H:%M", "%I:%M %p", "%I:%M%p", "%I %p")
+
+
+def parse_time(value):
+    value = str(value).strip().upper()
+    for time_format in TIME_FORMATS:
+        try:
+            return datetime.strptime(value, time_format).time()
+        except ValueError:
+            continue
+    return None
+
+
+def assign_slots(apps, schema_editor):
+    """Give every open booking the seat it already occupies."""
+    Booking = apps.get_model("bookings", "Booking")
+    BookingSlot = apps.get_model("bookings", "BookingSlot")
+    seats = {}
+    for booking in Booking.objects.exclude(status="cancelled").order_by("id"):
+        start_time = parse_time(booking.time)
+        if start_time is None:
+            continue
+        holders = seats.setdefault((booking.date, start_time), {})
+        # unique_booking_user_slot: a repeat booking keeps no seat
+        holders.setdefault(booking.user_id, booking.id)
+    for (date, start_time), holders in seats.items():
+        slot = BookingSlot.objects.create(
+            date=date,
+            start_time=start_time,
+            capacity=max(DEFAULT_CAPACITY, len(holders)),
+            booked=len(holders),
+        )
+        Booking.objects.filter(id__in=holders.values()).update(slot=slot)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0003_booking_booking_updated_id_idx_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookingSlot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("start_time", models.TimeField()),
+                ("capacity", models.PositiveSmallIntegerField(default=1)),
+                ("booked", models.PositiveSmallIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["date", "start_time"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("date", "start_time"), name="unique_booking_slot"
+                    ),
+                    models.CheckConstraint(
+                        condition=models.Q(("booked__lte", models.F("capacity"))),
+                        name="booking_slot_within_capacity",
+                    ),
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name="booking",
+            name="slot",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="bookings",
+                to="bookings.bookingslot",
+            ),
+        ),
+        migrations.RunPython(assign_slots, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="booking",
+            constraint=models.UniqueConstraint(
+                fields=("user", "slot"), name="unique_booking_user_slot"
+            ),
+        ),
+    ]
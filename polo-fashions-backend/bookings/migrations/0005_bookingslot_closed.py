@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-18 17:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0004_booking_slots"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bookingslot",
+            name="closed",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterConstraint(
+            model_name="bookingslot",
+            name="booking_slot_within_capacity",
+            constraint=models.CheckConstraint(
+                condition=models.Q(("booked__lte", models.F("capacity"))),
+                name="booking_slot_within_capacity",
+                violation_error_message="Capacity cannot go below the seats already booked; close the slot instead.",
+            ),
+        ),
+    ]
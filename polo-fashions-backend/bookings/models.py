@@ -1,6 +1,37 @@
 from django.db import models
 from django.conf import settings
 
+class BookingSlot(models.Model):
+    """
+    One appointment slot and how many of its seats are taken.
+
+    Rows are created on first booking (or by an admin changing a slot's
+    capacity or closing it); a slot without a row is free with the default capacity from
+    ``settings.BOOKING_SLOTS``. ``booked`` only moves through the
+    conditional updates in bookings/slots.py, and the CHECK constraint
+    keeps it within ``capacity`` whatever the caller does.
+    """
+    date = models.DateField()
+    start_time = models.TimeField()
+    capacity = models.PositiveSmallIntegerField(default=1)
+    booked = models.PositiveSmallIntegerField(default=0)
+    # Closed slots take no new bookings; the ones already made are kept
+    closed = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.date} {self.start_time:%H:%M} ({self.booked}/{self.capacity})"
+
+    class Meta:
+        ordering = ['date', 'start_time']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'start_time'], name='unique_booking_slot'),
+            models.CheckConstraint(
+                condition=models.Q(booked__lte=models.F('capacity')), name='booking_slot_within_capacity',
+                violation_error_message='Capacity cannot go below the seats already booked; close the slot instead.',
+            ),
+        ]
+
+
 class Booking(models.Model):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
@@ -15,6 +46,10 @@ class Booking(models.Model):
     phone = models.CharField(max_length=15)
     date = models.DateField()
     time = models.CharField(max_length=20)
+    # The seat this booking holds (None once cancelled, and for old bookings)
+    slot = models.ForeignKey(
+        BookingSlot, on_delete=models.PROTECT, null=True, blank=True, related_name='bookings'
+    )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -24,4 +59,14 @@ class Booking(models.Model):
         return f"{self.customer_name} - {self.date} {self.time}"
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='booking_created_id_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='booking_user_created_id_idx'),
+            models.Index(fields=['updated_at', 'id'], name='booking_updated_id_idx'),
+            models.Index(fields=['user', 'updated_at', 'id'], name='booking_user_updated_id_idx'),
+        ]
+        constraints = [
+            # A customer holds at most one seat in a slot
+            models.UniqueConstraint(fields=['user', 'slot'], name='unique_booking_user_slot'),
+        ]
\ No newline at end of file
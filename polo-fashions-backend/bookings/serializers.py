@@ -1,5 +1,7 @@
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from .models import Booking
+from .slots import SlotUnavailable, free_seat, parse_time, take_seat, time_label
 
 class BookingSerializer(serializers.ModelSerializer):
     user = serializers.IntegerField(source='user.id', read_only=True)
@@ -8,8 +10,25 @@ class BookingSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Booking
-        fields = ['id', 'user', 'customer_name', 'email', 'user_name', 'phone', 'date', 'time', 'status', 'notes', 'created_at', 'updated_at']  # ✅ Added 'user_name'
-        read_only_fields = ['id', 'user', 'customer_name', 'email', 'user_name', 'created_at', 'updated_at']
+        fields = ['id', 'user', 'customer_name', 'email', 'user_name', 'phone', 'date', 'time', 'slot', 'status', 'notes', 'created_at', 'updated_at']  # ✅ Added 'user_name'
+        read_only_fields = ['id', 'user', 'customer_name', 'email', 'user_name', 'slot', 'created_at', 'updated_at']
+
+    def validate_time(self, value):
+        start_time = parse_time(value)
+        if start_time is None:
+            raise serializers.ValidationError('Use a time like "14:00" or "2:00 PM".')
+        # ✅ Stored the way the booking form shows it
+        return time_label(start_time)
+
+    def _save_holding_seat(self, save, date, time):
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            # unique_booking_user_slot
+            raise SlotUnavailable(
+                date, parse_time(time), "You already have an appointment in this slot"
+            )
 
     def create(self, validated_data):
         request = self.context.get('request')
@@ -17,4 +36,30 @@ class BookingSerializer(serializers.ModelSerializer):
             validated_data['user'] = request.user
             validated_data['customer_name'] = request.user.get_full_name() or request.user.username
             validated_data['email'] = request.user.email
-        return super().create(validated_data)
\ No newline at end of file
+
+        date, time = validated_data['date'], validated_data['time']
+
+        def save():
+            # ✅ Seat first: a full slot rejects the booking before it is written
+            validated_data['slot'] = take_seat(date, parse_time(time))
+            return super(BookingSerializer, self).create(validated_data)
+
+        return self._save_holding_seat(save, date, time)
+
+    def update(self, instance, validated_data):
+        date = validated_data.get('date', instance.date)
+        time = validated_data.get('time', instance.time)
+        status = validated_data.get('status', instance.status)
+        moved = (date, time) != (instance.date, instance.time)
+        cancelled = status == 'cancelled' and instance.status != 'cancelled'
+        reopened = instance.status == 'cancelled' and status != 'cancelled'
+
+        def save():
+            if instance.slot_id and (moved or cancelled):
+                free_seat(instance.slot_id)
+                validated_data['slot'] = None
+            if status != 'cancelled' and (moved or reopened):
+                validated_data['slot'] = take_seat(date, parse_time(time))
+            return super(BookingSerializer, self).update(instance, validated_data)
+
+        return self._save_holding_seat(save, date, time)
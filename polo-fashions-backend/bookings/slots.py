@@ -0,0 +1,146 @@
+# bookings/slots.py
+"""
+Appointment slots with a capacity.
+
+The schedule (start times, default seats per slot, closed weekdays) is
+``settings.BOOKING_SLOTS``. A ``BookingSlot`` row holds the seats taken in
+one slot. Taking a seat is one conditional UPDATE:
+
+    UPDATE bookings_bookingslot SET booked = booked + 1
+    WHERE id = %s AND booked < capacity AND NOT closed
+
+so two customers racing for the last seat cannot both get it (the CHECK
+constraint ``booked <= capacity`` backs this up). Rows are created the
+first time a slot is booked. Availability for a date range reads the slot
+rows in the range in one query and fills the rest in from the schedule.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import BookingSlot
+
+# Longest range the availability endpoint answers for
+MAX_RANGE_DAYS = 62
+
+# Accepted spellings of a start time ("14:00", "2:00 PM")
+TIME_FORMATS = ('%H:%M', '%I:%M %p', '%I:%M%p', '%I %p')
+
+
+class SlotUnavailable(Exception):
+    """Raised when a slot has no free seat (or is not offered at all)."""
+
+    def __init__(self, date, start_time, reason=None):
+        self.date = date
+        self.start_time = start_time
+        super().__init__(reason or f"The {time_label(start_time)} slot on {date} is fully booked")
+
+
+def parse_time(value):
+    """The start time written as ``14:00`` or ``2:00 PM``, or None."""
+    value = str(value).strip().upper()
+    for time_format in TIME_FORMATS:
+        try:
+            return datetime.strptime(value, time_format).time()
+        except ValueError:
+            continue
+    return None
+
+
+def time_label(start_time):
+    """``2:00 PM``, the way the booking form shows (and stores) slot times."""
+    return start_time.strftime('%I:%M %p').lstrip('0')
+
+
+def schedule_times():
+    return sorted(parse_time(value) for value in settings.BOOKING_SLOTS['times'])
+
+
+def is_open(date):
+    return date.weekday() not in settings.BOOKING_SLOTS.get('closed_weekdays', ())
+
+
+def default_capacity():
+    return settings.BOOKING_SLOTS['capacity']
+
+
+def _slot_row(date, start_time):
+    """The slot's row, created from the schedule on first use."""
+    slot = BookingSlot.objects.filter(date=date, start_time=start_time).first()
+    if slot is not None:
+        return slot
+    if not is_open(date) or start_time not in schedule_times():
+        raise SlotUnavailable(
+            date, start_time, f"No appointments at {time_label(start_time)} on {date}"
+        )
+    try:
+        with transaction.atomic():
+            return BookingSlot.objects.create(
+                date=date, start_time=start_time, capacity=default_capacity(),
+            )
+    except IntegrityError:
+        # Another booking created it first
+        return BookingSlot.objects.get(date=date, start_time=start_time)
+
+
+def take_seat(date, start_time):
+    """
+    Take one seat in a slot and return the slot. Call inside the booking's
+    transaction; raises SlotUnavailable when it is full or not offered.
+    """
+    if date < timezone.localdate():
+        raise SlotUnavailable(date, start_time, "Appointments cannot be booked in the past")
+    slot = _slot_row(date, start_time)
+    taken = BookingSlot.objects.filter(pk=slot.pk, booked__lt=F('capacity'), closed=False).update(
+        booked=F('booked') + 1
+    )
+    if not taken:
+        if slot.closed:
+            raise SlotUnavailable(
+                date, start_time, f"The {time_label(start_time)} slot on {date} is closed"
+            )
+        raise SlotUnavailable(date, start_time)
+    return slot
+
+
+def free_seat(slot_id):
+    BookingSlot.objects.filter(pk=slot_id, booked__gt=0).update(booked=F('booked') - 1)
+
+
+def slot_availability(start, end):
+    """
+    ``[{"date", "slots": [{"time", "label", "capacity", "booked", "free"}]}]``
+    for every open day in [start, end], in one query. Past slots are left out.
+    """
+    now = timezone.localtime()
+    rows = defaultdict(dict)
+    for slot in BookingSlot.objects.filter(date__gte=start, date__lte=end):
+        rows[slot.date][slot.start_time] = slot
+    times = schedule_times()
+    days = []
+    for offset in range((end - start).days + 1):
+        date = start + timedelta(days=offset)
+        # Scheduled times, plus any extra slot an admin opened that day
+        starts = set(times) if is_open(date) else set()
+        starts.update(rows[date])
+        slots = []
+        for start_time in sorted(starts):
+            if (date, start_time) <= (now.date(), now.time()):
+                continue
+            slot = rows[date].get(start_time)
+            capacity = slot.capacity if slot else default_capacity()
+            booked = slot.booked if slot else 0
+            slots.append({
+                'time': start_time.strftime('%H:%M'),
+                'label': time_label(start_time),
+                'capacity': capacity,
+                'booked': booked,
+                'free': 0 if slot and slot.closed else max(capacity - booked, 0),
+            })
+        if slots:
+            days.append({'date': date, 'slots': slots})
+    return days
@@ -1,3 +1,207 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Booking, BookingSlot
+from .serializers import BookingSerializer
+from .slots import SlotUnavailable
+
+User = get_user_model()
+
+TEST_SLOTS = {'times': ['10:00', '14:00'], 'capacity': 2, 'closed_weekdays': []}
+
+
+class BookingTestMixin:
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='pass', role='admin'
+        )
+        cls.customers = [
+            User.objects.create_user(
+                username=f'customer{i}', email=f'customer{i}@example.com', password='pass',
+            )
+            for i in range(3)
+        ]
+        cls.day = timezone.localdate() + timedelta(days=3)
+
+
+@override_settings(BOOKING_SLOTS=TEST_SLOTS)
+class BookingSlotCapacityTests(BookingTestMixin, TestCase):
+    def book(self, user, time='2:00 PM', day=None):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post('/api/bookings/', {
+            'phone': '9876543210', 'date': (day or self.day).isoformat(), 'time': time,
+        })
+
+    def test_slot_fills_up(self):
+        first, second = self.customers[:2]
+        response = self.book(first)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['time'], '2:00 PM')
+        self.assertEqual(self.book(second, time='14:00').status_code, 201)
+
+        full = self.book(self.customers[2])
+        self.assertEqual(full.status_code, 409)
+        self.assertIn('fully booked', full.data['error'])
+        slot = BookingSlot.objects.get()
+        self.assertEqual((slot.capacity, slot.booked), (2, 2))
+        self.assertEqual(Booking.objects.count(), 2)
+
+    def test_unknown_times_and_past_dates_are_rejected(self):
+        customer = self.customers[0]
+        self.assertEqual(self.book(customer, time='teatime').status_code, 400)
+        self.assertEqual(self.book(customer, time='9:00 AM').status_code, 409)
+        past = timezone.localdate() - timedelta(days=1)
+        self.assertEqual(self.book(customer, day=past).status_code, 409)
+
+    def test_one_seat_per_customer_and_slot(self):
+        customer = self.customers[0]
+        self.assertEqual(self.book(customer).status_code, 201)
+        response = self.book(customer)
+        self.assertEqual(response.status_code, 409)
+        # The failed attempt gave its seat back
+        self.assertEqual(BookingSlot.objects.get().booked, 1)
+
+    def test_cancel_move_and_delete_free_the_seat(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        booking_id = self.book(self.customers[0]).data['id']
+        slot = BookingSlot.objects.get()
+
+        client.patch(f'/api/bookings/{booking_id}/', {'status': 'cancelled'})
+        slot.refresh_from_db()
+        self.assertEqual(slot.booked, 0)
+        self.assertIsNone(Booking.objects.get(pk=booking_id).slot)
+
+        client.patch(f'/api/bookings/{booking_id}/', {'status': 'confirmed'})
+        slot.refresh_from_db()
+        self.assertEqual(slot.booked, 1)
+
+        client.patch(f'/api/bookings/{booking_id}/', {'time': '10:00'})
+        morning = BookingSlot.objects.get(start_time='10:00')
+        slot.refresh_from_db()
+        self.assertEqual((slot.booked, morning.booked), (0, 1))
+
+        client.delete(f'/api/bookings/{booking_id}/')
+        morning.refresh_from_db()
+        self.assertEqual(morning.booked, 0)
+
+    def test_database_keeps_booked_within_capacity(self):
+        self.book(self.customers[0])
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            BookingSlot.objects.update(booked=F('capacity') + 1)
+
+    def test_closed_slots_keep_their_bookings_and_take_no_more(self):
+        self.book(self.customers[0])
+        slot = BookingSlot.objects.get()
+        slot.capacity = 0
+        with self.assertRaises(ValidationError):
+            slot.full_clean()  # what the admin form runs
+
+        BookingSlot.objects.filter(pk=slot.pk).update(closed=True)
+        response = self.book(self.customers[1])
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('closed', response.data['error'])
+        slot.refresh_from_db()
+        self.assertEqual(slot.booked, 1)
+        days = APIClient().get('/api/bookings/availability/', {
+            'from': self.day.isoformat(), 'to': self.day.isoformat(),
+        }).data['days']
+        self.assertEqual(days[0]['slots'][1]['free'], 0)
+
+    def test_availability_for_a_range_is_one_query(self):
+        self.book(self.customers[0])
+        self.book(self.customers[1])
+        BookingSlot.objects.create(date=self.day, start_time='10:00', capacity=0)
+        client = APIClient()
+        start, end = self.day - timedelta(days=1), self.day + timedelta(days=13)
+        with self.assertNumQueries(1):
+            response = client.get('/api/bookings/availability/', {
+                'from': start.isoformat(), 'to': end.isoformat(),
+            })
+        self.assertEqual(response.status_code, 200)
+        days = {day['date']: day['slots'] for day in response.data['days']}
+        self.assertEqual(len(days), 15)
+        self.assertEqual(days[self.day], [
+            {'time': '10:00', 'label': '10:00 AM', 'capacity': 0, 'booked': 0, 'free': 0},
+            {'time': '14:00', 'label': '2:00 PM', 'capacity': 2, 'booked': 2, 'free': 0},
+        ])
+        self.assertEqual(days[end][1]['free'], 2)
+
+    @override_settings(BOOKING_SLOTS={**TEST_SLOTS, 'closed_weekdays': list(range(7))})
+    def test_closed_days_have_no_slots(self):
+        client = APIClient()
+        response = client.get('/api/bookings/availability/', {
+            'from': self.day.isoformat(), 'to': self.day.isoformat(),
+        })
+        self.assertEqual(response.data['days'], [])
+        self.assertEqual(self.book(self.customers[0]).status_code, 409)
+
+    def test_availability_validates_the_range(self):
+        client = APIClient()
+        for params in ({'from': '2026-01-05', 'to': '2026-01-01'},
+                       {'from': '2026-02-30', 'to': '2026-03-01'},
+                       {'from': '2026-01-01', 'to': '2026-06-01'},
+                       {}):
+            with self.subTest(params=params):
+                response = client.get('/api/bookings/availability/', params)
+                self.assertEqual(response.status_code, 400)
+
+
+@override_settings(BOOKING_SLOTS=TEST_SLOTS)
+class ConcurrentBookingStressTests(BookingTestMixin, TransactionTestCase):
+    """Customers race for the same slot; it never takes more than its capacity."""
+    THREADS = 6
+
+    def setUp(self):
+        self.setUpTestData()
+        self.customers += [
+            User.objects.create_user(username=f'racer{i}', password='pass')
+            for i in range(self.THREADS - len(self.customers))
+        ]
+
+    def test_capacity_holds_under_contention(self):
+        barrier = threading.Barrier(self.THREADS)
+        outcomes = []
+
+        def worker(user):
+            barrier.wait()
+            try:
+                while True:
+                    serializer = BookingSerializer(
+                        data={'phone': '1', 'date': self.day.isoformat(), 'time': '10:00'},
+                        context={'request': SimpleNamespace(user=user)},
+                    )
+                    serializer.is_valid(raise_exception=True)
+                    try:
+                        serializer.save(user=user)
+                        outcomes.append('booked')
+                    except SlotUnavailable:
+                        outcomes.append('full')
+                    except OperationalError:
+                        # SQLite reports a busy database instead of waiting; try again
+                        continue
+                    return
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(user,)) for user in self.customers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(outcomes.count('booked'), TEST_SLOTS['capacity'])
+        self.assertEqual(outcomes.count('full'), self.THREADS - TEST_SLOTS['capacity'])
+        self.assertEqual(BookingSlot.objects.get().booked, TEST_SLOTS['capacity'])
+        self.assertEqual(Booking.objects.count(), TEST_SLOTS['capacity'])
@@ -1,16 +1,25 @@
 from django.shortcuts import render
 
 # Create your views here.
-from rest_framework import viewsets
-from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
+from django.utils.dateparse import parse_date
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from polo_fashions.pagination import CreatedAtCursorPagination
+from polo_fashions.sync import DeltaSyncMixin
 from .models import Booking
 from .serializers import BookingSerializer
+from .slots import MAX_RANGE_DAYS, SlotUnavailable, free_seat, slot_availability
 
 
-class BookingViewSet(viewsets.ModelViewSet):
+class BookingViewSet(DeltaSyncMixin, viewsets.ModelViewSet):
     queryset = Booking.objects.all()
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+    sync_model_label = 'bookings.booking'
 
     def get_queryset(self):
         user = self.request.user
@@ -18,5 +27,47 @@ class BookingViewSet(viewsets.ModelViewSet):
             return Booking.objects.all()
         return Booking.objects.filter(user=user)
 
+    @action(detail=False, methods=["get"], permission_classes=[AllowAny])
+    def availability(self, request):
+        """
+        Free seats per slot for every day from ``?from=`` to ``?to=``
+        (inclusive ISO dates, at most MAX_RANGE_DAYS days apart).
+        """
+        try:
+            start = parse_date(request.query_params.get("from", ""))
+            end = parse_date(request.query_params.get("to", ""))
+        except ValueError:
+            start = end = None
+        if not start or not end or end < start:
+            return Response(
+                {"error": "from and to must be dates (YYYY-MM-DD), from not after to"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (end - start).days >= MAX_RANGE_DAYS:
+            return Response(
+                {"error": f"The range can be at most {MAX_RANGE_DAYS} days"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({"from": start, "to": end, "days": slot_availability(start, end)})
+
+    def create(self, request, *args, **kwargs):
+        try:
+            return super().create(request, *args, **kwargs)
+        except SlotUnavailable as exc:
+            # 🚫 Someone else got the last seat first
+            return Response({"error": str(exc)}, status=status.HTTP_409_CONFLICT)
+
+    def update(self, request, *args, **kwargs):
+        try:
+            return super().update(request, *args, **kwargs)
+        except SlotUnavailable as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_409_CONFLICT)
+
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
\ No newline at end of file
+        serializer.save(user=self.request.user)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            if instance.slot_id:
+                free_seat(instance.slot_id)
+            instance.delete()
\ No newline at end of file
@@ -1,9 +1,65 @@
 # orders/admin.py
 from django.contrib import admin
-from .models import Order
+from django.db import transaction
+
+from products.stock import release_order_stock
+
+from .events import publish_status_changes
+from .models import Checkout, Order, RentalReservation
+from .rentals import release_rentals
+from .snapshots import ITEM_SOURCES
+from .stats import record_revenue_change, record_status_change
+from .utils import STOCK_RELEASE_STATUSES
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ['id', 'customer_name', 'total_price', 'status', 'order_date']
     list_filter = ['status']
     search_fields = ['customer_name', 'product_name']
+    # What the order holds (stock, rental dates) and its classification are
+    # fixed at checkout; edit those through the API, which re-reserves them
+    readonly_fields = [
+        'order_type', 'quantity', 'size', *ITEM_SOURCES, 'rental_days', 'rental_start', 'rental_end',
+    ]
+
+    def has_add_permission(self, request):
+        # Orders are priced, snapshotted and reserved by the checkout API
+        return False
+
+    def save_model(self, request, obj, form, change):
+        old_status, old_total = Order.objects.values_list('status', 'total_price').get(pk=obj.pk)
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            record_status_change(old_status, obj.status)
+            record_revenue_change(obj.order_date, obj.total_price - old_total)
+            if obj.status != old_status:
+                if obj.status in STOCK_RELEASE_STATUSES:
+                    release_order_stock([obj.pk])
+                    release_rentals([obj.pk])
+                changes = [(obj.pk, obj.user_id, old_status, obj.status)]
+                transaction.on_commit(lambda: publish_status_changes(changes), robust=True)
+
+
+@admin.register(RentalReservation)
+class RentalReservationAdmin(admin.ModelAdmin):
+    list_display = ['rental_item', 'size', 'unit', 'start', 'end', 'order']
+    list_filter = ['rental_item']
+    date_hierarchy = 'start'
+    raw_id_fields = ['order']
+
+
+class CheckoutLineInline(admin.TabularInline):
+    model = Order
+    fields = ['id', 'product_name', 'quantity', 'total_price', 'status']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    show_change_link = True
+
+
+@admin.register(Checkout)
+class CheckoutAdmin(admin.ModelAdmin):
+    list_display = ['id', 'customer_name', 'total_price', 'created_at']
+    search_fields = ['customer_name']
+    readonly_fields = ['user', 'customer_name', 'total_price', 'created_at']
+    inlines = [CheckoutLineInline]
@@ -0,0 +1,86 @@
+# orders/checkout.py
+"""
+Placing orders.
+
+``place_orders`` is the one write path for new orders. It snapshots and
+classifies each line, inserts them all with one bulk_create, bumps the
+stats rollups once per bucket and then reserves stock (or rental dates)
+line by line, all in one transaction: if any line is sold out, none of
+them is placed. OrderSerializer places a single order through it;
+``place_checkout`` places a whole cart under a Checkout header.
+"""
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+
+from products.stock import STOCK_SOURCES, reserve_order_stock
+
+from .models import Checkout, Order
+from .pricing import load_catalog
+from .rentals import reserve_rental
+from .snapshots import snapshot_for
+from .stats import record_orders_created
+from .utils import classify_order_type
+
+# Upper bound on the lines of one checkout
+CHECKOUT_LINE_LIMIT = 50
+
+
+def load_checkout_catalog(lines):
+    """load_catalog, plus the galleries the order snapshots read."""
+    catalog = load_catalog(lines)
+    for field in ('product', 'rental_item'):
+        if catalog.get(field):
+            prefetch_related_objects(list(catalog[field].values()), 'images')
+    return catalog
+
+
+def _build_order(user, data, checkout=None):
+    data = dict(data)
+    # ✅ Snapshot name/category/image/price from whichever item was ordered
+    data.update(snapshot_for(data))
+    if data.get("fabric"):
+        data["fabric_name"] = data["fabric"].name
+    # ✅ Classify once here; reads use the stored column
+    data["order_type"] = classify_order_type(data)
+    return Order(
+        user=user,
+        customer_name=user.get_full_name() or user.username,
+        checkout=checkout,
+        **data,
+    )
+
+
+def place_orders(user, lines, checkout=None):
+    """
+    Create one order per line (``lines`` are Order field values with item
+    instances, e.g. OrderSerializer validated_data) and reserve what they
+    hold. Raises InsufficientStock / RentalUnavailable, rolling back every
+    line, when a line cannot be had.
+    """
+    orders = [_build_order(user, data, checkout) for data in lines]
+    with transaction.atomic():
+        Order.objects.bulk_create(orders)
+        record_orders_created(orders)
+        for order in orders:
+            # ✅ Conditional decrement; raises InsufficientStock when the units are gone
+            if order.rental_start:
+                # Dated rentals hold their units on the calendar instead
+                reserve_rental(order)
+                reserve_order_stock(
+                    order, [source for source in STOCK_SOURCES if source != "rental_item"]
+                )
+            else:
+                reserve_order_stock(order)
+    return orders
+
+
+def place_checkout(user, lines):
+    """Place a cart's lines (priced, as ``place_orders`` takes them) under one header."""
+    with transaction.atomic():
+        checkout = Checkout.objects.create(
+            user=user,
+            customer_name=user.get_full_name() or user.username,
+            total_price=sum(line["total_price"] for line in lines),
+        )
+        place_orders(user, lines, checkout=checkout)
+    return checkout
@@ -0,0 +1,141 @@
+# orders/events.py
+"""
+Order status change events, pushed to browsers over Server-Sent Events.
+
+``publish_status_changes`` is called from the status transition code once
+the transaction commits; the broker fans each event out to the customer
+who owns the order and to every admin stream. Idle subscribers are just a
+parked coroutine and an empty queue, so thousands of open trackers cost
+almost nothing compared with each one re-polling the order list.
+
+The broker class is chosen by ``settings.ORDER_EVENT_BROKER``. The default
+``InProcessBroker`` only reaches streams served by the same process, which
+is what a single ASGI worker (or local development) needs; a deployment
+with several workers can swap in a broker backed by a shared pub/sub with
+the same ``subscribe`` / ``publish`` / ``has_subscribers`` methods.
+"""
+import asyncio
+import secrets
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+TICKET_SALT = 'orders.events.ticket'
+
+
+class Subscription:
+    """One open event stream. ``user_id=None`` receives every event (admins)."""
+    MAX_PENDING = 100
+
+    def __init__(self, broker, user_id=None):
+        self.broker = broker
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=self.MAX_PENDING)
+
+    def wants(self, event):
+        return self.user_id is None or event['user_id'] == self.user_id
+
+    def deliver(self, event):
+        # Runs on the subscriber's event loop. A stalled client drops events
+        # rather than growing without bound; it can refetch on reconnect.
+        if not self.queue.full():
+            self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Fan-out to subscriptions living in this process, from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+
+    def subscribe(self, user_id=None):
+        subscription = Subscription(self, user_id)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def has_subscribers(self):
+        return bool(self._subscriptions)
+
+    def publish(self, event):
+        with self._lock:
+            targets = [s for s in self._subscriptions if s.wants(event)]
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The stream's loop has shut down; it will unsubscribe itself
+                pass
+
+
+def issue_stream_ticket(user):
+    """A signed ticket that opens one event stream for ``user``."""
+    return signing.dumps({'u': user.pk, 'n': secrets.token_urlsafe(12)}, salt=TICKET_SALT)
+
+
+def redeem_stream_ticket(ticket):
+    """
+    The ticket's user id, or None when it is forged, expired or already used.
+
+    "Already used" is tracked in the default cache, so a ticket is only
+    single-use across workers when that cache is shared (Redis, Memcached,
+    the database); with the per-process LocMemCache each ASGI worker would
+    accept it once. Expiry (ORDER_EVENT_TICKET_TTL) holds either way.
+    """
+    ttl = settings.ORDER_EVENT_TICKET_TTL
+    try:
+        payload = signing.loads(ticket, salt=TICKET_SALT, max_age=ttl)
+    except signing.BadSignature:
+        return None
+    # add() only succeeds for the first redemption of a nonce
+    if not cache.add(f"order-events:ticket:{payload['n']}", True, ttl):
+        return None
+    return payload['u']
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(settings.ORDER_EVENT_BROKER)()
+
+
+def publish_status_changes(changes):
+    """
+    Publish ``(order_id, user_id, old_status, new_status)`` tuples.
+
+    ``user_id`` may be None, in which case it is looked up, but only when
+    someone is actually listening.
+    """
+    broker = get_broker()
+    if not broker.has_subscribers():
+        return
+
+    missing = [order_id for order_id, user_id, _, _ in changes if user_id is None]
+    owners = {}
+    if missing:
+        from .models import Order
+        owners = dict(Order.objects.filter(pk__in=missing).values_list('id', 'user_id'))
+
+    for order_id, user_id, old_status, new_status in changes:
+        broker.publish({
+            'type': 'order_status',
+            'order_id': order_id,
+            'user_id': user_id if user_id is not None else owners.get(order_id),
+            'old_status': old_status,
+            'new_status': new_status,
+        })
@@ -0,0 +1,72 @@
+# orders/filters.py
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+from .models import Order
+
+
+def _parse_date_param(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:  # well formed but impossible, e.g. 2024-02-30
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: "Use the YYYY-MM-DD format."})
+    return parsed
+
+
+def _parse_choice_params(params, name, choices):
+    """Accept ?status=a,b or ?status=a&status=b, rejecting unknown values."""
+    values = []
+    for raw in params.getlist(name):
+        values.extend(v.strip() for v in raw.split(',') if v.strip())
+    valid = {key for key, _ in choices}
+    unknown = [v for v in values if v not in valid]
+    if unknown:
+        raise ValidationError({name: f"Unknown value(s): {', '.join(unknown)}"})
+    return values
+
+
+def filter_orders(queryset, params):
+    """
+    Apply the order list query parameters.
+
+    Supported: ``status``, ``order_type`` (comma separated or repeated),
+    ``date_from`` / ``date_to`` (inclusive, on ``order_date``), ``user``
+    and ``search`` (matches ``customer_name`` or ``product_name``).
+    Every filter maps onto an index declared on ``Order.Meta``; the search
+    is served by the trigram indexes from migration 0012 on PostgreSQL.
+    """
+    statuses = _parse_choice_params(params, 'status', Order.STATUS_CHOICES)
+    if statuses:
+        queryset = queryset.filter(status__in=statuses)
+
+    order_types = _parse_choice_params(params, 'order_type', Order.ORDER_TYPE_CHOICES)
+    if order_types:
+        queryset = queryset.filter(order_type__in=order_types)
+
+    date_from = _parse_date_param(params, 'date_from')
+    if date_from:
+        queryset = queryset.filter(order_date__gte=date_from)
+
+    date_to = _parse_date_param(params, 'date_to')
+    if date_to:
+        queryset = queryset.filter(order_date__lte=date_to)
+
+    user_id = params.get('user')
+    if user_id:
+        if not user_id.isdigit():
+            raise ValidationError({'user': "Must be a user id."})
+        queryset = queryset.filter(user_id=int(user_id))
+
+    search = params.get('search', '').strip()
+    if search:
+        queryset = queryset.filter(
+            Q(customer_name__icontains=search) | Q(product_name__icontains=search)
+        )
+
+    return queryset
@@ -0,0 +1,89 @@
+import threading
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from orders.models import Order
+from orders.serializers import OrderSerializer
+from products.models import Accessory
+from products.stock import InsufficientStock, set_stock, stock_levels
+
+
+class Command(BaseCommand):
+    help = 'Race concurrent checkouts of one stocked item from many threads (in a throwaway test database)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--stock', type=int, default=200)
+        parser.add_argument('--shards', default='1,4', help='Comma separated shard counts to compare')
+
+    def handle(self, *args, **options):
+        # Never touch real orders: build a test database like the test runner does
+        test_db = connection.creation.create_test_db(verbosity=0, serialize=False)
+        self.stdout.write(f'Using test database {test_db}')
+        try:
+            user = get_user_model().objects.create_user(username='benchmark', password='benchmark')
+            item = Accessory.objects.create(
+                name='Benchmark Belt', category='belt', price=Decimal('299.00'),
+                image='accessories/benchmark',
+            )
+            for shards in (int(n) for n in options['shards'].split(',')):
+                self.run(user, item, shards, options['threads'], options['stock'])
+        finally:
+            connection.creation.destroy_test_db(test_db, verbosity=0)
+
+    def run(self, user, item, shards, threads, stock):
+        Order.objects.all().delete()
+        set_stock(item, stock, shards=shards)
+        request = SimpleNamespace(user=user)
+        barrier = threading.Barrier(threads)
+        counts = {'placed': 0, 'sold_out': 0, 'retries': 0}
+        lock = threading.Lock()
+
+        def worker():
+            barrier.wait()
+            try:
+                while True:
+                    serializer = OrderSerializer(
+                        data={'accessory': item.pk, 'quantity': 1},
+                        context={'request': request},
+                    )
+                    serializer.is_valid(raise_exception=True)
+                    try:
+                        serializer.save(user=user)
+                        outcome = 'placed'
+                    except InsufficientStock:
+                        outcome = 'sold_out'
+                    except OperationalError:
+                        # SQLite reports a busy database instead of waiting; try again
+                        outcome = 'retries'
+                    with lock:
+                        counts[outcome] += 1
+                    if outcome == 'sold_out':
+                        return
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        orders = Order.objects.count()
+        left = sum(stock_levels(item).values())
+        oversold = orders + left != stock or left < 0
+        self.stdout.write(
+            f'{shards} shard(s), {threads} threads: {counts["placed"]} orders in {elapsed:.2f}s '
+            f'({counts["placed"] / elapsed:.0f}/s), {counts["retries"]} busy retries, '
+            f'{left} left of {stock}'
+        )
+        if oversold:
+            self.stdout.write(self.style.ERROR(f'❌ Oversold: {orders} orders for {stock} units'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✅ {orders} orders for {stock} units, none oversold'))
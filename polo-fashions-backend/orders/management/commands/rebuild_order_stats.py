@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from orders.stats import rebuild_order_stats
+from orders.models import OrderStat, DailyOrderRevenue
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the order statistics rollup tables from the orders table'
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write('Rebuilding order stats...')
+        rebuild_order_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Rebuilt {OrderStat.objects.count()} status/type buckets '
+            f'and {DailyOrderRevenue.objects.count()} daily revenue rows'
+        ))
@@ -0,0 +1,38 @@
+# Trigram indexes backing ?search= on the order list (PostgreSQL only).
+#
+# Django turns ``icontains`` into ``UPPER(col) LIKE UPPER(%s)`` on PostgreSQL,
+# so the indexes are built on UPPER(col). Other backends have no equivalent
+# index for infix matches and are left untouched.
+
+from django.db import migrations
+
+SEARCH_COLUMNS = ("customer_name", "product_name")
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS order_{column}_trgm_idx "
+            f"ON orders_order USING gin (UPPER({column}) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS order_{column}_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0011_order_order_status_created_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 6.0 on 2026-10-18 16:19
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_rollups(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    OrderStat = apps.get_model("orders", "OrderStat")
+    DailyOrderRevenue = apps.get_model("orders", "DailyOrderRevenue")
+
+    orders = Order.objects.order_by()
+    OrderStat.objects.bulk_create(
+        OrderStat(dimension=dimension, key=row[dimension], count=row["n"])
+        for dimension in ("status", "order_type")
+        for row in orders.values(dimension).annotate(n=Count("id"))
+    )
+    DailyOrderRevenue.objects.bulk_create(
+        DailyOrderRevenue(
+            date=row["order_date"],
+            order_count=row["n"],
+            revenue=row["total"] or Decimal("0.00"),
+        )
+        for row in orders.values("order_date").annotate(
+            n=Count("id"), total=Sum("total_price")
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0012_order_search_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyOrderRevenue",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(unique=True)),
+                ("order_count", models.IntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=14
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-date"],
+            },
+        ),
+        migrations.CreateModel(
+            name="OrderStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dimension",
+                    models.CharField(
+                        choices=[("status", "Status"), ("order_type", "Order Type")],
+                        max_length=20,
+                    ),
+                ),
+                ("key", models.CharField(max_length=30)),
+                ("count", models.IntegerField(default=0)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("dimension", "key"), name="unique_order_stat_bucket"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
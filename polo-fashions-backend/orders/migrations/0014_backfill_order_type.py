@@ -0,0 +1,84 @@
+# Generated by Django 6.0 on 2026-10-18 16:20
+
+from django.db import migrations
+from django.db.models import Count
+
+BATCH_SIZE = 1000
+
+
+def classify_order_type(data):
+    """
+    Frozen copy of orders.utils.classify_order_type as it was when this
+    migration was written, so later changes to it don't change what the
+    migration did.
+    """
+    meters = data.get("meters") or 0
+
+    if data.get("rental_item") or (data.get("rental_days") or 0) > 0:
+        return "rental"
+    if data.get("accessory"):
+        return "accessory"
+    if data.get("innerwear"):
+        return "innerwear"
+    if data.get("stitch_type") and meters > 0:
+        return "fabric_with_stitching"
+    if data.get("fabric") and meters > 0:
+        return "fabric_only"
+
+    product = data.get("product")
+    if product and (product.category or "").lower() == "traditional":
+        return "traditional"
+    return "ready_made"
+
+
+def backfill_order_type(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    OrderStat = apps.get_model("orders", "OrderStat")
+
+    last_pk = 0
+    while True:
+        batch = list(
+            Order.objects.filter(pk__gt=last_pk)
+            .select_related("product")
+            .order_by("pk")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        changed = []
+        for order in batch:
+            # Only truthiness matters for the other FKs, so skip loading them.
+            order_type = classify_order_type(
+                {
+                    "rental_item": order.rental_item_id,
+                    "rental_days": order.rental_days,
+                    "accessory": order.accessory_id,
+                    "innerwear": order.innerwear_id,
+                    "stitch_type": order.stitch_type,
+                    "meters": order.meters,
+                    "fabric": order.fabric_id,
+                    "product": order.product,
+                }
+            )
+            if order.order_type != order_type:
+                order.order_type = order_type
+                changed.append(order)
+        Order.objects.bulk_update(changed, ["order_type"])
+        last_pk = batch[-1].pk
+
+    # Keep the order_type rollup in step with the reclassified rows.
+    OrderStat.objects.filter(dimension="order_type").delete()
+    OrderStat.objects.bulk_create(
+        OrderStat(dimension="order_type", key=row["order_type"], count=row["n"])
+        for row in Order.objects.order_by().values("order_type").annotate(n=Count("id"))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0013_dailyorderrevenue_orderstat"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_order_type, migrations.RunPython.noop),
+    ]
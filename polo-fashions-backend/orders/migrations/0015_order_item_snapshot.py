@@ -0,0 +1,107 @@
+# Generated by Django 6.0 on 2026-10-18 16:21
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+SNAPSHOT_FIELDS = ["product_name", "item_category", "item_image", "item_price"]
+
+# Frozen copy of orders.snapshots as it was when this migration was written
+ITEM_SOURCES = ("innerwear", "accessory", "fabric", "rental_item", "product")
+
+
+def _first_gallery_image(item):
+    images = sorted(item.images.all(), key=lambda img: img.id)
+    return images[0].image if images else None
+
+
+def describe_item(source, item):
+    if source == "product":
+        category = item.category
+        image = _first_gallery_image(item) or item.image
+        price = item.price
+    elif source == "rental_item":
+        category = "rental"
+        image = _first_gallery_image(item) or item.image
+        price = item.price_per_day
+    elif source == "fabric":
+        category = item.type
+        image = item.image
+        price = item.price
+    elif source == "accessory":
+        category = item.category
+        image = item.image
+        price = item.price
+    else:
+        category = "innerwear"
+        image = item.image
+        price = item.price
+
+    return {
+        "product_name": item.name,
+        "item_category": category or "",
+        "item_image": image.url if image else "",
+        "item_price": price,
+    }
+
+
+def snapshot_for(order):
+    for source in ITEM_SOURCES:
+        item = getattr(order, source)
+        if item:
+            return describe_item(source, item)
+    return {}
+
+
+def backfill_item_snapshots(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+
+    last_pk = 0
+    while True:
+        batch = list(
+            Order.objects.filter(pk__gt=last_pk)
+            .select_related(
+                "product", "fabric", "rental_item", "accessory", "innerwear"
+            )
+            .prefetch_related("product__images", "rental_item__images")
+            .order_by("pk")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for order in batch:
+            try:
+                snapshot = snapshot_for(order)
+            except ValueError:
+                # Cloudinary is not configured here; leave the image for a later refresh.
+                continue
+            for field, value in snapshot.items():
+                setattr(order, field, value)
+        Order.objects.bulk_update(batch, SNAPSHOT_FIELDS)
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0014_backfill_order_type"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="item_category",
+            field=models.CharField(blank=True, default="", max_length=100),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="item_image",
+            field=models.URLField(blank=True, default="", max_length=500),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="item_price",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=10, null=True
+            ),
+        ),
+        migrations.RunPython(backfill_item_snapshots, migrations.RunPython.noop),
+    ]
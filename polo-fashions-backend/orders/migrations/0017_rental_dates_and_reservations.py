@@ -0,0 +1,73 @@
+# Generated by Django 6.0 on 2026-10-18 16:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0016_order_order_updated_id_idx_and_more"),
+        ("products", "0013_stocklevel_stockmovement"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="rental_end",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="rental_start",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="RentalReservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("size", models.CharField(blank=True, default="", max_length=20)),
+                ("unit", models.PositiveSmallIntegerField(default=0)),
+                ("start", models.DateField()),
+                ("end", models.DateField()),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservations",
+                        to="orders.order",
+                    ),
+                ),
+                (
+                    "rental_item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservations",
+                        to="products.rentalitem",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["rental_item", "size", "end", "start"],
+                        name="rental_overlap_idx",
+                    )
+                ],
+                "constraints": [
+                    models.CheckConstraint(
+                        condition=models.Q(("end__gt", models.F("start"))),
+                        name="rental_reservation_end_after_start",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Database-level guard against double-booking a rental unit.
+#
+# Two reservations of the same item, size and unit may not overlap. The
+# booking code (orders/rentals.py) picks a free unit first; this makes the
+# database reject the loser when two bookings pick the same unit at once.
+# PostgreSQL gets an exclusion constraint over the date range, SQLite a
+# pair of triggers. Other backends rely on the booking code alone.
+
+from django.db import migrations
+
+OVERLAP = (
+    "SELECT 1 FROM orders_rentalreservation r "
+    "WHERE r.rental_item_id = NEW.rental_item_id AND r.size = NEW.size "
+    'AND r.unit = NEW.unit AND r."end" > NEW.start AND r.start < NEW."end"'
+)
+
+SQLITE_TRIGGERS = [
+    "CREATE TRIGGER orders_rentalreservation_overlap_ins "
+    "BEFORE INSERT ON orders_rentalreservation "
+    f"WHEN EXISTS ({OVERLAP}) "
+    "BEGIN SELECT RAISE(ABORT, 'rental unit already reserved for these dates'); END",
+    "CREATE TRIGGER orders_rentalreservation_overlap_upd "
+    "BEFORE UPDATE ON orders_rentalreservation "
+    f"WHEN EXISTS ({OVERLAP} AND r.id != NEW.id) "
+    "BEGIN SELECT RAISE(ABORT, 'rental unit already reserved for these dates'); END",
+]
+
+POSTGRES_EXCLUSION = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    "ALTER TABLE orders_rentalreservation ADD CONSTRAINT rental_reservation_no_overlap "
+    "EXCLUDE USING gist (rental_item_id WITH =, size WITH =, unit WITH =, "
+    'daterange(start, "end") WITH &&)',
+]
+
+
+def create_overlap_guard(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {"sqlite": SQLITE_TRIGGERS, "postgresql": POSTGRES_EXCLUSION}.get(
+        vendor, []
+    )
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_overlap_guard(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for suffix in ("ins", "upd"):
+            schema_editor.execute(
+                f"DROP TRIGGER IF EXISTS orders_rentalreservation_overlap_{suffix}"
+            )
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            "ALTER TABLE orders_rentalreservation "
+            "DROP CONSTRAINT IF EXISTS rental_reservation_no_overlap"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0017_rental_dates_and_reservations"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_overlap_guard, drop_overlap_guard),
+    ]
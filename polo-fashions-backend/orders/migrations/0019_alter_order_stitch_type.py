@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-18 17:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0018_rental_reservation_overlap_guard"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="order",
+            name="stitch_type",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("shirt", "Shirt"),
+                    ("pant", "Pant"),
+                    ("kurta", "Kurta"),
+                    ("dhoti", "Dhoti"),
+                    ("both", "Shirt & Dhoti"),
+                ],
+                max_length=20,
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 6.0 on 2026-10-18 17:24
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def rebuild_order_type_stats(Order, OrderStat):
+    OrderStat.objects.filter(dimension="order_type").delete()
+    OrderStat.objects.bulk_create(
+        OrderStat(dimension="order_type", key=row["order_type"], count=row["n"])
+        for row in Order.objects.order_by().values("order_type").annotate(n=Count("id"))
+    )
+
+
+def rental_items_bought_outright(Order):
+    # Rental orders without rental days were bought, not rented
+    return Order.objects.filter(
+        order_type="rental", rental_days=0, rental_item__isnull=False
+    )
+
+
+def forwards(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    OrderStat = apps.get_model("orders", "OrderStat")
+    rental_items_bought_outright(Order).update(order_type="rental_buy")
+    rebuild_order_type_stats(Order, OrderStat)
+
+
+def backwards(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    OrderStat = apps.get_model("orders", "OrderStat")
+    Order.objects.filter(order_type="rental_buy").update(order_type="rental")
+    rebuild_order_type_stats(Order, OrderStat)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0020_checkout"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
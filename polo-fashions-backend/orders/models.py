@@ -5,6 +5,28 @@ from products.models import Product, Fabric
 from decimal import Decimal
 
 
+class Checkout(models.Model):
+    """
+    Header of a cart checked out in one go. Every line is an ordinary
+    Order (one item, its quantity and price) pointing here, so statuses,
+    stock and rentals work per line exactly as for single orders.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='checkouts'
+    )
+    customer_name = models.CharField(max_length=200)
+    total_price = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Checkout #{self.id} - {self.customer_name}"
+
+    class Meta:
+        ordering = ['-created_at']
+
+
 class Order(models.Model):
     STATUS_CHOICES = (
         ('placed', 'Placed'),
@@ -23,6 +45,9 @@ class Order(models.Model):
         ('shirt', 'Shirt'),
         ('pant', 'Pant'),
         ('kurta', 'Kurta'),
+        # Traditional sets
+        ('dhoti', 'Dhoti'),
+        ('both', 'Shirt & Dhoti'),
     )
     ORDER_TYPE_CHOICES = (
         ('fabric_only', 'Fabric Only'),
@@ -50,6 +75,13 @@ class Order(models.Model):
 
     product = models.ForeignKey(Product, on_delete=models.CASCADE,null=True,blank=True)
     product_name = models.CharField(max_length=200)
+
+    # ===============================
+    # Item snapshot (see orders/snapshots.py)
+    # ===============================
+    item_category = models.CharField(max_length=100, blank=True, default='')
+    item_image = models.URLField(max_length=500, blank=True, default='')
+    item_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     
      # ✅ ADD RENTAL ITEM REFERENCE
     rental_item = models.ForeignKey(
@@ -131,6 +163,10 @@ class Order(models.Model):
         decimal_places=2,
         default=Decimal('0.00')
     )
+    # Booked dates (see orders/rentals.py); rental_end is the day the item
+    # is due back, i.e. rental_start + rental_days
+    rental_start = models.DateField(blank=True, null=True)
+    rental_end = models.DateField(blank=True, null=True)
 
     # ===============================
     # Order summary
@@ -147,6 +183,15 @@ class Order(models.Model):
     order_date = models.DateField(auto_now_add=True)
     notes = models.TextField(blank=True, null=True)
 
+    # Set when the order is one line of a multi-item checkout
+    checkout = models.ForeignKey(
+        Checkout,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='lines'
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -155,4 +200,85 @@ class Order(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='order_created_id_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='order_user_created_id_idx'),
+            models.Index(fields=['status', '-created_at'], name='order_status_created_idx'),
+            models.Index(fields=['order_type', '-created_at'], name='order_type_created_idx'),
+            models.Index(fields=['order_date'], name='order_date_idx'),
+            models.Index(fields=['updated_at', 'id'], name='order_updated_id_idx'),
+            models.Index(fields=['user', 'updated_at', 'id'], name='order_user_updated_id_idx'),
+        ]
         
+
+
+class OrderStat(models.Model):
+    """
+    Rollup of order counts per status / order type.
+
+    Maintained by ``orders.stats`` in the same transaction as the order
+    write, so the dashboard reads one row per bucket instead of counting
+    the orders table. Rebuild with ``manage.py rebuild_order_stats``.
+    """
+    DIMENSION_CHOICES = (
+        ('status', 'Status'),
+        ('order_type', 'Order Type'),
+    )
+
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    key = models.CharField(max_length=30)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.dimension}:{self.key} = {self.count}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'key'], name='unique_order_stat_bucket'),
+        ]
+
+
+class DailyOrderRevenue(models.Model):
+    """Per-day order count and revenue rollup, keyed by ``Order.order_date``."""
+    date = models.DateField(unique=True)
+    order_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    def __str__(self):
+        return f"{self.date}: {self.order_count} orders / {self.revenue}"
+
+    class Meta:
+        ordering = ['-date']
+
+
+class RentalReservation(models.Model):
+    """
+    One unit of a rental item (in one size) held by a rental order for the
+    half-open date range [start, end). Units are numbered 0..N-1; the
+    database refuses two overlapping reservations of the same unit (an
+    exclusion constraint on PostgreSQL, a trigger on SQLite, both added by
+    migration 0018), so concurrent bookings cannot double-book it.
+    """
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='reservations')
+    rental_item = models.ForeignKey(
+        'products.RentalItem', on_delete=models.CASCADE, related_name='reservations'
+    )
+    size = models.CharField(max_length=20, blank=True, default='')
+    unit = models.PositiveSmallIntegerField(default=0)
+    start = models.DateField()
+    end = models.DateField()
+
+    def __str__(self):
+        return f"{self.rental_item_id}/{self.size or '-'}#{self.unit} {self.start}..{self.end}"
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(end__gt=models.F('start')), name='rental_reservation_end_after_start'
+            ),
+        ]
+        indexes = [
+            # Overlap lookups are "item = ? AND size = ? AND end > ? AND start < ?";
+            # leading with end skips the (ever growing) past reservations
+            models.Index(fields=['rental_item', 'size', 'end', 'start'], name='rental_overlap_idx'),
+        ]
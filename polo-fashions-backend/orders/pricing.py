@@ -0,0 +1,185 @@
+# orders/pricing.py
+"""
+Server-side prices for every order type.
+
+``price_line`` prices one order line (the fields of an order: the item
+FKs, quantity, meters, stitch_type, rental_days) from catalog prices:
+
+* fabric_only            meters x fabric price per meter
+* fabric_with_stitching  the fabric, plus the stitching charge
+* ready_made             product price (plus stitching, if asked for)
+* traditional            product price plus the traditional stitching charge
+* rental                 rental_days x price per day, plus the deposit
+* rental_buy             the rental item's buy price
+* accessory / innerwear  item price
+
+all times ``quantity``. A line's item fields may hold model instances
+(serializer validated_data) or ids; ids are looked up in the ``catalog``
+that ``load_catalog`` builds with one query per item type for a whole
+cart, so pricing N lines never costs N queries. OrderSerializer uses the
+same engine to check the total a client sends.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+from products.models import Accessory, Fabric, Innerwear, Product, RentalItem
+
+from .utils import classify_order_type
+
+CENT = Decimal('0.01')
+
+# A client total may differ from ours by this much (float rounding in JS)
+PRICE_TOLERANCE = Decimal('0.01')
+
+# Stitching charge per stitch type; traditional sets are priced separately.
+# The order forms read these from /api/orders/config/
+STITCHING_CHARGES = {
+    'shirt': Decimal('350.00'),
+    'pant': Decimal('450.00'),
+    'kurta': Decimal('400.00'),
+}
+TRADITIONAL_STITCHING_CHARGES = {
+    'shirt': Decimal('350.00'),
+    'dhoti': Decimal('300.00'),
+    'both': Decimal('550.00'),
+}
+
+# Order FK -> catalog model priced from it
+PRICED_ITEMS = {
+    'product': Product,
+    'fabric': Fabric,
+    'rental_item': RentalItem,
+    'accessory': Accessory,
+    'innerwear': Innerwear,
+}
+
+# Order fields a price is computed from, and the Order fields a quote fills in
+PRICE_INPUTS = tuple(PRICED_ITEMS) + ('quantity', 'meters', 'stitch_type', 'rental_days')
+PRICE_FIELDS = (
+    'total_price', 'fabric_price_per_meter', 'stitching_charge',
+    'rental_price_per_day', 'rental_deposit',
+)
+
+
+class PricingError(ValueError):
+    """A line that cannot be priced (missing item, no price, bad options)."""
+
+
+def _money(value):
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def load_catalog(lines):
+    """``{field: {id: item}}`` for the item ids in ``lines``, one query per item type."""
+    catalog = {}
+    for field, model in PRICED_ITEMS.items():
+        ids = {
+            line[field] for line in lines
+            if isinstance(line.get(field), int) and not isinstance(line.get(field), bool)
+        }
+        if ids:
+            catalog[field] = model.objects.in_bulk(ids)
+    return catalog
+
+
+def resolve_items(line, catalog):
+    """The line's item fields as model instances."""
+    items = {}
+    for field in PRICED_ITEMS:
+        value = line.get(field)
+        if value is None:
+            continue
+        if not isinstance(value, PRICED_ITEMS[field]):
+            value = (catalog or {}).get(field, {}).get(value)
+            if value is None:
+                raise PricingError(f"Unknown {field.replace('_', ' ')} {line[field]}")
+        items[field] = value
+    return items
+
+
+def _price_of(item, field='price'):
+    price = getattr(item, field)
+    if price is None:
+        raise PricingError(f"{item.name} has no price")
+    return price
+
+
+def _stitching(order_type, stitch_type):
+    if not stitch_type:
+        return Decimal('0.00')
+    charges = TRADITIONAL_STITCHING_CHARGES if order_type == 'traditional' else STITCHING_CHARGES
+    if stitch_type not in charges:
+        raise PricingError(f"'{stitch_type}' stitching is not offered for this item")
+    return charges[stitch_type]
+
+
+def price_line(line, catalog=None):
+    """
+    Price one order line. Returns the order type, the per-unit parts
+    (the same names as the Order columns) and ``total_price``; raises
+    PricingError when the line can't be priced.
+    """
+    items = resolve_items(line, catalog)
+    quantity = line.get('quantity') or 1
+    meters = Decimal(line.get('meters') or 0)
+    rental_days = line.get('rental_days') or 0
+    stitch_type = line.get('stitch_type') or None
+    order_type = classify_order_type({**line, **items, 'meters': meters})
+
+    parts = {
+        'fabric_price_per_meter': Decimal('0.00'),
+        'stitching_charge': Decimal('0.00'),
+        'rental_price_per_day': Decimal('0.00'),
+        'rental_deposit': Decimal('0.00'),
+    }
+    if order_type in ('fabric_only', 'fabric_with_stitching'):
+        fabric = items.get('fabric')
+        if fabric is None:
+            raise PricingError("Choose a fabric to order it by the meter")
+        parts['fabric_price_per_meter'] = _price_of(fabric)
+        parts['stitching_charge'] = _stitching(order_type, stitch_type)
+        unit = meters * fabric.price + parts['stitching_charge']
+    elif order_type in ('rental', 'rental_buy') and 'rental_item' not in items:
+        raise PricingError("Choose a rental item")
+    elif order_type == 'rental':
+        rental_item = items['rental_item']
+        parts['rental_price_per_day'] = _price_of(rental_item, 'price_per_day')
+        parts['rental_deposit'] = _price_of(rental_item, 'deposit_amount')
+        unit = rental_days * rental_item.price_per_day + rental_item.deposit_amount
+    elif order_type == 'rental_buy':
+        unit = _price_of(items['rental_item'], 'buy_price')
+    elif order_type in ('accessory', 'innerwear'):
+        unit = _price_of(items[order_type])
+    else:  # ready_made / traditional
+        product = items.get('product')
+        if product is None:
+            raise PricingError("Nothing to order")
+        parts['stitching_charge'] = _stitching(order_type, stitch_type)
+        unit = _price_of(product) + parts['stitching_charge']
+
+    unit = _money(unit)
+    return {
+        'order_type': order_type,
+        'quantity': quantity,
+        'unit_price': unit,
+        **parts,
+        'total_price': _money(unit * quantity),
+    }
+
+
+def price_lines(lines):
+    """
+    Price a cart: ``[(quote, None) | (None, error message), ...]`` per line,
+    with the catalog loaded in bulk first.
+    """
+    catalog = load_catalog(lines)
+    results = []
+    for line in lines:
+        try:
+            results.append((price_line(line, catalog), None))
+        except PricingError as exc:
+            results.append((None, str(exc)))
+    return results
+
+
+def total_matches(expected, given):
+    return abs(_money(given) - expected) <= PRICE_TOLERANCE
@@ -0,0 +1,163 @@
+# orders/rentals.py
+"""
+Rental calendar.
+
+A dated rental order holds ``quantity`` units of its item, in its size,
+for [rental_start, rental_end) as RentalReservation rows. The number of
+units an item has in a size is its stock count (products.stock); an item
+without stock counts has one unit per listed size, a single garment.
+
+Booking picks units that no overlapping reservation uses and inserts
+them inside the order transaction. If a concurrent booking grabbed the
+same unit first, the database guard from migration 0018 rejects the
+insert and the next free unit is tried. Availability for any number of
+items over a date range is three queries: the items, their unit counts
+and the reservations overlapping the range.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from products import versions
+from products.models import StockLevel
+from products.sizes import normalize_size, normalize_sizes
+
+from .models import RentalReservation
+
+# Units per size of a rental item that has no stock count
+DEFAULT_UNITS = 1
+
+# Longest range the availability endpoint answers for
+MAX_RANGE_DAYS = 92
+
+
+class RentalUnavailable(Exception):
+    """Raised when a rental order's dates clash with existing bookings."""
+
+    def __init__(self, item, size, start, end, available):
+        self.item = item
+        self.size = size
+        self.start = start
+        self.end = end
+        self.available = available
+        label = f"{item.name} ({size})" if size else item.name
+        if available:
+            message = f"Only {available} of {label} free from {start} to {end}"
+        else:
+            message = f"{label} is not available from {start} to {end}"
+        super().__init__(message)
+
+
+def rental_units(items):
+    """``{(item_id, size): units}`` for rental items, in one query."""
+    units = {
+        (row['object_id'], row['size']): row['units']
+        for row in StockLevel.objects.filter(
+            collection=versions.RENTALS, object_id__in=[item.pk for item in items],
+        ).values('object_id', 'size').annotate(units=Sum('quantity')).order_by()
+    }
+    tracked = {item_id for item_id, _ in units}
+    for item in items:
+        if item.pk not in tracked:
+            for size in normalize_sizes(item.sizes) or ['']:
+                units[item.pk, size] = DEFAULT_UNITS
+    return units
+
+
+def overlapping(item_ids, start, end):
+    """Reservations of the items that share at least one day with [start, end)."""
+    return RentalReservation.objects.filter(
+        rental_item_id__in=item_ids, end__gt=start, start__lt=end,
+    )
+
+
+def reserve_rental(order):
+    """
+    Book ``order.quantity`` units for the order's dates.
+
+    Call inside the order transaction. Raises RentalUnavailable when fewer
+    units are free for the whole range.
+    """
+    item = order.rental_item
+    size = normalize_size(order.size or '')
+    start, end = order.rental_start, order.rental_end
+    units = rental_units([item]).get((item.pk, size), 0)
+
+    free = []
+    # Each retry means a concurrent booking took a unit, so at most one per unit
+    for _ in range(units):
+        taken = set(
+            overlapping([item.pk], start, end).filter(size=size).values_list('unit', flat=True)
+        )
+        free = [unit for unit in range(units) if unit not in taken]
+        if len(free) < order.quantity:
+            break
+        try:
+            with transaction.atomic():
+                RentalReservation.objects.bulk_create([
+                    RentalReservation(
+                        order=order, rental_item=item, size=size, unit=unit, start=start, end=end,
+                    )
+                    for unit in free[:order.quantity]
+                ])
+            return
+        except IntegrityError:
+            continue
+    raise RentalUnavailable(item, size, start, end, len(free))
+
+
+def release_rentals(order_ids, today=None):
+    """
+    Free the rest of the booked range of returned or cancelled orders:
+    reservations end today, or disappear if they had not started yet.
+    """
+    today = today or timezone.localdate()
+    reservations = RentalReservation.objects.filter(order_id__in=order_ids, end__gt=today)
+    reservations.filter(start__gte=today).delete()
+    reservations.update(end=today)
+
+
+def rental_availability(items, start, end, size=None):
+    """
+    Per item and size over [start, end): how many units it has, how many
+    are free for the whole range, and the days on which none is free.
+    """
+    days = (end - start).days
+    units = rental_units(items)
+    if size:
+        units = {key: count for key, count in units.items() if key[1] == normalize_size(size)}
+
+    taken = defaultdict(set)
+    # Difference array per item/size: +1 on the first booked day, -1 after the last
+    booked = defaultdict(lambda: [0] * (days + 1))
+    rows = overlapping([item.pk for item in items], start, end).values_list(
+        'rental_item_id', 'size', 'unit', 'start', 'end',
+    )
+    for item_id, item_size, unit, booked_start, booked_end in rows:
+        key = (item_id, item_size)
+        taken[key].add(unit)
+        booked[key][max((booked_start - start).days, 0)] += 1
+        booked[key][min((booked_end - start).days, days)] -= 1
+
+    sizes_by_item = defaultdict(dict)
+    for (item_id, item_size), count in sorted(units.items()):
+        busy_days, running = [], 0
+        for offset, change in enumerate(booked[item_id, item_size][:days]):
+            running += change
+            if running >= count:
+                busy_days.append(start + timedelta(days=offset))
+        free_units = max(count - len(taken[item_id, item_size]), 0)
+        sizes_by_item[item_id][item_size] = {
+            'units': count,
+            'free_units': free_units,
+            'available': free_units > 0,
+            'busy_days': busy_days,
+        }
+
+    return [
+        {'id': item.pk, 'name': item.name, 'sizes': sizes_by_item[item.pk]}
+        for item in items
+    ]
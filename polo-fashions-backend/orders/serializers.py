@@ -1,5 +1,67 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Order
+from polo_fashions.images import image_url as delivery_url
+from products.stock import STOCK_SOURCES, release_order_stock, reserve_order_stock
+from .checkout import CHECKOUT_LINE_LIMIT, load_checkout_catalog, place_checkout, place_orders
+from .models import Checkout, Order
+from .pricing import (
+    PRICE_FIELDS, PRICE_INPUTS, PricingError, price_line, resolve_items, total_matches,
+)
+from .snapshots import ITEM_SOURCES, snapshot_for
+from .stats import record_order_type_change
+from .utils import (
+    HANDED_OVER_STATUSES, ORDER_TYPE_FIELDS, PRODUCT_TYPE_LABELS, classify_order_type,
+)
+
+# Order fields that decide which stock units an order holds
+RESERVED_FIELDS = ("quantity", "size") + STOCK_SOURCES
+
+
+def check_new_order(attrs):
+    """
+    Validate an order line about to be placed (items as model instances)
+    and fill in its total and price parts from current catalog prices.
+    """
+    start = attrs.get("rental_start")
+    if start:
+        if not attrs.get("rental_item"):
+            raise serializers.ValidationError(
+                {"rental_start": "Only rental orders have rental dates."}
+            )
+        if not attrs.get("rental_days"):
+            raise serializers.ValidationError(
+                {"rental_days": "Rental days are required with a start date."}
+            )
+        if start < timezone.localdate():
+            raise serializers.ValidationError(
+                {"rental_start": "Rental dates cannot be in the past."}
+            )
+        attrs["rental_end"] = start + timedelta(days=attrs["rental_days"])
+
+    return apply_price(attrs)
+
+
+def apply_price(attrs, line=None):
+    """
+    Price ``line`` (by default the attrs themselves), check a total the
+    client sent against it and store the total and its parts in attrs.
+    """
+    try:
+        quote = price_line(attrs if line is None else line)
+    except PricingError as exc:
+        raise serializers.ValidationError(str(exc))
+    given = attrs.get("total_price")
+    if given is not None and not total_matches(quote["total_price"], given):
+        raise serializers.ValidationError(
+            {"total_price": f"Prices have changed, the current total is {quote['total_price']}."}
+        )
+    for field in PRICE_FIELDS:
+        attrs[field] = quote[field]
+    return attrs
+
 
 class OrderSerializer(serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
@@ -15,11 +77,13 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'user', 'customer_name', 'user_name',
             'product', 'rental_item', 'accessory', 'innerwear',
-            'product_type', 'product_name', 
+            'order_type', 'product_type', 'product_name', 
+            'item_category', 'item_image', 'item_price',
             'fabric', 'fabric_name', 'fabric_price_per_meter',
             'stitch_type', 'meters', 'stitching_charge',
             'size', 'quantity', 'total_price', 'status',
             'rental_days', 'rental_deposit', 'rental_price_per_day',
+            'rental_start', 'rental_end', 'checkout',
             'order_date', 'notes', 
             'product_details', 'fabric_details', 'rental_item_details',
             'accessory_details', 'innerwear_details',
@@ -28,11 +92,14 @@ class OrderSerializer(serializers.ModelSerializer):
         read_only_fields = [
             'id', 'user', 'customer_name', 'user_name',
             'status', 'order_date', 'product_details',
-            'product_name', 'product_type',
+            'product_name', 'order_type', 'product_type',
+            'item_category', 'item_image', 'item_price',
             'fabric_details', 'rental_item_details',
             'accessory_details', 'innerwear_details',
-            'created_at', 'updated_at'
+            'rental_end', 'checkout', 'created_at', 'updated_at'
         ]
+        # Priced on the server; a total the client sends is checked against it
+        extra_kwargs = {'total_price': {'required': False}}
 
     def get_product_details(self, obj):
         """Get product details with proper image handling."""
@@ -40,14 +107,16 @@ class OrderSerializer(serializers.ModelSerializer):
             image_url = None
             
             # Priority 1: Check for related images first
-            if hasattr(obj.product, 'images') and obj.product.images.exists():
-                first_image = obj.product.images.first()
-                if first_image and first_image.image:
-                    image_url = first_image.image.url  # ✅ Full URL
+            # (iterate .all() so a prefetched gallery is reused, no extra query)
+            product_images = list(obj.product.images.all())
+            if product_images:
+                first_image = product_images[0]
+                if first_image.image:
+                    image_url = delivery_url(first_image.image)  # ✅ Full URL
             
             # Priority 2: Check main image field
             elif obj.product.image:
-                image_url = obj.product.image.url  # ✅ Full URL
+                image_url = delivery_url(obj.product.image)  # ✅ Full URL
             
             return {
                 'id': obj.product.id,
@@ -61,7 +130,7 @@ class OrderSerializer(serializers.ModelSerializer):
         if obj.fabric:
             image_url = None
             if hasattr(obj.fabric, 'image') and obj.fabric.image:
-                image_url = obj.fabric.image.url  # ✅ Full URL
+                image_url = delivery_url(obj.fabric.image)  # ✅ Full URL
             
             return {
                 'id': obj.fabric.id,
@@ -80,14 +149,14 @@ class OrderSerializer(serializers.ModelSerializer):
                 images = [
                     {
                         'id': img.id, 
-                        'image': img.image.url if img.image else None  # ✅ Full URL
+                        'image': delivery_url(img.image)  # ✅ Full URL
                     }
                     for img in obj.rental_item.images.all()
                 ]
             
             main_image = None
             if obj.rental_item.image:
-                main_image = obj.rental_item.image.url  # ✅ Full URL
+                main_image = delivery_url(obj.rental_item.image)  # ✅ Full URL
             
             return {
                 'id': obj.rental_item.id,
@@ -104,7 +173,7 @@ class OrderSerializer(serializers.ModelSerializer):
         if obj.accessory:
             image_url = None
             if obj.accessory.image:
-                image_url = obj.accessory.image.url  # ✅ Full URL
+                image_url = delivery_url(obj.accessory.image)  # ✅ Full URL
             
             return {
                 'id': obj.accessory.id,
@@ -120,7 +189,7 @@ class OrderSerializer(serializers.ModelSerializer):
         if obj.innerwear:
             image_url = None
             if obj.innerwear.image:
-                image_url = obj.innerwear.image.url  # ✅ Full URL
+                image_url = delivery_url(obj.innerwear.image)  # ✅ Full URL
             
             return {
                 'id': obj.innerwear.id,
@@ -131,74 +200,176 @@ class OrderSerializer(serializers.ModelSerializer):
             }
         return None
 
+    def validate_quantity(self, value):
+        if value < 1:
+            raise serializers.ValidationError("Quantity must be at least 1.")
+        return value
+
+    def validate(self, attrs):
+        if self.instance is not None:
+            # Reservations are made once, at creation
+            if self.instance.rental_start and (
+                "rental_start" in attrs or "rental_days" in attrs
+            ):
+                raise serializers.ValidationError(
+                    {"rental_start": "Booked rental dates cannot be changed."}
+                )
+            changed = [field for field in RESERVED_FIELDS if field in attrs]
+            if changed and self.instance.status in HANDED_OVER_STATUSES:
+                raise serializers.ValidationError(
+                    {changed[0]: "The items of a handed over order cannot be changed."}
+                )
+            if self.instance.rental_start and any(
+                field in ("quantity", "size", "rental_item") for field in changed
+            ):
+                raise serializers.ValidationError(
+                    {changed[0]: "Booked rentals cannot change item, size or quantity."}
+                )
+            if "rental_start" in attrs:
+                raise serializers.ValidationError(
+                    {"rental_start": "Rental dates can only be set when ordering."}
+                )
+            # An edit to what was ordered (or to the price) is priced afresh
+            if any(field in attrs for field in PRICE_INPUTS + PRICE_FIELDS):
+                line = {
+                    field: attrs.get(field, getattr(self.instance, field))
+                    for field in PRICE_INPUTS
+                }
+                apply_price(attrs, line)
+            return attrs
+
+        return check_new_order(attrs)
+
     def get_product_type(self, obj):
-        # 1️⃣ RENTAL (highest priority)
-        if obj.rental_item or (obj.rental_days and obj.rental_days > 0):
-            return "rental"
+        """Label derived from the order_type stored at creation time."""
+        return PRODUCT_TYPE_LABELS.get(obj.order_type, "other")
 
-        # 2️⃣ ACCESSORY
-        if obj.accessory:
-            return "accessory"
+    def create(self, validated_data):
+        request = self.context.get("request")
+        user = validated_data.pop("user", None)
+        if request and hasattr(request, "user"):
+            user = request.user
+        # A single order is a one-line placement
+        return place_orders(user, [validated_data])[0]
 
-        # 3️⃣ INNERWEAR
-        if obj.innerwear:
-            return "innerwear"
+    def update(self, instance, validated_data):
+        # Re-classify only when an edit touches a field the type depends on
+        if any(field in validated_data for field in ORDER_TYPE_FIELDS):
+            current = {
+                field: validated_data.get(field, getattr(instance, field))
+                for field in ORDER_TYPE_FIELDS
+            }
+            validated_data["order_type"] = classify_order_type(current)
 
-        # 4️⃣ CUSTOM (ANY CATEGORY with stitching)
-        if obj.stitch_type and obj.meters and float(obj.meters) > 0:
-            return "custom"
+        if any(field in validated_data for field in ITEM_SOURCES):
+            items = {
+                field: validated_data.get(field, getattr(instance, field))
+                for field in ITEM_SOURCES
+            }
+            validated_data.update(snapshot_for(items))
 
-        # 5️⃣ FABRIC ONLY
-        if obj.fabric and obj.meters and float(obj.meters) > 0:
-            return "fabric"
+        old_type = instance.order_type
+        restock = any(field in validated_data for field in RESERVED_FIELDS)
+        with transaction.atomic():
+            if restock:
+                # ✅ Give back what the order held, then reserve what it holds now;
+                # InsufficientStock rolls the edit back
+                release_order_stock([instance.pk])
+            order = super().update(instance, validated_data)
+            record_order_type_change(old_type, order.order_type)
+            if restock:
+                reserve_order_stock(order, [
+                    source for source in STOCK_SOURCES
+                    if not (order.rental_start and source == "rental_item")
+                ])
+        return order
 
-        # 6️⃣ PRODUCT (traditional or ready-made)
-        if obj.product:
-            category = getattr(obj.product, "category", "").lower()
-            if category == "traditional":
-                return "traditional"
-            return "ready-made"
 
-        return "other"
+class OrderListSerializer(OrderSerializer):
+    """
+    Compact order row for list views.
 
-    def create(self, validated_data):
-        request = self.context.get("request")
+    Reads only the Order columns (item snapshot included) plus the user's
+    name, so listing orders never touches the catalog tables.
+    """
 
-        if request and hasattr(request, "user"):
-            validated_data["user"] = request.user
-            validated_data["customer_name"] = (
-                request.user.get_full_name() or request.user.username
+    class Meta(OrderSerializer.Meta):
+        fields = [
+            field for field in OrderSerializer.Meta.fields
+            if not field.endswith('_details')
+        ]
+
+
+class QuoteLineSerializer(serializers.Serializer):
+    """One cart line to price; items are ids, looked up in bulk by orders.pricing."""
+    product = serializers.IntegerField(required=False, allow_null=True)
+    fabric = serializers.IntegerField(required=False, allow_null=True)
+    rental_item = serializers.IntegerField(required=False, allow_null=True)
+    accessory = serializers.IntegerField(required=False, allow_null=True)
+    innerwear = serializers.IntegerField(required=False, allow_null=True)
+    quantity = serializers.IntegerField(min_value=1, default=1)
+    meters = serializers.DecimalField(max_digits=5, decimal_places=2, min_value=0, default=0)
+    rental_days = serializers.IntegerField(min_value=0, default=0)
+    stitch_type = serializers.ChoiceField(
+        choices=Order.STITCH_CHOICES, required=False, allow_blank=True, allow_null=True
+    )
+
+
+class CheckoutLineSerializer(QuoteLineSerializer):
+    """A cart line as it is ordered: the quote fields plus size, notes and rental dates."""
+    size = serializers.CharField(max_length=10, required=False, allow_blank=True, allow_null=True)
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    rental_start = serializers.DateField(required=False, allow_null=True)
+
+
+class CheckoutSerializer(serializers.ModelSerializer):
+    """
+    A whole cart in one request. Lines name their items by id; they are
+    loaded for the entire cart at once, checked and priced like single
+    orders, and placed together by orders.checkout.place_checkout.
+    """
+    lines = CheckoutLineSerializer(
+        many=True, write_only=True, min_length=1, max_length=CHECKOUT_LINE_LIMIT
+    )
+    orders = OrderListSerializer(source='lines', many=True, read_only=True)
+
+    class Meta:
+        model = Checkout
+        fields = ['id', 'user', 'customer_name', 'total_price', 'created_at', 'lines', 'orders']
+        read_only_fields = ['id', 'user', 'customer_name', 'created_at']
+        # Checked against the sum of the line prices when sent
+        extra_kwargs = {'total_price': {'required': False}}
+
+    def validate_lines(self, lines):
+        catalog = load_checkout_catalog(lines)
+        placed, errors = [], []
+        for line in lines:
+            try:
+                attrs = {field: value for field, value in line.items() if value is not None}
+                attrs.update(resolve_items(line, catalog))
+                placed.append(check_new_order(attrs))
+                errors.append({})
+            except PricingError as exc:
+                errors.append({"non_field_errors": [str(exc)]})
+            except serializers.ValidationError as exc:
+                detail = exc.detail
+                errors.append(detail if isinstance(detail, dict) else {"non_field_errors": detail})
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return placed
+
+    def validate(self, attrs):
+        total = sum(line["total_price"] for line in attrs["lines"])
+        given = attrs.get("total_price")
+        if given is not None and not total_matches(total, given):
+            raise serializers.ValidationError(
+                {"total_price": f"Prices have changed, the current total is {total}."}
             )
+        return attrs
 
-        # ✅ SET product_name from ANY source
-        if validated_data.get("innerwear"):
-            validated_data["product_name"] = validated_data["innerwear"].name
-        elif validated_data.get("accessory"):
-            validated_data["product_name"] = validated_data["accessory"].name
-        elif validated_data.get("fabric"):
-            validated_data["product_name"] = validated_data["fabric"].name
-            validated_data["fabric_name"] = validated_data["fabric"].name
-        elif validated_data.get("rental_item"):
-            validated_data["product_name"] = validated_data["rental_item"].name
-        elif validated_data.get("product"):
-            validated_data["product_name"] = validated_data["product"].name
-
-        return super().create(validated_data)
-
-    def to_representation(self, instance):
-        """Ensure product_name is always current"""
-        data = super().to_representation(instance)
-        
-        # ✅ Update product_name from the actual source
-        if instance.innerwear:
-            data['product_name'] = instance.innerwear.name
-        elif instance.accessory:
-            data['product_name'] = instance.accessory.name
-        elif instance.fabric:
-            data['product_name'] = instance.fabric.name
-        elif instance.rental_item:
-            data['product_name'] = instance.rental_item.name
-        elif instance.product:
-            data['product_name'] = instance.product.name
-        
-        return data
\ No newline at end of file
+    def create(self, validated_data):
+        request = self.context.get("request")
+        user = validated_data.get("user")
+        if request and hasattr(request, "user"):
+            user = request.user
+        return place_checkout(user, validated_data["lines"])
@@ -0,0 +1,59 @@
+# orders/signals.py
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from products.models import (
+    Accessory, Fabric, Innerwear, Product, ProductImage, RentalImage, RentalItem,
+)
+from products.stock import release_order_stock
+
+from .models import Order
+from .snapshots import refresh_item_snapshots
+from .stats import record_order_deleted
+from .utils import HANDED_OVER_STATUSES
+
+ITEM_MODEL_SOURCES = {
+    Product: 'product',
+    Fabric: 'fabric',
+    RentalItem: 'rental_item',
+    Accessory: 'accessory',
+    Innerwear: 'innerwear',
+}
+
+
+def _schedule_refresh(source, item_id):
+    # Runs after commit, rewriting every affected order in one UPDATE.
+    transaction.on_commit(partial(refresh_item_snapshots, source, item_id))
+
+
+@receiver(post_save)
+def refresh_snapshots_on_item_save(sender, instance, created, raw=False, **kwargs):
+    source = ITEM_MODEL_SOURCES.get(sender)
+    if source and not created and not raw:
+        _schedule_refresh(source, instance.pk)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def refresh_snapshots_on_product_image(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _schedule_refresh('product', instance.product_id)
+
+
+@receiver(post_save, sender=RentalImage)
+@receiver(post_delete, sender=RentalImage)
+def refresh_snapshots_on_rental_image(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _schedule_refresh('rental_item', instance.rental_item_id)
+
+
+# Every delete path ends here: the API, the admin (one or many) and
+# cascades from a deleted product, rental item or user.
+@receiver(post_delete, sender=Order)
+def settle_deleted_order(sender, instance, **kwargs):
+    record_order_deleted(instance)
+    if instance.status not in HANDED_OVER_STATUSES:
+        release_order_stock([instance.pk])
@@ -0,0 +1,103 @@
+# orders/snapshots.py
+"""
+Denormalized copy of the ordered catalog item kept on each Order.
+
+The order list renders straight from these columns (product_name,
+item_category, item_image, item_price), so it never joins the catalog
+tables. The snapshot is taken when the order is created and refreshed in
+bulk by orders.signals whenever the catalog item changes.
+"""
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from polo_fashions.images import image_url
+from products.models import ProductImage, RentalImage
+
+# Order FK holding the item, highest priority first. An order pointing at
+# several items (e.g. a product plus a fabric) is described by the first.
+ITEM_SOURCES = ('innerwear', 'accessory', 'fabric', 'rental_item', 'product')
+
+
+def _image_url(image):
+    try:
+        return image_url(image) or ''
+    except ValueError:
+        # Cloudinary is not configured (offline / local media); the rest of
+        # the snapshot is still worth keeping
+        return ''
+
+
+def _first_gallery_image(item):
+    # .all() so a prefetched gallery is reused; ordered by id like .first()
+    images = sorted(item.images.all(), key=lambda img: img.id)
+    return images[0].image if images else None
+
+
+def describe_item(source, item):
+    """Return the snapshot fields for one catalog item."""
+    if source == 'product':
+        category = item.category
+        image = _first_gallery_image(item) or item.image
+        price = item.price
+    elif source == 'rental_item':
+        category = 'rental'
+        image = _first_gallery_image(item) or item.image
+        price = item.price_per_day
+    elif source == 'fabric':
+        category = item.type
+        image = item.image
+        price = item.price
+    elif source == 'accessory':
+        category = item.category
+        image = item.image
+        price = item.price
+    else:
+        category = 'innerwear'
+        image = item.image
+        price = item.price
+
+    return {
+        'product_name': item.name,
+        'item_category': category or '',
+        'item_image': _image_url(image),
+        'item_price': price,
+    }
+
+
+def snapshot_for(data):
+    """
+    Snapshot fields for an order, from validated_data or a model instance
+    (anything exposing the ITEM_SOURCES as attributes or dict keys).
+    """
+    get = data.get if isinstance(data, dict) else lambda name: getattr(data, name)
+    for source in ITEM_SOURCES:
+        item = get(source)
+        if item:
+            return describe_item(source, item)
+    return {}
+
+
+def orders_described_by(queryset, source, item_id):
+    """Orders whose snapshot comes from ``source`` == ``item_id``."""
+    index = ITEM_SOURCES.index(source)
+    higher = {f'{name}__isnull': True for name in ITEM_SOURCES[:index]}
+    return queryset.filter(**{f'{source}_id': item_id}, **higher)
+
+
+def refresh_item_snapshots(source, item_id):
+    """Rewrite the snapshot of every order described by one catalog item."""
+    from .models import Order
+
+    model = Order._meta.get_field(source).related_model
+    items = model.objects.filter(pk=item_id)
+    if source == 'product':
+        items = items.prefetch_related(Prefetch('images', queryset=ProductImage.objects.order_by('id')))
+    elif source == 'rental_item':
+        items = items.prefetch_related(Prefetch('images', queryset=RentalImage.objects.order_by('id')))
+
+    item = items.first()
+    if item is None:
+        return 0
+    return orders_described_by(Order.objects.all(), source, item_id).update(
+        **describe_item(source, item), updated_at=timezone.now()
+    )
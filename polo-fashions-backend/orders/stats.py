@@ -0,0 +1,132 @@
+# orders/stats.py
+"""
+Incrementally maintained order statistics.
+
+Every helper here must be called inside the transaction that writes the
+order, so the rollup tables never drift from the orders they describe.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import DailyOrderRevenue, Order, OrderStat
+
+
+def _bump(model, lookup, **deltas):
+    """Add ``deltas`` to the row matching ``lookup``, creating it if needed."""
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**lookup).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Another transaction created the row first; add on top of it.
+        model.objects.filter(**lookup).update(**changes)
+
+
+def _bump_stat(dimension, key, delta):
+    if delta:
+        _bump(OrderStat, {'dimension': dimension, 'key': key}, count=delta)
+
+
+def record_order_created(order):
+    record_orders_created([order])
+
+
+def record_orders_created(orders):
+    """Count new orders with one bump per bucket, however many lines a checkout has."""
+    for status, count in Counter(order.status for order in orders).items():
+        _bump_stat('status', status, count)
+    for order_type, count in Counter(order.order_type for order in orders).items():
+        _bump_stat('order_type', order_type, count)
+    days = defaultdict(lambda: [0, Decimal('0.00')])
+    for order in orders:
+        days[order.order_date][0] += 1
+        days[order.order_date][1] += order.total_price
+    for date, (count, revenue) in days.items():
+        _bump(DailyOrderRevenue, {'date': date}, order_count=count, revenue=revenue)
+
+
+def record_order_deleted(order):
+    _bump_stat('status', order.status, -1)
+    _bump_stat('order_type', order.order_type, -1)
+    _bump(DailyOrderRevenue, {'date': order.order_date},
+          order_count=-1, revenue=-order.total_price)
+
+
+def record_status_change(old_status, new_status, count=1):
+    if old_status == new_status:
+        return
+    _bump_stat('status', old_status, -count)
+    _bump_stat('status', new_status, count)
+
+
+def record_order_type_change(old_type, new_type, count=1):
+    if old_type == new_type:
+        return
+    _bump_stat('order_type', old_type, -count)
+    _bump_stat('order_type', new_type, count)
+
+
+def record_revenue_change(order_date, delta):
+    if delta:
+        _bump(DailyOrderRevenue, {'date': order_date}, revenue=delta)
+
+
+@transaction.atomic
+def rebuild_order_stats():
+    """Recompute every rollup row from the orders table."""
+    OrderStat.objects.all().delete()
+    DailyOrderRevenue.objects.all().delete()
+
+    orders = Order.objects.order_by()
+    buckets = {
+        ('status', key): 0 for key, _ in Order.STATUS_CHOICES
+    } | {
+        ('order_type', key): 0 for key, _ in Order.ORDER_TYPE_CHOICES
+    }
+    for dimension in ('status', 'order_type'):
+        for row in orders.values(dimension).annotate(n=Count('id')):
+            buckets[(dimension, row[dimension])] = row['n']
+    # Zero buckets are kept so later bumps are a plain UPDATE, never an INSERT
+    OrderStat.objects.bulk_create(
+        OrderStat(dimension=dimension, key=key, count=count)
+        for (dimension, key), count in buckets.items()
+    )
+
+    DailyOrderRevenue.objects.bulk_create(
+        DailyOrderRevenue(
+            date=row['order_date'],
+            order_count=row['n'],
+            revenue=row['total'] or Decimal('0.00'),
+        )
+        for row in orders.values('order_date').annotate(n=Count('id'), total=Sum('total_price'))
+    )
+
+
+def read_order_stats(days=30):
+    """Serve the dashboard numbers straight from the rollup tables."""
+    counts = {
+        'status': {key: 0 for key, _ in Order.STATUS_CHOICES},
+        'order_type': {key: 0 for key, _ in Order.ORDER_TYPE_CHOICES},
+    }
+    for stat in OrderStat.objects.all():
+        counts.setdefault(stat.dimension, {})[stat.key] = stat.count
+
+    since = timezone.localdate() - timedelta(days=days - 1)
+    daily = DailyOrderRevenue.objects.filter(date__gte=since).order_by('date')
+
+    return {
+        'total_orders': sum(counts['status'].values()),
+        'status': counts['status'],
+        'order_type': counts['order_type'],
+        'daily_revenue': [
+            {'date': day.date, 'orders': day.order_count, 'revenue': str(day.revenue)}
+            for day in daily
+        ],
+    }
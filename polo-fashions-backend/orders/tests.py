@@ -1,3 +1,1175 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
 
-# Create your tests here.
+import cloudinary
+from asgiref.sync import sync_to_async
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from polo_fashions.sync import encode_sync_cursor
+from products.models import (
+    Accessory, Fabric, Innerwear, Product, ProductImage, RentalImage, RentalItem, StockLevel,
+    StockMovement,
+)
+from products.stock import InsufficientStock, reserve_stock, set_stock, stock_levels
+from .admin import OrderAdmin
+from .serializers import CheckoutSerializer, OrderSerializer
+from .events import get_broker, issue_stream_ticket, redeem_stream_ticket
+from .models import Checkout, Order, RentalReservation
+from .rentals import release_rentals
+from .stats import read_order_stats, rebuild_order_stats
+from .transitions import apply_transition, bulk_transition
+from .utils import ORDER_STATUS_FLOW
+
+User = get_user_model()
+
+
+class OrderTestMixin:
+    """Shared catalog + user fixtures for order tests."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # Image URLs are built locally, but cloudinary refuses to without a cloud name.
+        if not cloudinary.config().cloud_name:
+            cloudinary.config(cloud_name='polo-test')
+        cls.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='pass', role='admin'
+        )
+        cls.customer = User.objects.create_user(
+            username='customer', email='customer@example.com', password='pass',
+            first_name='Ravi', last_name='Kumar',
+        )
+        cls.product = Product.objects.create(
+            name='Ramraj Dhoti', category='traditional', type='readymade',
+            description='Dhoti', image='products/dhoti', price=Decimal('999.00'),
+            sizes=['M', 'L'],
+        )
+        ProductImage.objects.create(product=cls.product, image='products/dhoti_1')
+        ProductImage.objects.create(product=cls.product, image='products/dhoti_2')
+        cls.fabric = Fabric.objects.create(
+            name='Linen', type='linen', color='White', price=Decimal('450.00'),
+            image='fabrics/linen',
+        )
+        cls.rental_item = RentalItem.objects.create(
+            name='Sherwani', sizes=['M', 'L'], color='Gold',
+            price_per_day=Decimal('500.00'), deposit_amount=Decimal('2000.00'),
+            image='rentals/sherwani',
+        )
+        RentalImage.objects.create(rental_item=cls.rental_item, image='rentals/sherwani_1')
+        cls.accessory = Accessory.objects.create(
+            name='Leather Belt', category='belt', price=Decimal('299.00'),
+            image='accessories/belt',
+        )
+        cls.innerwear = Innerwear.objects.create(
+            name='Vest', sizes=['M'], price=Decimal('199.00'), image='innerwear/vest',
+        )
+
+    def make_orders(self, count, user=None):
+        user = user or self.customer
+        items = [
+            {'product': self.product, 'size': 'M'},
+            {'fabric': self.fabric, 'meters': Decimal('2.50')},
+            {'rental_item': self.rental_item, 'rental_days': 3},
+            {'accessory': self.accessory},
+            {'innerwear': self.innerwear},
+        ]
+        orders = []
+        for i in range(count):
+            orders.append(Order.objects.create(
+                user=user,
+                customer_name=user.get_full_name() or user.username,
+                product_name='item',
+                total_price=Decimal('100.00'),
+                **items[i % len(items)],
+            ))
+        return orders
+
+
+class OrderListQueryBudgetTests(OrderTestMixin, TestCase):
+    # ETag version check + one orders+user query (the list renders from the
+    # item snapshot, no catalog joins)
+    LIST_QUERY_BUDGET = 2
+    # ETag version check + catalog versions + joined order + two galleries
+    DETAIL_QUERY_BUDGET = 5
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def assert_list_within_budget(self, user, expected_rows):
+        self.client.force_authenticate(user)
+        with self.assertNumQueries(self.LIST_QUERY_BUDGET):
+            response = self.client.get('/api/orders/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), expected_rows)
+        return response
+
+    def test_admin_list_query_count_is_constant(self):
+        self.make_orders(5)
+        self.assert_list_within_budget(self.admin, 5)
+        self.make_orders(25)
+        self.assert_list_within_budget(self.admin, 30)
+
+    def test_customer_list_query_count_is_constant(self):
+        self.make_orders(10)
+        self.make_orders(10, user=self.admin)
+        self.assert_list_within_budget(self.customer, 10)
+
+    def test_list_sql_does_not_join_catalog_tables(self):
+        self.make_orders(5)
+        self.client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/orders/')
+        self.assertNotIn('products_', ctx.captured_queries[-1]['sql'])
+
+    def test_product_details_uses_first_gallery_image(self):
+        order = self.make_orders(1)[0]
+        self.client.force_authenticate(self.admin)
+        with self.assertNumQueries(self.DETAIL_QUERY_BUDGET - 1):  # no rental gallery
+            response = self.client.get(f'/api/orders/{order.id}/')
+        details = response.data['product_details']
+        self.assertEqual(details['name'], 'Ramraj Dhoti')
+        self.assertIn('products/dhoti_1', details['image'])
+
+
+class OrderCursorPaginationTests(OrderTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_unpaginated_without_page_params(self):
+        self.make_orders(3)
+        response = self.client.get('/api/orders/')
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 3)
+
+    def test_cursor_walks_every_order_once(self):
+        orders = self.make_orders(7)
+        seen = []
+        url = '/api/orders/?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, sorted((o.id for o in orders), reverse=True))
+
+
+class OrderListFilterTests(OrderTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_filters_by_status_and_type(self):
+        orders = self.make_orders(5)
+        Order.objects.filter(pk=orders[0].pk).update(status='processing', order_type='traditional')
+        response = self.client.get('/api/orders/?status=processing,placed&order_type=traditional')
+        self.assertEqual([o['id'] for o in response.data], [orders[0].id])
+
+    def test_search_matches_customer_or_product_name(self):
+        orders = self.make_orders(3)
+        Order.objects.filter(pk=orders[1].pk).update(product_name='Silk Kurta')
+        response = self.client.get('/api/orders/?search=kurta')
+        self.assertEqual([o['id'] for o in response.data], [orders[1].id])
+        response = self.client.get('/api/orders/?search=ravi')
+        self.assertEqual(len(response.data), 3)
+
+    def test_user_and_date_filters(self):
+        self.make_orders(2)
+        self.make_orders(1, user=self.admin)
+        response = self.client.get(f'/api/orders/?user={self.admin.id}&date_from=2000-01-01')
+        self.assertEqual(len(response.data), 1)
+        response = self.client.get('/api/orders/?date_to=2000-01-01')
+        self.assertEqual(response.data, [])
+
+    def test_rejects_bad_filter_values(self):
+        self.assertEqual(self.client.get('/api/orders/?status=lost').status_code, 400)
+        self.assertEqual(self.client.get('/api/orders/?date_from=yesterday').status_code, 400)
+        self.assertEqual(self.client.get('/api/orders/?date_from=2024-02-30').status_code, 400)
+
+
+class OrderStatsRollupTests(OrderTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def create_order_via_api(self):
+        self.client.force_authenticate(self.customer)
+        response = self.client.post('/api/orders/', {
+            'accessory': self.accessory.id, 'quantity': 1, 'total_price': '299.00',
+        })
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+
+    def test_stats_follow_creation_and_status_updates(self):
+        order_id = self.create_order_via_api()
+        self.create_order_via_api()
+
+        self.client.force_authenticate(self.admin)
+        self.client.patch(f'/api/orders/{order_id}/update-status/', {'status': 'processing'})
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/orders/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_orders'], 2)
+        self.assertEqual(response.data['status']['placed'], 1)
+        self.assertEqual(response.data['status']['processing'], 1)
+        self.assertEqual(response.data['daily_revenue'][-1]['revenue'], '598.00')
+
+    def test_rebuild_matches_incremental_rollup(self):
+        order_id = self.create_order_via_api()
+        self.client.force_authenticate(self.admin)
+        self.client.patch(f'/api/orders/{order_id}/update-status/', {'status': 'processing'})
+        incremental = read_order_stats()
+        rebuild_order_stats()
+        self.assertEqual(read_order_stats(), incremental)
+
+    def test_stats_admin_only(self):
+        self.client.force_authenticate(self.customer)
+        self.assertEqual(self.client.get('/api/orders/stats/').status_code, 403)
+
+    def assert_rollup_matches_rebuild(self):
+        incremental = read_order_stats()
+        rebuild_order_stats()
+        self.assertEqual(read_order_stats(), incremental)
+
+    def test_admin_edits_and_deletes_keep_the_rollup(self):
+        set_stock(self.accessory, 3)
+        order_ids = [self.create_order_via_api() for _ in range(3)]
+        model_admin = OrderAdmin(Order, admin.site)
+
+        order = Order.objects.get(pk=order_ids[0])
+        order.status, order.total_price = 'processing', Decimal('250.00')
+        model_admin.save_model(None, order, None, change=True)
+        model_admin.delete_model(None, Order.objects.get(pk=order_ids[1]))
+        model_admin.delete_queryset(None, Order.objects.filter(pk=order_ids[2]))
+
+        self.assertEqual(read_order_stats()['total_orders'], 1)
+        self.assertEqual(stock_levels(self.accessory), {'': 2})
+        self.assert_rollup_matches_rebuild()
+
+    def test_cascade_deletes_keep_the_rollup(self):
+        set_stock(self.accessory, 3)
+        order_id = self.create_order_via_api()
+        self.make_orders(2, user=self.admin)  # a product order and a fabric order
+        rebuild_order_stats()
+
+        self.customer.delete()
+        self.assertFalse(Order.objects.filter(pk=order_id).exists())
+        self.assertEqual(stock_levels(self.accessory), {'': 3})
+        self.product.delete()
+        self.assertEqual(read_order_stats()['total_orders'], 1)
+        self.assert_rollup_matches_rebuild()
+
+
+class OrderTypeClassificationTests(OrderTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+
+    def create(self, **payload):
+        response = self.client.post('/api/orders/', payload)
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data
+
+    def test_order_type_is_stored_at_creation(self):
+        cases = [
+            ({'rental_item': self.rental_item.id, 'rental_days': 2}, 'rental', 'rental'),
+            ({'accessory': self.accessory.id}, 'accessory', 'accessory'),
+            ({'innerwear': self.innerwear.id}, 'innerwear', 'innerwear'),
+            ({'fabric': self.fabric.id, 'meters': '2.00', 'stitch_type': 'shirt'},
+             'fabric_with_stitching', 'custom'),
+            ({'fabric': self.fabric.id, 'meters': '2.00'}, 'fabric_only', 'fabric'),
+            ({'product': self.product.id, 'size': 'M'}, 'traditional', 'traditional'),
+        ]
+        for payload, order_type, product_type in cases:
+            with self.subTest(order_type=order_type):
+                data = self.create(**payload)
+                self.assertEqual(data['order_type'], order_type)
+                self.assertEqual(data['product_type'], product_type)
+                self.assertEqual(Order.objects.get(pk=data['id']).order_type, order_type)
+
+    def test_edit_reclassifies_order(self):
+        data = self.create(fabric=self.fabric.id, meters='2.00')
+        response = self.client.patch(f"/api/orders/{data['id']}/", {'stitch_type': 'pant'})
+        self.assertEqual(response.data['order_type'], 'fabric_with_stitching')
+
+
+class OrderItemSnapshotTests(OrderTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+
+    def test_snapshot_taken_at_creation(self):
+        response = self.client.post('/api/orders/', {
+            'product': self.product.id, 'size': 'M', 'total_price': '999.00',
+        })
+        order = Order.objects.get(pk=response.data['id'])
+        self.assertEqual(order.product_name, 'Ramraj Dhoti')
+        self.assertEqual(order.item_category, 'traditional')
+        self.assertIn('products/dhoti_1', order.item_image)
+        self.assertEqual(order.item_price, Decimal('999.00'))
+
+    def test_catalog_changes_refresh_snapshots(self):
+        response = self.client.post('/api/orders/', {
+            'accessory': self.accessory.id, 'total_price': '299.00',
+        })
+        order_id = response.data['id']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.accessory.name = 'Braided Belt'
+            self.accessory.price = Decimal('349.00')
+            self.accessory.save()
+        order = Order.objects.get(pk=order_id)
+        self.assertEqual(order.product_name, 'Braided Belt')
+        self.assertEqual(order.item_price, Decimal('349.00'))
+
+    def test_gallery_changes_refresh_product_image(self):
+        order = self.make_orders(1)[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.images.order_by('id').first().delete()
+        order.refresh_from_db()
+        self.assertIn('products/dhoti_2', order.item_image)
+
+
+class OrderPricingTests(OrderTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+        self.shirt = Product.objects.create(
+            name='Oxford Shirt', category='shirts', type='readymade',
+            image='products/oxford', price=Decimal('1299.00'), sizes=['M'],
+        )
+        RentalItem.objects.filter(pk=self.rental_item.pk).update(buy_price=Decimal('4000.00'))
+
+    def cases(self):
+        return [
+            ({'product': self.shirt.id, 'quantity': 2}, 'ready_made', '2598.00'),
+            ({'product': self.product.id, 'stitch_type': 'both'}, 'traditional', '1549.00'),
+            ({'fabric': self.fabric.id, 'meters': '2.50'}, 'fabric_only', '1125.00'),
+            ({'fabric': self.fabric.id, 'meters': '2.00', 'stitch_type': 'shirt'},
+             'fabric_with_stitching', '1250.00'),
+            ({'rental_item': self.rental_item.id, 'rental_days': 2}, 'rental', '3000.00'),
+            ({'rental_item': self.rental_item.id}, 'rental_buy', '4000.00'),
+            ({'accessory': self.accessory.id, 'quantity': 3}, 'accessory', '897.00'),
+            ({'innerwear': self.innerwear.id}, 'innerwear', '199.00'),
+        ]
+
+    def test_every_order_type_is_priced_on_the_server(self):
+        for payload, order_type, total in self.cases():
+            with self.subTest(order_type=order_type):
+                response = self.client.post('/api/orders/', payload)
+                self.assertEqual(response.status_code, 201, response.data)
+                self.assertEqual(response.data['order_type'], order_type)
+                self.assertEqual(response.data['total_price'], total)
+
+    def test_stale_or_tampered_totals_are_rejected(self):
+        response = self.client.post('/api/orders/', {
+            'accessory': self.accessory.id, 'total_price': '1.00',
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('299.00', str(response.data['total_price']))
+        response = self.client.post('/api/orders/', {
+            'fabric': self.fabric.id, 'meters': '2.00', 'stitch_type': 'shirt',
+            'total_price': '1250.00',
+        })
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['stitching_charge'], '350.00')
+        self.assertEqual(response.data['fabric_price_per_meter'], '450.00')
+        # Options an item doesn't offer can't be priced
+        response = self.client.post('/api/orders/', {
+            'product': self.shirt.id, 'stitch_type': 'dhoti',
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_edits_are_priced_again(self):
+        order_id = self.client.post('/api/orders/', {'accessory': self.accessory.id}).data['id']
+        url = f'/api/orders/{order_id}/'
+        response = self.client.patch(url, {'total_price': '1.00', 'quantity': 50})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.patch(url, {'total_price': '1.00'}).status_code, 400)
+
+        response = self.client.patch(url, {'quantity': 3})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['total_price'], '897.00')
+        # Swapping the item takes the new item's price
+        response = self.client.patch(url, {'accessory': '', 'innerwear': self.innerwear.id})
+        self.assertEqual(response.data['total_price'], '597.00')
+        self.assertEqual(read_order_stats(days=1)['daily_revenue'][-1]['revenue'], '597.00')
+        # Edits that don't touch the price leave it alone
+        response = self.client.patch(url, {'notes': 'Gift wrap'})
+        self.assertEqual(response.data['total_price'], '597.00')
+
+    def test_quote_prices_a_cart_in_one_query_per_item_type(self):
+        lines = [payload for payload, _, _ in self.cases()]
+        lines.append({'accessory': 999999})
+        client = APIClient()
+        # product, fabric, rental item, accessory, innerwear
+        with self.assertNumQueries(5):
+            response = client.post('/api/orders/quote/', {'lines': lines}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        quoted = response.data['lines']
+        for (_, order_type, total), line in zip(self.cases(), quoted):
+            self.assertEqual((line['order_type'], line['total_price']), (order_type, total))
+        self.assertEqual(quoted[-1], {'error': 'Unknown accessory 999999'})
+        self.assertFalse(response.data['valid'])
+        self.assertEqual(response.data['total'], '14618.00')
+
+    def test_quote_validates_the_cart(self):
+        client = APIClient()
+        for body in ({}, {'lines': []}, {'lines': [{'accessory': 'belt'}]},
+                     {'lines': [{'accessory': self.accessory.id, 'quantity': 0}]},
+                     {'lines': [{'accessory': self.accessory.id}] * 51}):
+            with self.subTest(body=str(body)[:40]):
+                response = client.post('/api/orders/quote/', body, format='json')
+                self.assertEqual(response.status_code, 400)
+
+    def test_order_forms_read_the_stitching_charges(self):
+        config = APIClient().get('/api/orders/config/').data
+        self.assertEqual(config['stitching_charges'], {'shirt': '350.00', 'pant': '450.00', 'kurta': '400.00'})
+        self.assertEqual(config['traditional_stitching_charges']['both'], '550.00')
+        # What the form shows is what the server charges
+        line = {'fabric': self.fabric.id, 'meters': '1.00', 'stitch_type': 'kurta'}
+        quoted = APIClient().post('/api/orders/quote/', {'lines': [line]}, format='json')
+        self.assertEqual(quoted.data['lines'][0]['stitching_charge'], config['stitching_charges']['kurta'])
+
+
+class CheckoutTests(OrderTestMixin, TestCase):
+    url = '/api/orders/checkout/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+
+    def cart(self, copies=1):
+        return [
+            {'fabric': self.fabric.id, 'meters': '2.00', 'stitch_type': 'shirt'},
+            {'accessory': self.accessory.id, 'quantity': 2},
+            {'innerwear': self.innerwear.id, 'size': 'M'},
+        ] * copies
+
+    def test_cart_is_placed_as_one_checkout(self):
+        response = self.client.post(self.url, {'lines': self.cart(), 'total_price': '2047.00'},
+                                    format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        checkout = Checkout.objects.get()
+        self.assertEqual((checkout.user, checkout.total_price), (self.customer, Decimal('2047.00')))
+        self.assertEqual(
+            [(line['order_type'], line['total_price']) for line in response.data['orders']],
+            [('fabric_with_stitching', '1250.00'), ('accessory', '598.00'), ('innerwear', '199.00')],
+        )
+        orders = Order.objects.filter(checkout=checkout)
+        self.assertEqual(orders.count(), 3)
+        self.assertEqual(set(orders.values_list('customer_name', flat=True)), {'Ravi Kumar'})
+        self.assertEqual(orders.get(innerwear=self.innerwear).product_name, 'Vest')
+        # The rollups count every line, and match a full rebuild
+        stats = read_order_stats()
+        self.assertEqual(stats['status']['placed'], 3)
+        rebuild_order_stats()
+        self.assertEqual(read_order_stats(), stats)
+
+    def test_lines_are_validated_against_one_catalog_load(self):
+        def validation_queries(lines):
+            serializer = CheckoutSerializer(data={'lines': lines})
+            with CaptureQueriesContext(connection) as queries:
+                self.assertTrue(serializer.is_valid(), serializer.errors)
+            return len(queries)
+
+        self.assertEqual(validation_queries(self.cart()), validation_queries(self.cart(copies=10)))
+
+    def test_a_sold_out_line_rolls_back_the_cart(self):
+        set_stock(self.accessory, 1)
+        set_stock(self.innerwear, 5, size='M')
+        response = self.client.post(self.url, {'lines': self.cart()}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['available'], 1)
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(Checkout.objects.exists())
+        self.assertEqual(stock_levels(self.innerwear), {'M': 5})
+        self.assertEqual(read_order_stats()['status']['placed'], 0)
+
+    def test_invalid_lines_are_reported_per_line(self):
+        lines = self.cart() + [{'accessory': 999999}, {'product': self.product.id, 'stitch_type': 'pant'}]
+        response = self.client.post(self.url, {'lines': lines}, format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.data['lines']
+        self.assertEqual(errors[:3], [{}, {}, {}])
+        self.assertIn('Unknown accessory', str(errors[3]))
+        self.assertIn('pant', str(errors[4]))
+
+        for body in ({'lines': []}, {'lines': self.cart(), 'total_price': '99.00'},
+                     {'lines': self.cart(copies=17)}):
+            with self.subTest(body=str(body)[:40]):
+                response = self.client.post(self.url, body, format='json')
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+
+class BulkStatusUpdateTests(OrderTestMixin, TestCase):
+    url = '/api/orders/bulk-update-status/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_moves_valid_orders_and_reports_the_rest(self):
+        orders = self.make_orders(5)  # product, fabric, rental, accessory, innerwear
+        Order.objects.filter(pk__in=[o.pk for o in orders[:2]]).update(status='stitching')
+        Order.objects.filter(pk=orders[2].pk).update(status='ironing')
+        rebuild_order_stats()
+
+        # savepoint, locked read, one UPDATE in its own savepoint, two rollup buckets, release
+        with self.assertNumQueries(8):
+            response = self.client.post(self.url, {
+                'order_ids': [orders[0].id, orders[1].id, orders[2].id, 999999],
+                'status': 'buttoning',
+            }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 2)
+        results = {r['order_id']: r for r in response.data['results']}
+        self.assertTrue(results[orders[0].id]['success'])
+        self.assertIn('Invalid status transition', results[orders[2].id]['error'])
+        self.assertEqual(results[999999]['error'], 'Order not found')
+        self.assertEqual(
+            list(Order.objects.filter(status='buttoning').order_by('id').values_list('id', flat=True)),
+            [orders[0].id, orders[1].id],
+        )
+
+    def test_orders_moved_since_the_read_are_reported(self):
+        orders = self.make_orders(2)
+        rebuild_order_stats()
+        state = {'read': False, 'interfered': False}
+
+        def another_admin(execute, sql, params, many, context):
+            # Between the read and the UPDATE, someone else moves the first order
+            if state['read'] and not state['interfered'] and sql.startswith('SAVEPOINT'):
+                state['interfered'] = True
+                Order.objects.filter(pk=orders[0].pk).update(status='processing')
+            state['read'] = state['read'] or sql.startswith('SELECT')
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(another_admin):
+            results = bulk_transition(Order.objects.all(), [o.id for o in orders], 'processing')
+
+        self.assertTrue(state['interfered'])
+        self.assertFalse(results[0]['success'])
+        self.assertIn('updated by someone else', results[0]['error'])
+        self.assertTrue(results[1]['success'])
+        # Only the order this call moved is counted
+        self.assertEqual(read_order_stats()['status'].get('processing'), 1)
+
+    def test_rental_only_status_rejected_for_other_orders(self):
+        orders = self.make_orders(3)
+        Order.objects.update(status='picked_up')
+        response = self.client.post(self.url, {
+            'order_ids': [o.id for o in orders], 'status': 'returned',
+        }, format='json')
+        results = {r['order_id']: r for r in response.data['results']}
+        self.assertTrue(results[orders[2].id]['success'])  # the rental order
+        self.assertEqual(
+            results[orders[0].id]['error'], 'This status is only allowed for rental orders'
+        )
+
+    def test_validates_payload_and_role(self):
+        response = self.client.post(self.url, {'order_ids': 'all', 'status': 'buttoning'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(self.url, {'order_ids': [1], 'status': 'lost'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.client.force_authenticate(self.customer)
+        response = self.client.post(self.url, {'order_ids': [1], 'status': 'buttoning'}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class UpdateStatusCompareAndSetTests(OrderTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def update(self, order, new_status):
+        return self.client.patch(f'/api/orders/{order.id}/update-status/', {'status': new_status})
+
+    def test_success_is_a_single_conditional_update(self):
+        order = self.make_orders(1)[0]
+        rebuild_order_stats()
+        # savepoint, UPDATE ... WHERE status='placed', two rollup buckets, release
+        with self.assertNumQueries(5):
+            response = self.update(order, 'processing')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['old_status'], 'placed')
+
+    def test_illegal_or_unknown_transition_is_a_bad_request(self):
+        order = self.make_orders(1)[0]
+        self.assertEqual(self.update(order, 'processing').status_code, 200)
+        response = self.update(order, 'processing')  # second admin, same old status
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['current_status'], 'processing')
+        self.assertEqual(self.update(order, 'picked_up').status_code, 400)
+        self.assertEqual(self.update(order, 'teleported').status_code, 400)
+
+    def test_order_moved_under_the_update_is_a_conflict(self):
+        order = self.make_orders(1)[0]
+        moved = []
+
+        def move_after_update(execute, sql, params, many, context):
+            # Another admin moves the order between the UPDATE and the re-read
+            result = execute(sql, params, many, context)
+            if sql.startswith('UPDATE') and not moved:
+                moved.append(True)
+                Order.objects.filter(pk=order.pk).update(status='processing')
+            return result
+
+        with connection.execute_wrapper(move_after_update):
+            response = self.update(order, 'stitching')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['current_status'], 'processing')
+
+    def test_rental_only_and_missing_orders(self):
+        order = self.make_orders(1)[0]
+        Order.objects.filter(pk=order.pk).update(status='picked_up')
+        self.assertEqual(self.update(order, 'returned').status_code, 400)
+        response = self.client.patch('/api/orders/999999/update-status/', {'status': 'processing'})
+        self.assertEqual(response.status_code, 404)
+
+
+class ConcurrentStatusUpdateStressTests(OrderTestMixin, TransactionTestCase):
+    """Many threads race the same orders through the flow at once."""
+    THREADS = 8
+    ROUNDS = 5
+
+    def setUp(self):
+        self.setUpTestData()
+        self.orders = self.make_orders(3)
+        rebuild_order_stats()
+
+    def race(self, order_id, new_status):
+        return self.race_calls(apply_transition, order_id, new_status)
+
+    def race_calls(self, func, *args):
+        barrier = threading.Barrier(self.THREADS)
+        outcomes = []
+
+        def worker():
+            barrier.wait()
+            while True:
+                try:
+                    outcomes.append(func(*args))
+                    break
+                except OperationalError:
+                    # SQLite reports a busy database instead of waiting; try again
+                    continue
+                finally:
+                    connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes
+
+    def test_exactly_one_winner_per_transition(self):
+        path = ['processing', 'stitching', 'buttoning', 'ironing', 'ready_for_pickup']
+        for order in self.orders:
+            previous = 'placed'
+            for new_status in path[:self.ROUNDS]:
+                outcomes = self.race(order.id, new_status)
+                winners = [o for o in outcomes if o is not None]
+                self.assertEqual(winners, [previous])
+                self.assertIn(new_status, ORDER_STATUS_FLOW[previous])
+                previous = new_status
+            self.assertEqual(Order.objects.get(pk=order.pk).status, previous)
+
+        # No lost or double-counted transitions in the rollup either
+        incremental = read_order_stats()
+        rebuild_order_stats()
+        self.assertEqual(read_order_stats(), incremental)
+
+    def test_bulk_moves_each_order_once(self):
+        order_ids = [order.id for order in self.orders]
+        outcomes = self.race_calls(bulk_transition, Order.objects.all(), order_ids, 'processing')
+        for order_id in order_ids:
+            wins = [r for results in outcomes for r in results if r['order_id'] == order_id and r['success']]
+            self.assertEqual(len(wins), 1)
+        self.assertEqual(set(Order.objects.values_list('status', flat=True)), {'processing'})
+
+        incremental = read_order_stats()
+        rebuild_order_stats()
+        self.assertEqual(read_order_stats(), incremental)
+
+
+class StockReservationTests(OrderTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+
+    def order(self, **payload):
+        return self.client.post('/api/orders/', payload)
+
+    def test_untracked_items_are_unlimited(self):
+        response = self.order(accessory=self.accessory.id, quantity=50)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertFalse(StockMovement.objects.exists())
+
+    def test_orders_take_units_per_size(self):
+        set_stock(self.product, 3, size='m')
+        set_stock(self.product, 1, size='L')
+        response = self.order(product=self.product.id, size='M', quantity=2)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(stock_levels(self.product), {'L': 1, 'M': 1})
+
+        response = self.order(product=self.product.id, size='M', quantity=2)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['available'], 1)
+        # The rejected order rolled back with its reservation
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(stock_levels(self.product), {'L': 1, 'M': 1})
+
+        response = self.order(product=self.product.id, size='XL')
+        self.assertEqual(response.status_code, 409)
+
+    def test_quantity_must_be_positive(self):
+        response = self.order(accessory=self.accessory.id, quantity=0)
+        self.assertEqual(response.status_code, 400)
+
+    def test_large_orders_drain_several_shards(self):
+        set_stock(self.accessory, 10, shards=4)  # 3 + 3 + 2 + 2
+        response = self.order(accessory=self.accessory.id, quantity=9)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(stock_levels(self.accessory), {'': 1})
+        self.assertEqual(
+            sum(StockLevel.objects.filter(object_id=self.accessory.id).values_list('quantity', flat=True)), 1
+        )
+        with self.assertRaises(InsufficientStock):
+            reserve_stock(self.accessory, 2)
+
+    def test_deleting_an_open_order_restocks(self):
+        set_stock(self.innerwear, 2, size='M')
+        order_id = self.order(innerwear=self.innerwear.id, size='M', quantity=2).data['id']
+        self.assertEqual(stock_levels(self.innerwear), {'M': 0})
+
+        self.client.force_authenticate(self.admin)
+        self.client.delete(f'/api/orders/{order_id}/')
+        self.assertEqual(stock_levels(self.innerwear), {'M': 2})
+        ledger = StockMovement.objects.filter(order_id=order_id).values_list('delta', flat=True)
+        self.assertEqual(sorted(ledger), [-2, 2])
+
+    def test_cancelling_an_order_restocks(self):
+        set_stock(self.accessory, 2)
+        order_id = self.order(accessory=self.accessory.id, quantity=2).data['id']
+        self.assertEqual(stock_levels(self.accessory), {'': 0})
+
+        order = Order.objects.get(pk=order_id)
+        order.status = 'cancelled'
+        OrderAdmin(Order, admin.site).save_model(None, order, None, change=True)
+        self.assertEqual(stock_levels(self.accessory), {'': 2})
+        # Deleting it later gives nothing back twice
+        order.delete()
+        self.assertEqual(stock_levels(self.accessory), {'': 2})
+
+    def test_edits_move_the_reserved_units(self):
+        set_stock(self.accessory, 5)
+        set_stock(self.innerwear, 5, size='M')
+        order_id = self.order(accessory=self.accessory.id).data['id']
+        url = f'/api/orders/{order_id}/'
+
+        response = self.client.patch(url, {'quantity': 50})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Order.objects.get(pk=order_id).quantity, 1)
+        self.assertEqual(stock_levels(self.accessory), {'': 4})
+
+        self.assertEqual(self.client.patch(url, {'quantity': 3}).status_code, 200)
+        self.assertEqual(stock_levels(self.accessory), {'': 2})
+        response = self.client.patch(url, {'accessory': '', 'innerwear': self.innerwear.id, 'size': 'M'})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(stock_levels(self.accessory), {'': 5})
+        self.assertEqual(stock_levels(self.innerwear), {'M': 2})
+
+        self.client.force_authenticate(self.admin)
+        self.client.delete(url)
+        self.assertEqual(stock_levels(self.innerwear), {'M': 5})
+
+    def test_handed_over_orders_keep_their_items(self):
+        order_id = self.order(accessory=self.accessory.id).data['id']
+        Order.objects.filter(pk=order_id).update(status='picked_up')
+        response = self.client.patch(f'/api/orders/{order_id}/', {'quantity': 2})
+        self.assertEqual(response.status_code, 400)
+
+    def test_returned_rentals_restock_once(self):
+        set_stock(self.rental_item, 1, size='L')
+        rental = {'rental_item': self.rental_item.id, 'size': 'L', 'rental_days': 2}
+        order_id = self.order(**rental).data['id']
+        self.assertEqual(self.order(**rental).status_code, 409)
+
+        Order.objects.filter(pk=order_id).update(status='picked_up')
+        apply_transition(order_id, 'returned')
+        self.assertEqual(stock_levels(self.rental_item), {'L': 1})
+
+        # Deleting it afterwards must not count the unit twice
+        self.client.force_authenticate(self.admin)
+        self.client.delete(f'/api/orders/{order_id}/')
+        self.assertEqual(stock_levels(self.rental_item), {'L': 1})
+
+    def test_ledger_sums_to_stock(self):
+        set_stock(self.accessory, 5)
+        set_stock(self.accessory, 8)
+        self.order(accessory=self.accessory.id, quantity=3)
+        ledger = StockMovement.objects.filter(object_id=self.accessory.id, collection='accessories')
+        self.assertEqual(sum(ledger.values_list('delta', flat=True)), 5)
+        self.assertEqual(stock_levels(self.accessory), {'': 5})
+
+    def test_admin_sets_stock_over_the_api(self):
+        url = f'/api/stock/products/{self.product.id}/'
+        self.assertEqual(self.client.put(url, {'size': 'M', 'quantity': 4}, format='json').status_code, 403)
+        self.client.force_authenticate(self.admin)
+        response = self.client.put(url, {'size': 'M', 'quantity': 4}, format='json')
+        self.assertEqual(response.data['stock'], {'M': 4})
+        self.assertEqual(self.client.get(url).data['stock'], {'M': 4})
+        self.assertEqual(self.client.get(f'/api/stock/fabrics/{self.fabric.id}/').status_code, 404)
+
+
+class ConcurrentCheckoutStressTests(OrderTestMixin, TransactionTestCase):
+    """Many threads check out the same stocked item at once; none may oversell."""
+    THREADS = 8
+    STOCK = 20
+
+    def setUp(self):
+        self.setUpTestData()
+
+    def race(self, item, **payload):
+        barrier = threading.Barrier(self.THREADS)
+        outcomes = []
+
+        def worker():
+            barrier.wait()
+            try:
+                while True:
+                    serializer = OrderSerializer(
+                        data=payload,
+                        context={'request': SimpleNamespace(user=self.customer)},
+                    )
+                    serializer.is_valid(raise_exception=True)
+                    try:
+                        serializer.save(user=self.customer)
+                        outcomes.append('placed')
+                    except InsufficientStock:
+                        outcomes.append('sold_out')
+                        return
+                    except OperationalError:
+                        # SQLite reports a busy database instead of waiting; try again
+                        continue
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes
+
+    def test_no_oversell(self):
+        for shards in (1, 4):
+            with self.subTest(shards=shards):
+                Order.objects.all().delete()
+                set_stock(self.accessory, self.STOCK, shards=shards)
+                outcomes = self.race(self.accessory, accessory=self.accessory.id)
+                self.assertEqual(outcomes.count('placed'), self.STOCK)
+                self.assertEqual(outcomes.count('sold_out'), self.THREADS)
+                self.assertEqual(Order.objects.count(), self.STOCK)
+                self.assertEqual(stock_levels(self.accessory), {'': 0})
+
+
+class RentalCalendarTests(OrderTestMixin, TestCase):
+    url = '/api/orders/rental-availability/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+        self.monday = timezone.localdate() + timedelta(days=7)
+
+    def book(self, start, days=3, size='L', **payload):
+        return self.client.post('/api/orders/', {
+            'rental_item': self.rental_item.id, 'size': size, 'rental_days': days,
+            'rental_start': start.isoformat(), **payload,
+        })
+
+    def availability(self, start, end, **params):
+        response = self.client.get(self.url, {
+            'from': start.isoformat(), 'to': end.isoformat(), **params,
+        })
+        self.assertEqual(response.status_code, 200, response.data)
+        return {item['id']: item['sizes'] for item in response.data['items']}
+
+    def test_booking_stores_the_interval(self):
+        response = self.book(self.monday)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['rental_end'], (self.monday + timedelta(days=3)).isoformat())
+        reservation = RentalReservation.objects.get()
+        self.assertEqual((reservation.start, reservation.end, reservation.size),
+                         (self.monday, self.monday + timedelta(days=3), 'L'))
+
+    def test_overlapping_bookings_are_rejected(self):
+        self.assertEqual(self.book(self.monday).status_code, 201)
+        clash = self.book(self.monday + timedelta(days=2))
+        self.assertEqual(clash.status_code, 409)
+        self.assertEqual(Order.objects.count(), 1)
+        # Back-to-back (returned on the day the next one starts) and other sizes are fine
+        self.assertEqual(self.book(self.monday + timedelta(days=3)).status_code, 201)
+        self.assertEqual(self.book(self.monday, size='M').status_code, 201)
+        self.assertEqual(self.book(self.monday, size='XXL').status_code, 409)
+
+    def test_cancelled_rentals_free_their_dates(self):
+        order = Order.objects.get(pk=self.book(self.monday).data['id'])
+        self.assertEqual(self.book(self.monday).status_code, 409)
+
+        order.status = 'cancelled'
+        OrderAdmin(Order, admin.site).save_model(None, order, None, change=True)
+        self.assertFalse(RentalReservation.objects.filter(order=order).exists())
+        self.assertEqual(self.book(self.monday).status_code, 201)
+
+    def test_stocked_units_allow_parallel_bookings(self):
+        set_stock(self.rental_item, 2, size='L')
+        self.assertEqual(self.book(self.monday).status_code, 201)
+        self.assertEqual(self.book(self.monday).status_code, 201)
+        self.assertEqual(self.book(self.monday).status_code, 409)
+        units = RentalReservation.objects.values_list('unit', flat=True)
+        self.assertEqual(sorted(units), [0, 1])
+        # Calendar bookings don't also draw down the unit count
+        self.assertEqual(stock_levels(self.rental_item), {'L': 2})
+
+    def test_database_rejects_double_booked_unit(self):
+        order = Order.objects.get(pk=self.book(self.monday).data['id'])
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            RentalReservation.objects.create(
+                order=order, rental_item=self.rental_item, size='L', unit=0,
+                start=self.monday + timedelta(days=1), end=self.monday + timedelta(days=5),
+            )
+
+    def test_dates_are_validated(self):
+        past = self.book(timezone.localdate() - timedelta(days=1))
+        self.assertEqual(past.status_code, 400)
+        response = self.client.post('/api/orders/', {
+            'accessory': self.accessory.id, 'rental_start': self.monday.isoformat(),
+        })
+        self.assertEqual(response.status_code, 400)
+        order_id = self.book(self.monday).data['id']
+        response = self.client.patch(f'/api/orders/{order_id}/', {
+            'rental_start': (self.monday + timedelta(days=1)).isoformat(),
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def test_availability_over_many_items(self):
+        other = RentalItem.objects.create(
+            name='Kurta Set', sizes=['L'], color='Blue',
+            price_per_day=Decimal('300.00'), deposit_amount=Decimal('1000.00'),
+        )
+        self.book(self.monday)
+        start, end = self.monday - timedelta(days=1), self.monday + timedelta(days=7)
+        with self.assertNumQueries(3):  # items, unit counts, overlapping reservations
+            sizes = self.availability(start, end)
+        self.assertEqual(sizes[self.rental_item.id]['L']['free_units'], 0)
+        self.assertFalse(sizes[self.rental_item.id]['L']['available'])
+        self.assertEqual(
+            sizes[self.rental_item.id]['L']['busy_days'],
+            [self.monday + timedelta(days=i) for i in range(3)],
+        )
+        self.assertTrue(sizes[self.rental_item.id]['M']['available'])
+        self.assertTrue(sizes[other.id]['L']['available'])
+
+        # A range after the return day is free again
+        later = self.availability(self.monday + timedelta(days=3), end, items=str(self.rental_item.id), size='l')
+        self.assertEqual(list(later), [self.rental_item.id])
+        self.assertEqual(later[self.rental_item.id], {
+            'L': {'units': 1, 'free_units': 1, 'available': True, 'busy_days': []},
+        })
+
+    def test_availability_validates_the_range(self):
+        for params in ({'from': '2026-01-05', 'to': '2026-01-01'},
+                       {'from': '2026-02-30', 'to': '2026-03-02'},
+                       {'from': '2026-01-01', 'to': '2026-12-31'},
+                       {'from': '2026-01-01', 'to': '2026-01-02', 'items': 'a,b'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+    def test_return_frees_the_remaining_days(self):
+        order_id = self.book(self.monday, days=5).data['id']
+        release_rentals([order_id], today=self.monday + timedelta(days=2))
+        self.assertEqual(RentalReservation.objects.get().end, self.monday + timedelta(days=2))
+        self.assertEqual(self.book(self.monday + timedelta(days=2)).status_code, 201)
+
+
+class OrderConditionalGetTests(OrderTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_unchanged_list_is_not_modified(self):
+        self.make_orders(3)
+        first = self.client.get('/api/orders/?status=placed')
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(1):  # only the version aggregate
+            again = self.client.get('/api/orders/?status=placed', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertIn('private', again['Cache-Control'])
+
+    def test_status_change_and_query_params_change_the_etag(self):
+        order = self.make_orders(1)[0]
+        etag = self.client.get('/api/orders/')['ETag']
+        self.assertNotEqual(self.client.get('/api/orders/?status=placed')['ETag'], etag)
+        self.client.patch(f'/api/orders/{order.id}/update-status/', {'status': 'processing'})
+        response = self.client.get('/api/orders/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_deleted_orders_are_not_hidden_by_if_modified_since(self):
+        orders = self.make_orders(2)
+        first = self.client.get('/api/orders/')
+        self.assertNotIn('Last-Modified', first)
+        orders[0].delete()
+        response = self.client.get(
+            '/api/orders/', HTTP_IF_MODIFIED_SINCE=http_date((timezone.now() + timedelta(minutes=1)).timestamp())
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_is_per_user(self):
+        self.make_orders(1, user=self.admin)
+        etag = self.client.get('/api/orders/')['ETag']
+        self.client.force_authenticate(self.customer)
+        response = self.client.get('/api/orders/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class OrderDeltaSyncTests(OrderTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.orders = self.make_orders(3)
+        # Pretend the orders were last touched an hour ago
+        Order.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+
+    def test_returns_only_changes_and_tombstones(self):
+        cursor = self.client.get('/api/orders/')['X-Sync-Cursor']
+        changed, deleted, untouched = self.orders
+        self.client.patch(f'/api/orders/{changed.id}/update-status/', {'status': 'processing'})
+        self.client.delete(f'/api/orders/{deleted.id}/')
+
+        response = self.client.get('/api/orders/', {'changed_since': cursor})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([o['id'] for o in response.data['results']], [changed.id])
+        self.assertEqual(response.data['deleted'], [deleted.id])
+        self.assertEqual(response['X-Sync-Cursor'], response.data['cursor'])
+
+    def test_customers_only_see_their_own_tombstones(self):
+        cursor = self.client.get('/api/orders/')['X-Sync-Cursor']
+        admin_order = self.make_orders(1, user=self.admin)[0]
+        admin_order.delete()
+        own_id = self.orders[0].id
+        self.orders[0].delete()
+
+        self.client.force_authenticate(self.customer)
+        response = self.client.get('/api/orders/', {'changed_since': cursor})
+        self.assertEqual(response.data['deleted'], [own_id])
+
+    def test_rejects_bad_and_expired_cursors(self):
+        response = self.client.get('/api/orders/', {'changed_since': 'nonsense'})
+        self.assertEqual(response.status_code, 400)
+        naive = encode_sync_cursor(timezone.now().replace(tzinfo=None))
+        response = self.client.get('/api/orders/', {'changed_since': naive})
+        self.assertEqual(response.status_code, 400)
+        stale = encode_sync_cursor(timezone.now() - timedelta(days=90))
+        response = self.client.get('/api/orders/', {'changed_since': stale})
+        self.assertEqual(response.status_code, 410)
+
+
+@override_settings(ORDER_EVENT_STREAM=True)
+class OrderEventStreamTests(OrderTestMixin, TestCase):
+    async def open_stream(self, user):
+        response = await self.async_client.get(
+            '/api/orders/events/', {'ticket': issue_stream_ticket(user)}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b'retry:'))
+        return stream
+
+    async def next_event(self, stream):
+        chunk = await asyncio.wait_for(anext(stream), timeout=2)
+        data = chunk.decode().split('data: ', 1)[1]
+        return json.loads(data)
+
+    async def test_status_changes_reach_owner_and_admin(self):
+        order = (await sync_to_async(self.make_orders)(1))[0]
+        customer_stream = await self.open_stream(self.customer)
+        admin_stream = await self.open_stream(self.admin)
+
+        def transition():
+            # on_commit hooks belong to the test's (sync) connection thread
+            with self.captureOnCommitCallbacks(execute=True):
+                apply_transition(order.id, 'processing')
+
+        await sync_to_async(transition)()
+
+        for stream in (customer_stream, admin_stream):
+            event = await self.next_event(stream)
+            self.assertEqual(event['order_id'], order.id)
+            self.assertEqual(event['old_status'], 'placed')
+            self.assertEqual(event['new_status'], 'processing')
+        await customer_stream.aclose()
+        await admin_stream.aclose()
+
+    async def test_customers_only_get_their_own_orders(self):
+        subscription = get_broker().subscribe(user_id=self.customer.id)
+        try:
+            get_broker().publish({'type': 'order_status', 'order_id': 1, 'user_id': self.admin.id})
+            get_broker().publish({'type': 'order_status', 'order_id': 2, 'user_id': self.customer.id})
+            event = await asyncio.wait_for(subscription.get(), timeout=2)
+            self.assertEqual(event['order_id'], 2)
+        finally:
+            subscription.close()
+        self.assertNotIn(subscription, get_broker()._subscriptions)
+
+    async def test_requires_a_valid_ticket(self):
+        response = await self.async_client.get('/api/orders/events/', {'ticket': 'bogus'})
+        self.assertEqual(response.status_code, 401)
+        # Access tokens are never taken from the query string
+        token = str(AccessToken.for_user(self.customer))
+        response = await self.async_client.get('/api/orders/events/', {'token': token})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_tickets_are_single_use(self):
+        ticket = issue_stream_ticket(self.customer)
+        response = await self.async_client.get('/api/orders/events/', {'ticket': ticket})
+        self.assertEqual(response.status_code, 200)
+        await response.streaming_content.aclose()
+        response = await self.async_client.get('/api/orders/events/', {'ticket': ticket})
+        self.assertEqual(response.status_code, 401)
+
+    def test_ticket_endpoint(self):
+        client = APIClient()
+        self.assertEqual(client.post('/api/orders/events/ticket/').status_code, 401)
+        client.force_authenticate(self.customer)
+        response = client.post('/api/orders/events/ticket/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(redeem_stream_ticket(response.data['ticket']), self.customer.id)
+
+    @override_settings(ORDER_EVENT_STREAM=False)
+    def test_off_under_wsgi(self):
+        client = APIClient()
+        client.force_authenticate(self.customer)
+        self.assertEqual(client.post('/api/orders/events/ticket/').status_code, 404)
+        response = self.client.get('/api/orders/events/', {'ticket': issue_stream_ticket(self.customer)})
+        self.assertEqual(response.status_code, 404)
+        # The order pages ask first, so they go straight to delta-sync polling
+        self.assertIs(APIClient().get('/api/orders/config/').data['live_updates'], False)
+        with self.settings(ORDER_EVENT_STREAM=True):
+            self.assertIs(APIClient().get('/api/orders/config/').data['live_updates'], True)
@@ -0,0 +1,156 @@
+# orders/transitions.py
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from products.stock import release_order_stock
+
+from .events import publish_status_changes
+from .models import Order
+from .rentals import release_rentals
+from .stats import record_status_change
+from .utils import (
+    ORDER_STATUS_FLOW, RENTAL_ONLY_STATUSES, STOCK_RELEASE_STATUSES, allowed_predecessors,
+)
+
+
+def transition_error(current_status, new_status, rental_days):
+    """Why an order can't move to ``new_status``, or None if it can."""
+    if new_status in RENTAL_ONLY_STATUSES and rental_days == 0:
+        return "This status is only allowed for rental orders"
+    if new_status not in ORDER_STATUS_FLOW.get(current_status, []):
+        return f"Invalid status transition from '{current_status}' to '{new_status}'"
+    return None
+
+
+def _move_orders(order_ids, old_status, new_status):
+    """
+    Move the orders still in ``old_status`` to ``new_status`` and return the
+    ids that moved.
+
+    One conditional UPDATE covers them all; when its rowcount comes up short
+    (another admin moved some since they were read, which select_for_update
+    doesn't prevent on SQLite) it is rolled back and each order is retried
+    with its own compare-and-set, so the winners are known exactly.
+    """
+    filters = {"status": old_status}
+    if new_status in RENTAL_ONLY_STATUSES:
+        filters["rental_days__gt"] = 0
+    now = timezone.now()
+
+    with transaction.atomic():
+        moved = Order.objects.filter(id__in=order_ids, **filters).update(
+            status=new_status, updated_at=now
+        )
+        if moved == len(order_ids):
+            return order_ids
+        transaction.set_rollback(True)
+
+    return [
+        order_id for order_id in order_ids
+        if Order.objects.filter(pk=order_id, **filters).update(status=new_status, updated_at=now)
+    ]
+
+
+def bulk_transition(queryset, order_ids, new_status):
+    """
+    Move every order in ``order_ids`` to ``new_status`` where the flow allows.
+
+    The orders are read (and row-locked) in one query, validated in Python
+    against ORDER_STATUS_FLOW and the rental-only rule, and the valid ones
+    are moved with one conditional UPDATE per current status, all in one
+    transaction. Only orders whose UPDATE matched count as moved; one that
+    changed status after the read is reported as a failure. ``queryset``
+    scopes which orders the caller may touch.
+
+    Returns one result dict per requested id, in request order.
+    """
+    order_ids = list(dict.fromkeys(order_ids))
+    with transaction.atomic():
+        rows = {
+            order_id: (current_status, rental_days, user_id)
+            for order_id, current_status, rental_days, user_id in queryset.select_for_update()
+            .filter(id__in=order_ids)
+            .order_by()
+            .values_list("id", "status", "rental_days", "user_id")
+        }
+
+        errors = {}
+        by_status = defaultdict(list)
+        for order_id in order_ids:
+            if order_id not in rows:
+                errors[order_id] = "Order not found"
+                continue
+            current_status, rental_days, _ = rows[order_id]
+            error = transition_error(current_status, new_status, rental_days)
+            if error:
+                errors[order_id] = error
+            else:
+                by_status[current_status].append(order_id)
+
+        moved_ids = set()
+        for old_status, ids in by_status.items():
+            moved = _move_orders(ids, old_status, new_status)
+            record_status_change(old_status, new_status, len(moved))
+            moved_ids.update(moved)
+            for order_id in set(ids) - set(moved):
+                errors[order_id] = "The order was updated by someone else; reload and try again"
+
+        # Request order, so releases and events happen in a stable order
+        moved_ids = [order_id for order_id in order_ids if order_id in moved_ids]
+        if moved_ids:
+            if new_status in STOCK_RELEASE_STATUSES:
+                release_order_stock(moved_ids)
+                release_rentals(moved_ids)
+            changes = [
+                (order_id, rows[order_id][2], rows[order_id][0], new_status)
+                for order_id in moved_ids
+            ]
+            # robust: a failed publish must not fail the committed transition.
+            # A lambda, not partial(): robust mode logs the callback's __qualname__
+            transaction.on_commit(lambda: publish_status_changes(changes), robust=True)
+
+    return [
+        {"order_id": order_id, "success": False, "error": errors[order_id]}
+        if order_id in errors else
+        {
+            "order_id": order_id,
+            "success": True,
+            "old_status": rows[order_id][0],
+            "new_status": new_status,
+        }
+        for order_id in order_ids
+    ]
+
+
+def apply_transition(order_id, new_status):
+    """
+    Compare-and-set one order to ``new_status``.
+
+    Issues ``UPDATE ... WHERE id = %s AND status = <predecessor>`` for each
+    status the flow allows ``new_status`` to follow (at most two today), so
+    the check and the write are one atomic statement and two admins racing
+    from the same old status cannot both win. No SELECT is needed.
+
+    Returns the previous status on success, or None if no row matched
+    (missing order, illegal transition, or another admin got there first).
+    """
+    filters = {"pk": order_id}
+    if new_status in RENTAL_ONLY_STATUSES:
+        filters["rental_days__gt"] = 0
+
+    with transaction.atomic():
+        for old_status in allowed_predecessors(new_status):
+            updated = Order.objects.filter(status=old_status, **filters).update(
+                status=new_status, updated_at=timezone.now()
+            )
+            if updated:
+                record_status_change(old_status, new_status)
+                if new_status in STOCK_RELEASE_STATUSES:
+                    release_order_stock([order_id])
+                    release_rentals([order_id])
+                changes = [(order_id, None, old_status, new_status)]
+                transaction.on_commit(lambda: publish_status_changes(changes), robust=True)
+                return old_status
+    return None
@@ -1,10 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import OrderViewSet
+from .views import OrderViewSet, order_events, order_events_ticket, rental_availability_view
 
 router = DefaultRouter()
 router.register(r'orders', OrderViewSet, basename='order')
 
 urlpatterns = [
+    # Before the router, which would treat "events" as an order id
+    path('orders/events/', order_events, name='order-events'),
+    path('orders/events/ticket/', order_events_ticket, name='order-events-ticket'),
+    path('orders/rental-availability/', rental_availability_view, name='rental-availability'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
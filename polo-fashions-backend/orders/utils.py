@@ -21,3 +21,71 @@ ORDER_STATUS_FLOW = {
     "deposit_refunded": [],
     "cancelled": [],
 }
+
+# Statuses only valid for orders with rental days
+RENTAL_ONLY_STATUSES = ("returned", "deposit_refunded")
+
+# Statuses after the goods have left the shop; deleting such an order
+# does not put its units back in stock (a returned rental already has)
+HANDED_OVER_STATUSES = ("picked_up", "returned", "deposit_refunded")
+
+# Moving an order to one of these puts its units back in stock and frees
+# the rest of a rental's booked dates: a returned rental, or a cancelled
+# order that never left the shop
+STOCK_RELEASE_STATUSES = ("returned", "cancelled")
+
+
+def allowed_predecessors(new_status):
+    """Statuses an order may move to ``new_status`` from."""
+    return [
+        current for current, allowed_next in ORDER_STATUS_FLOW.items()
+        if new_status in allowed_next
+    ]
+
+
+# Stored Order.order_type -> legacy "product_type" label the frontend shows
+PRODUCT_TYPE_LABELS = {
+    "fabric_only": "fabric",
+    "fabric_with_stitching": "custom",
+    "ready_made": "ready-made",
+    "rental": "rental",
+    "rental_buy": "rental",
+    "accessory": "accessory",
+    "innerwear": "innerwear",
+    "traditional": "traditional",
+}
+
+
+# Order fields classify_order_type() looks at
+ORDER_TYPE_FIELDS = (
+    "rental_item", "rental_days", "accessory", "innerwear",
+    "stitch_type", "meters", "fabric", "product",
+)
+
+
+def classify_order_type(data):
+    """
+    Work out Order.order_type from the order's items.
+
+    ``data`` is anything with a ``get`` (serializer validated_data, a dict
+    of field values). Priority matches what the API has always reported:
+    rental, accessory, innerwear, stitching, fabric, then the product.
+    """
+    meters = data.get("meters") or 0
+
+    if data.get("rental_item") or (data.get("rental_days") or 0) > 0:
+        # A rental item ordered without rental days is bought outright
+        return "rental" if (data.get("rental_days") or 0) > 0 else "rental_buy"
+    if data.get("accessory"):
+        return "accessory"
+    if data.get("innerwear"):
+        return "innerwear"
+    if data.get("stitch_type") and meters > 0:
+        return "fabric_with_stitching"
+    if data.get("fabric") and meters > 0:
+        return "fabric_only"
+
+    product = data.get("product")
+    if product and (product.category or "").lower() == "traditional":
+        return "traditional"
+    return "ready_made"
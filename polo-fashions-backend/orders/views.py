@@ -1,21 +1,73 @@
 from django.shortcuts import render
 
 # Create your views here.
+import asyncio
+import json
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from django.db.models import Count, Max, Prefetch
 from rest_framework import viewsets
-from rest_framework.permissions import IsAuthenticated
-from .models import Order
-from .serializers import OrderSerializer
-from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from polo_fashions.conditional import ConditionalGetMixin
+from polo_fashions.pagination import CreatedAtCursorPagination
+from polo_fashions.sync import DeltaSyncMixin
+from products.models import CatalogVersion, ProductImage, RentalImage, RentalItem
+from products.stock import InsufficientStock
+from .filters import filter_orders
+from .models import Checkout, Order
+from .pricing import STITCHING_CHARGES, TRADITIONAL_STITCHING_CHARGES, price_lines
+from .rentals import MAX_RANGE_DAYS, RentalUnavailable, rental_availability
+from .serializers import (
+    CheckoutSerializer, OrderListSerializer, OrderSerializer, QuoteLineSerializer,
+)
+from .stats import read_order_stats, record_revenue_change
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
-from .utils import ORDER_STATUS_FLOW
+from rest_framework.exceptions import AuthenticationFailed, NotFound
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from .events import get_broker, issue_stream_ticket, redeem_stream_ticket
+from .transitions import apply_transition, bulk_transition, transition_error
+from .utils import RENTAL_ONLY_STATUSES
+
+User = get_user_model()
+
+# Upper bound on orders moved by one bulk-update-status call
+BULK_STATUS_LIMIT = 500
+
+# Upper bound on cart lines priced by one quote call
+QUOTE_LINE_LIMIT = 50
+
+
+def with_order_relations(queryset):
+    """
+    Eager-load everything OrderSerializer's *_details fields touch, so
+    serializing orders costs a fixed number of queries however many rows
+    there are: one joined query for the FKs plus one per image gallery.
+    """
+    return queryset.select_related(
+        'user', 'product', 'fabric', 'rental_item', 'accessory', 'innerwear',
+    ).prefetch_related(
+        Prefetch('product__images', queryset=ProductImage.objects.order_by('id')),
+        Prefetch('rental_item__images', queryset=RentalImage.objects.order_by('id')),
+    )
 
 
 # orders/views.py
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(ConditionalGetMixin, DeltaSyncMixin, viewsets.ModelViewSet):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+    private_cache = True
+    sync_model_label = 'orders.order'
     
     @action(detail=True, methods=["patch"], url_path="update-status")
     def update_status(self, request, pk=None):
@@ -25,7 +77,6 @@ class OrderViewSet(viewsets.ModelViewSet):
                  status=status.HTTP_403_FORBIDDEN
             )
 
-        order = self.get_object()
         new_status = request.data.get("status")
 
         if not new_status:
@@ -34,44 +85,386 @@ class OrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        allowed_next = ORDER_STATUS_FLOW.get(order.status, [])
+        if not str(pk).isdigit():
+            raise NotFound()
 
-        # 🚫 Rental-only protection
-        if new_status in ["returned", "deposit_refunded"] and order.rental_days == 0:
+        # ✅ Hot path: a single conditional UPDATE, no read first
+        old_status = apply_transition(int(pk), new_status)
+        if old_status is not None:
             return Response(
-                {"error": "This status is only allowed for rental orders"},
-                status=status.HTTP_400_BAD_REQUEST
+                {
+                    "success": True,
+                    "order_id": int(pk),
+                    "old_status": old_status,
+                    "new_status": new_status
+                },
+                status=status.HTTP_200_OK
             )
 
-        # 🚫 Invalid transition protection
-        if new_status not in allowed_next:
+        # The UPDATE matched nothing; read the order only to explain why
+        current = Order.objects.filter(pk=pk).values("status", "rental_days").first()
+        if current is None:
+            raise NotFound()
+
+        error = transition_error(current["status"], new_status, current["rental_days"])
+
+        # 🚫 Unknown status, invalid transition or rental-only protection
+        if error:
             return Response(
-                {
-                    "error": f"Invalid status transition from '{order.status}' to '{new_status}'"
-                },
+                {"error": error, "current_status": current["status"]},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        order.status = new_status
-        order.save(update_fields=["status", "updated_at"])
+        # 🚫 The move is legal now, so the order changed under the UPDATE
+        return Response(
+            {
+                "error": "Order status changed while updating, please retry",
+                "current_status": current["status"],
+            },
+            status=status.HTTP_409_CONFLICT
+        )
 
+    @action(detail=False, methods=["post"], url_path="bulk-update-status")
+    def bulk_update_status(self, request):
+        if not request.user.role == "admin":
+            return Response(
+                 {"error": "Only admin can update order status"},
+                 status=status.HTTP_403_FORBIDDEN
+            )
+
+        new_status = request.data.get("status")
+        order_ids = request.data.get("order_ids")
+
+        if new_status not in dict(Order.STATUS_CHOICES):
+            return Response(
+                {"error": "A valid status is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (
+            not isinstance(order_ids, list)
+            or not order_ids
+            or not all(isinstance(i, int) and not isinstance(i, bool) for i in order_ids)
+        ):
+            return Response(
+                {"error": "order_ids must be a non-empty list of order ids"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(order_ids) > BULK_STATUS_LIMIT:
+            return Response(
+                {"error": f"At most {BULK_STATUS_LIMIT} orders can be updated at once"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = bulk_transition(self.get_queryset(), order_ids, new_status)
         return Response(
             {
-                "success": True,
-                "order_id": order.id,
-                "new_status": new_status
+                "new_status": new_status,
+                "updated": sum(1 for r in results if r["success"]),
+                "results": results,
             },
             status=status.HTTP_200_OK
         )
 
+    @action(detail=False, methods=["get"], url_path="stats")
+    def stats(self, request):
+        if not request.user.role == "admin":
+            return Response(
+                {"error": "Only admin can view order stats"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        days = request.query_params.get("days", "30")
+        if not days.isdigit() or not 1 <= int(days) <= 366:
+            return Response(
+                {"error": "days must be a number between 1 and 366"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(read_order_stats(days=int(days)))
+
+    @action(detail=False, methods=["get"], url_path="config", permission_classes=[AllowAny])
+    def config(self, request):
+        """
+        What the order pages need to know up front: whether status changes
+        are pushed (``/api/orders/events/``) or should be polled with the
+        ``changed_since`` delta-sync cursor, and the stitching charges the
+        order forms show, so the prices live only in orders/pricing.py.
+        """
+        return Response({
+            "live_updates": settings.ORDER_EVENT_STREAM,
+            "stitching_charges": {
+                stitch_type: str(charge) for stitch_type, charge in STITCHING_CHARGES.items()
+            },
+            "traditional_stitching_charges": {
+                stitch_type: str(charge)
+                for stitch_type, charge in TRADITIONAL_STITCHING_CHARGES.items()
+            },
+        })
+
+    @action(detail=False, methods=["post"], url_path="quote", permission_classes=[AllowAny])
+    def quote(self, request):
+        """
+        Price a cart: ``{"lines": [{"product": 1, "quantity": 2}, ...]}``.
+        Every line gets its price (or why it can't be ordered) and the
+        catalog is read in one query per item type, however long the cart.
+        """
+        lines = request.data.get("lines")
+        if not isinstance(lines, list) or not lines:
+            return Response(
+                {"error": "lines must be a non-empty list of order lines"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(lines) > QUOTE_LINE_LIMIT:
+            return Response(
+                {"error": f"At most {QUOTE_LINE_LIMIT} lines can be priced at once"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = QuoteLineSerializer(data=lines, many=True)
+        if not serializer.is_valid():
+            return Response(
+                {"error": "Invalid order lines", "lines": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        quoted = []
+        for quote, error in price_lines(serializer.validated_data):
+            if error:
+                quoted.append({"error": error})
+            else:
+                quoted.append({
+                    field: value if field in ("order_type", "quantity") else str(value)
+                    for field, value in quote.items()
+                })
+        total = sum(
+            (Decimal(line["total_price"]) for line in quoted if "error" not in line),
+            Decimal("0.00"),
+        )
+        return Response({
+            "lines": quoted,
+            "total": str(total),
+            "valid": all("error" not in line for line in quoted),
+        })
+
+    @action(detail=False, methods=["post"], url_path="checkout")
+    def checkout(self, request):
+        """
+        Order a whole cart at once: ``{"lines": [...], "total_price": ...}``
+        with lines shaped like single orders. Either every line is placed
+        (under one Checkout) or none is.
+        """
+        serializer = CheckoutSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        try:
+            checkout = serializer.save()
+        except (InsufficientStock, RentalUnavailable) as exc:
+            # 🚫 One line sold out (or booked); the whole cart rolled back
+            return Response(
+                {"error": str(exc), "available": exc.available},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        checkout = Checkout.objects.prefetch_related(
+            Prefetch("lines", queryset=Order.objects.select_related("user").order_by("id"))
+        ).get(pk=checkout.pk)
+        return Response(
+            CheckoutSerializer(checkout, context=self.get_serializer_context()).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    def get_version(self):
+        """
+        Count + latest updated_at of the orders (and their users) the
+        response would contain. Every write path, including the bulk and
+        snapshot UPDATEs, stamps updated_at, and deletes change the count.
+
+        No Last-Modified: max(updated_at) does not move when an order is
+        deleted or drops out of the filter, so If-Modified-Since would
+        answer 304 with a stale list. Clients revalidate with the ETag.
+        """
+        queryset = self.get_queryset()
+        catalog = ()
+        if self.action == 'list':
+            queryset = self.filter_queryset(queryset)
+        else:
+            pk = str(self.kwargs.get(self.lookup_field, ''))
+            if not pk.isdigit():
+                return None, None
+            queryset = queryset.filter(pk=pk)
+            # *_details embed live catalog data
+            catalog = tuple(CatalogVersion.objects.order_by('name').values_list('name', 'version'))
+
+        version = queryset.order_by().aggregate(
+            count=Count('id'), last=Max('updated_at'), users=Max('user__updated_at'),
+        )
+        return (version['count'], version['last'], version['users'], catalog), None
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return OrderListSerializer
+        return OrderSerializer
 
     def get_queryset(self):
         user = self.request.user
+        if self.action == 'list':
+            # The list renders from the item snapshot; only the user is joined
+            queryset = Order.objects.select_related('user')
+        else:
+            queryset = with_order_relations(Order.objects.all())
         if user.role == 'admin':
-            return Order.objects.all()
-        return Order.objects.filter(user=user)
+            return queryset
+        return queryset.filter(user=user)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'list':
+            queryset = filter_orders(queryset, self.request.query_params)
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        try:
+            return super().create(request, *args, **kwargs)
+        except (InsufficientStock, RentalUnavailable) as exc:
+            # 🚫 Sold out (or booked) while the customer was checking out
+            return Response(
+                {"error": str(exc), "available": exc.available},
+                status=status.HTTP_409_CONFLICT
+            )
+
+    def update(self, request, *args, **kwargs):
+        try:
+            return super().update(request, *args, **kwargs)
+        except InsufficientStock as exc:
+            # 🚫 Not enough units for the edited quantity / item
+            return Response(
+                {"error": str(exc), "available": exc.available},
+                status=status.HTTP_409_CONFLICT
+            )
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
-    
 
+    def perform_update(self, serializer):
+        previous_total = serializer.instance.total_price
+        with transaction.atomic():
+            order = serializer.save()
+            record_revenue_change(order.order_date, order.total_price - previous_total)
+
+    def perform_destroy(self, instance):
+        # ✅ Stats and held stock are settled by orders.signals on every delete
+        instance.delete()
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def rental_availability_view(request):
+    """
+    Which rental items are free between ``?from=`` and ``?to=`` (ISO dates;
+    ``to`` is the return day, not rented). ``?items=1,2`` limits the items
+    (default: every active one) and ``?size=L`` the sizes.
+    """
+    try:
+        start = parse_date(request.query_params.get("from", ""))
+        end = parse_date(request.query_params.get("to", ""))
+    except ValueError:
+        start = end = None
+    if not start or not end or end <= start:
+        return Response(
+            {"error": "from and to must be dates (YYYY-MM-DD) with to after from"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if (end - start).days > MAX_RANGE_DAYS:
+        return Response(
+            {"error": f"The range can be at most {MAX_RANGE_DAYS} days"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    items = RentalItem.objects.filter(is_active=True).only("id", "name", "sizes")
+    ids = request.query_params.get("items")
+    if ids:
+        ids = [i for i in ids.split(",") if i.strip()]
+        if not all(i.strip().isdigit() for i in ids):
+            return Response(
+                {"error": "items must be a comma separated list of ids"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        items = items.filter(pk__in=[int(i) for i in ids])
+
+    return Response({
+        "from": start,
+        "to": end,
+        "items": rental_availability(list(items.order_by("id")), start, end,
+                                     request.query_params.get("size")),
+    })
+
+
+# Seconds between SSE comment lines that keep proxies from closing idle streams
+EVENT_STREAM_KEEPALIVE = 25
+
+
+def _stream_user(request):
+    """
+    The user an event stream is for: a ``?ticket=`` from the ticket
+    endpoint (EventSource cannot set headers) or an Authorization header.
+    """
+    ticket = request.GET.get("ticket")
+    if ticket:
+        user_id = redeem_stream_ticket(ticket)
+        return User.objects.filter(pk=user_id).first() if user_id else None
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+    return result[0] if result else None
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def order_events_ticket(request):
+    """Single-use ticket for opening ``/api/orders/events/?ticket=...``."""
+    if not settings.ORDER_EVENT_STREAM:
+        return Response(
+            {"error": "Live order updates are not enabled"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    return Response({
+        "ticket": issue_stream_ticket(request.user),
+        "expires_in": settings.ORDER_EVENT_TICKET_TTL,
+    })
+
+
+async def order_events(request):
+    """
+    ``GET /api/orders/events/`` — Server-Sent Events stream of order
+    status changes. Customers get their own orders, admins get all.
+    Only served when ``settings.ORDER_EVENT_STREAM`` is on, i.e. under
+    the ASGI entry point (polo_fashions.asgi).
+    """
+    if not settings.ORDER_EVENT_STREAM:
+        return JsonResponse({"error": "Live order updates are not enabled"}, status=404)
+    user = await sync_to_async(_stream_user)(request)
+    if user is None or not user.is_active:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+
+    subscription = get_broker().subscribe(
+        user_id=None if user.role == "admin" else user.id
+    )
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.get(), timeout=EVENT_STREAM_KEEPALIVE
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
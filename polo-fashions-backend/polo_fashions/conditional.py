@@ -0,0 +1,74 @@
+import hashlib
+
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for ``list`` and ``retrieve``.
+
+    Viewsets implement ``get_version()`` returning ``(token, last_modified)``
+    where ``token`` is any cheap-to-compute value that changes whenever the
+    response would (a version counter, ``max(updated_at)`` + count, ...) and
+    ``last_modified`` is an aware datetime or None. Only return a datetime
+    when it alone moves on every change, deletes included; otherwise
+    ``If-Modified-Since`` would get a stale ``304``. The ETag mixes the token
+    with the request path, query string, negotiated media type and user, so
+    a matching ``If-None-Match`` gets a ``304`` before the serializer runs.
+    """
+    # Responses that depend on who is asking must not be shared by caches
+    private_cache = False
+
+    def get_version(self):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def _make_etag(self, token):
+        request = self.request
+        parts = [
+            str(token),
+            request.get_full_path(),
+            str(getattr(request, 'accepted_media_type', '')),
+            str(request.user.pk) if self.private_cache else '',
+        ]
+        return quote_etag(hashlib.md5('|'.join(parts).encode(), usedforsecurity=False).hexdigest())
+
+    def _not_modified(self, request, etag, last_modified):
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            return etag in parse_etags(if_none_match) or if_none_match.strip() == '*'
+        if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        return bool(
+            last_modified and if_modified_since
+            and int(last_modified.timestamp()) <= if_modified_since
+        )
+
+    def _conditional_response(self, handler, request, *args, **kwargs):
+        token, last_modified = self.get_version()
+        etag = self._make_etag(token)
+
+        if self._not_modified(request, etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        # Always revalidate; the ETag makes that cheap
+        if self.private_cache:
+            patch_cache_control(response, no_cache=True, private=True)
+            patch_vary_headers(response, ('Authorization',))
+        else:
+            patch_cache_control(response, no_cache=True)
+        return response
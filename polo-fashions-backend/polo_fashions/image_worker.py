@@ -0,0 +1,87 @@
+# polo_fashions/image_worker.py
+"""
+The pool side of the media pipeline.
+
+``optimize_file`` runs in a spawned process, which imports this module
+fresh: it must not import Django or cloudinary, only the filesystem and
+Pillow. Everything it needs arrives as arguments (see
+``media_pipeline.render_profile``).
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path, PurePosixPath
+
+from PIL import Image
+
+VARIANT_DIR = 'variants'
+HASH_CHUNK = 1 << 20
+
+
+def content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def variant_name(name, digest, width, extension):
+    stem = PurePosixPath(name).with_suffix('')
+    return f'{VARIANT_DIR}/{stem}.{digest[:12]}_w{width}.{extension}'
+
+
+def _encode(image, target, extension, quality):
+    if extension in ('jpg', 'jpeg') or image.mode not in ('RGB', 'RGBA'):
+        keep_alpha = extension not in ('jpg', 'jpeg') and (
+            image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+        )
+        image = image.convert('RGBA' if keep_alpha else 'RGB')
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # Write next to the target and rename, so readers never see half a file
+    fd, partial = tempfile.mkstemp(dir=target.parent, suffix=f'.{extension}')
+    os.close(fd)
+    try:
+        image.save(partial, quality=quality)
+        os.replace(partial, target)
+    except BaseException:
+        os.unlink(partial)
+        raise
+
+
+def optimize_file(media_root, name, profile, known=None, force=False):
+    """
+    Worker: render the variants of one source file.
+
+    Returns ``(name, entry)``; ``entry`` is None when ``known`` (the current
+    manifest entry) is still valid. Runs in a pool process, so it touches
+    only the filesystem.
+    """
+    widths, extension, quality = profile
+    root = Path(media_root)
+    digest = content_hash(root / name)
+    if known and not force and known['hash'] == digest and all(
+        (root / variant['name']).exists() for variant in known['variants']
+    ):
+        return name, None
+
+    variants = []
+    with Image.open(root / name) as original:
+        original.load()
+        # Only downscales: widths at or above the original would just be
+        # re-encoded copies advertising a size they don't have
+        for width in sorted({width for width in widths if width < original.width}):
+            copy = original.copy()
+            copy.thumbnail((width, original.height), Image.Resampling.LANCZOS)
+            if variants and variants[-1]['width'] == copy.width:
+                continue
+            target_name = variant_name(name, digest, copy.width, extension)
+            _encode(copy, root / target_name, extension, quality)
+            variants.append({
+                'width': copy.width,
+                'name': target_name,
+                'bytes': (root / target_name).stat().st_size,
+            })
+        size = original.size
+    return name, {'hash': digest, 'width': size[0], 'height': size[1], 'variants': variants}
+
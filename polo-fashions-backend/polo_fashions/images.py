@@ -0,0 +1,102 @@
+# polo_fashions/images.py
+"""
+Memoized delivery URLs for CloudinaryField values.
+
+``resource.url`` rebuilds the URL string from scratch on every call
+(option merging, config lookups, path assembly), once per image per row
+per request. The URL only depends on the stored resource (public_id,
+version, format, type) and the account config, so it is computed once
+and kept in a bounded LRU. A replaced image gets a new public_id or
+version and therefore a new key; nothing has to be invalidated by hand.
+
+``image_variants`` adds resized / re-encoded copies for ``srcset``, as
+described by ``settings.IMAGE_VARIANTS``. With the default Cloudinary
+backend they are delivery-time transformations; with the ``local``
+backend (development, or no Cloudinary account) they are the files that
+polo_fashions.media_pipeline rendered with the same widths, format and
+quality, as listed in its manifest.
+"""
+from functools import lru_cache
+
+import cloudinary
+from cloudinary import CloudinaryResource
+from cloudinary.utils import cloudinary_url
+from django.conf import settings
+
+from .media_pipeline import manifest_variants, source_name
+
+URL_CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def _delivery_url(cloud_name, secure, resource_type, upload_type, public_id, format, version):
+    return cloudinary_url(
+        public_id, format=format, version=version, type=upload_type, resource_type=resource_type
+    )[0]
+
+
+def image_url(image):
+    """Full delivery URL for a CloudinaryField value, or None when empty."""
+    if not image:
+        return None
+    if not isinstance(image, CloudinaryResource) or image.url_options:
+        return image.url
+    config = cloudinary.config()
+    return _delivery_url(
+        config.cloud_name, config.secure, image.resource_type or 'image', image.type,
+        image.public_id, image.format, image.version,
+    )
+
+
+def clear_image_url_cache():
+    """Drop memoized URLs, e.g. after changing the Cloudinary config at runtime."""
+    _delivery_url.cache_clear()
+    _cloudinary_variants.cache_clear()
+
+
+def image_url_cache_info():
+    return _delivery_url.cache_info()
+
+
+def variant_profile():
+    profile = settings.IMAGE_VARIANTS
+    return (
+        tuple(sorted(profile['widths'])), profile.get('format', 'auto'),
+        profile.get('quality', 'auto'), profile.get('backend', 'cloudinary'),
+    )
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def _cloudinary_variants(cloud_name, secure, resource_type, upload_type, public_id, format,
+                         version, widths, variant_format, quality):
+    options = {'crop': 'limit', 'quality': quality}
+    if variant_format == 'auto':
+        # Cloudinary picks AVIF / WebP / the original per browser
+        options['fetch_format'] = 'auto'
+    else:
+        format = variant_format
+    return tuple(
+        (width, cloudinary_url(
+            public_id, format=format, version=version, type=upload_type,
+            resource_type=resource_type, width=width, **options,
+        )[0])
+        for width in widths
+    )
+
+
+def image_variants(image):
+    """
+    ``[{"width": 320, "url": ...}, ...]`` for a CloudinaryField value, one
+    per configured width, smallest first; empty when there is no image.
+    """
+    if not image or not isinstance(image, CloudinaryResource):
+        return []
+    widths, variant_format, quality, backend = variant_profile()
+    if backend == 'local':
+        return manifest_variants(source_name(image))
+    config = cloudinary.config()
+    variants = _cloudinary_variants(
+        config.cloud_name, config.secure, image.resource_type or 'image', image.type,
+        image.public_id, image.format, image.version, widths, variant_format, quality,
+    )
+    return [{'width': width, 'url': url} for width, url in variants]
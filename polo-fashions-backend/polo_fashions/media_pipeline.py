@@ -0,0 +1,358 @@
+# polo_fashions/media_pipeline.py
+"""
+Offline image optimization for locally stored media.
+
+Each source image under ``MEDIA_ROOT`` is resized down to the widths in
+``settings.IMAGE_VARIANTS`` and re-encoded (WebP for ``auto``) by Pillow,
+in a ``ProcessPoolExecutor`` so a full run uses every core (the worker
+lives in ``image_worker``, which spawned processes can import without
+Django). Results are
+recorded in ``variants/manifest.json``:
+
+    {"products/3_1.avif": {"hash": "<sha256>", "width": 1024, "height": 1536,
+                           "variants": [{"width": 320, "name": "variants/...", "bytes": 12462}, ...]}}
+
+Runs are incremental: a file whose content hash matches its manifest
+entry (and whose variants are still on disk) is not decoded again.
+Variant names embed the hash, so a changed upload never serves a stale
+copy from a browser or proxy cache.
+
+Entry points: ``manage.py build_image_variants`` for the whole tree and
+``schedule_optimize`` for single uploads (called from the post_save
+hooks in products.signals and accounts.signals). Everything goes through
+``FileSystemStorage``; no network access is needed.
+"""
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads in this process are serialized
+    fcntl = None
+
+from cloudinary import CloudinaryResource
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, transaction
+from products.versions import COLLECTIONS, bump_catalog_version
+
+from .image_worker import VARIANT_DIR, optimize_file
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.avif'}
+MANIFEST_NAME = f'{VARIANT_DIR}/manifest.json'
+# Sidecar file locked while the manifest is rewritten
+MANIFEST_LOCK_NAME = f'{VARIANT_DIR}/manifest.lock'
+
+# What gets written when the profile asks for ``auto``
+AUTO_FORMAT = 'webp'
+AUTO_QUALITY = 80
+
+# Upload folders no catalog response reads from (accounts measurements)
+NON_CATALOG_DIRS = {'measurements'}
+
+# How often a process looks for a newer manifest written by someone else
+MANIFEST_RECHECK = 2.0
+
+logger = logging.getLogger(__name__)
+
+_manifest_lock = threading.Lock()
+_manifest_cache = {'checked': 0.0, 'mtime': None, 'entries': {}}
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = set()
+
+
+def media_storage():
+    return FileSystemStorage(location=settings.MEDIA_ROOT, base_url=settings.MEDIA_URL)
+
+
+def source_name(image):
+    """Name of a stored image relative to ``MEDIA_ROOT``."""
+    if isinstance(image, CloudinaryResource):
+        return f'{image.public_id}.{image.format}' if image.format else image.public_id
+    return str(image)
+
+
+def render_profile():
+    """Picklable ``(widths, extension, quality)`` handed to the workers."""
+    profile = settings.IMAGE_VARIANTS
+    variant_format = profile.get('format', 'auto')
+    quality = profile.get('quality', 'auto')
+    return (
+        tuple(sorted(profile['widths'])),
+        AUTO_FORMAT if variant_format == 'auto' else variant_format,
+        AUTO_QUALITY if quality == 'auto' else int(quality),
+    )
+
+
+def source_names(storage=None):
+    """Every image under MEDIA_ROOT except the generated variants."""
+    root = Path((storage or media_storage()).location)
+    names = []
+    for path in root.rglob('*'):
+        relative = path.relative_to(root)
+        if relative.parts[0] == VARIANT_DIR or path.suffix.lower() not in IMAGE_EXTENSIONS:
+            continue
+        if path.is_file():
+            names.append(relative.as_posix())
+    return sorted(names)
+
+
+def _manifest_path():
+    return Path(media_storage().path(MANIFEST_NAME))
+
+
+def _read_manifest(path):
+    try:
+        with open(path) as manifest:
+            return json.load(manifest)
+    except FileNotFoundError:
+        return {}
+
+
+def load_manifest():
+    """The manifest entries, re-read when the file changes (checked every few seconds)."""
+    cached = _manifest_cache
+    now = time.monotonic()
+    if now - cached['checked'] < MANIFEST_RECHECK:
+        return cached['entries']
+    path = _manifest_path()
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if mtime != cached['mtime']:
+        cached['entries'] = _read_manifest(path) if mtime else {}
+        cached['mtime'] = mtime
+    cached['checked'] = now
+    return cached['entries']
+
+
+def clear_manifest_cache():
+    _manifest_cache.update(checked=0.0, mtime=None, entries={})
+
+
+@contextmanager
+def _manifest_write_lock():
+    """
+    Serialize manifest rewrites between threads and between processes
+    (gunicorn workers, build_image_variants) with flock on a sidecar file.
+    """
+    path = Path(media_storage().path(MANIFEST_LOCK_NAME))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _manifest_lock, open(path, 'a') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def update_manifest(entries, removed=()):
+    """Merge ``{name: entry}`` into the manifest and drop ``removed`` names."""
+    if not entries and not removed:
+        return
+    path = _manifest_path()
+    with _manifest_write_lock():
+        manifest = _read_manifest(path)
+        manifest.update(entries)
+        for name in removed:
+            manifest.pop(name, None)
+        _write_manifest(path, manifest)
+    _manifest_changed([*entries, *removed])
+
+
+def rename_manifest_entries(renamed):
+    """
+    Re-key entries for sources that moved (``{old_name: new_name}``, e.g.
+    onto content-addressed blobs). When several old names land on one new
+    name the first entry is kept and the others' variants are deleted.
+    """
+    if not renamed:
+        return
+    path = _manifest_path()
+    root = Path(media_storage().location)
+    with _manifest_write_lock():
+        manifest = _read_manifest(path)
+        for old_name, new_name in renamed.items():
+            entry = manifest.pop(old_name, None)
+            if entry is None:
+                continue
+            if new_name in manifest:
+                _prune_variants(root, entry, manifest[new_name])
+            else:
+                manifest[new_name] = entry
+        _write_manifest(path, manifest)
+    _manifest_changed([*renamed, *renamed.values()])
+
+
+def _write_manifest(path, manifest):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, partial = tempfile.mkstemp(dir=path.parent, suffix='.json')
+    with os.fdopen(fd, 'w') as out:
+        json.dump(manifest, out, indent=1, sort_keys=True)
+    os.replace(partial, path)
+
+
+def _manifest_changed(names):
+    clear_manifest_cache()
+    # Cached catalog responses embed image_variants
+    for collection in _catalog_collections(names):
+        bump_catalog_version(collection)
+
+
+def _catalog_collections(names):
+    """Catalog collections whose responses may show these files."""
+    collections = set()
+    for name in names:
+        top = PurePosixPath(name).parts[0]
+        if top in COLLECTIONS:
+            collections.add(top)
+        elif top not in NON_CATALOG_DIRS:
+            # Flat or content-addressed names could belong to any item
+            return sorted(COLLECTIONS)
+    return sorted(collections)
+
+
+def manifest_variants(name):
+    """``[{"width", "url"}]`` recorded for a source file, or ``[]``."""
+    entry = load_manifest().get(name)
+    if not entry:
+        return []
+    storage = media_storage()
+    return [{'width': v['width'], 'url': storage.url(v['name'])} for v in entry['variants']]
+
+
+def _prune_variants(root, old_entry, new_entry=None):
+    keep = {v['name'] for v in new_entry['variants']} if new_entry else set()
+    for variant in old_entry['variants']:
+        if variant['name'] not in keep:
+            try:
+                (root / variant['name']).unlink()
+            except FileNotFoundError:
+                pass
+
+
+def optimize_media(names=None, workers=None, force=False):
+    """
+    Optimize ``names`` (default: the whole media tree) in a process pool.
+    Returns ``{"rendered", "unchanged", "removed"}`` counts and ``failed``,
+    ``{name: error}`` for files that could not be rendered (corrupt or not
+    really images); they keep their previous manifest entry, if any.
+    """
+    storage = media_storage()
+    root = Path(storage.location)
+    manifest = _read_manifest(_manifest_path())
+    full_run = names is None
+    names = source_names(storage) if full_run else list(names)
+    profile = render_profile()
+
+    updated, failed = {}, {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(optimize_file, str(root), name, profile, manifest.get(name), force): name
+            for name in names
+        }
+        for future, name in futures.items():
+            try:
+                _, entry = future.result()
+            except Exception as exc:
+                failed[name] = f'{type(exc).__name__}: {exc}'
+                continue
+            if entry is not None:
+                updated[name] = entry
+
+    for name, entry in updated.items():
+        if name in manifest:
+            _prune_variants(root, manifest[name], entry)
+
+    # Sources that disappeared take their variants with them
+    present = set(names)
+    removed = [name for name in manifest if full_run and name not in present]
+    for name in removed:
+        _prune_variants(root, manifest[name])
+
+    update_manifest(updated, removed)
+    return {
+        'rendered': len(updated),
+        'unchanged': len(names) - len(updated) - len(failed),
+        'removed': len(removed),
+        'failed': failed,
+    }
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawn, not fork: forking a threaded web worker can copy held locks
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_PIPELINE_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _executor
+
+
+def _record_result(future):
+    try:
+        name, entry = future.result()
+        if entry is not None:
+            old = _read_manifest(_manifest_path()).get(name)
+            if old:
+                _prune_variants(Path(settings.MEDIA_ROOT), old, entry)
+            update_manifest({name: entry})
+    except Exception:
+        # A broken upload must not take the hook down; build_image_variants
+        # retries it (it has no manifest entry) and lists it as failed
+        logger.warning('Could not optimize an uploaded image', exc_info=True)
+    finally:
+        # Normally this runs on the pool's result thread: don't leave the
+        # connection the version bump opened behind (a caller's open
+        # transaction, when the callback runs inline, is left alone)
+        if not connection.in_atomic_block:
+            connection.close()
+        _pending.discard(future)
+
+
+def schedule_optimize(name):
+    """Queue one stored file for optimization (no-op unless it is a local image)."""
+    if not name or PurePosixPath(name).suffix.lower() not in IMAGE_EXTENSIONS:
+        return None
+    if not media_storage().exists(name):
+        return None
+    known = _read_manifest(_manifest_path()).get(name)
+    future = _get_executor().submit(
+        optimize_file, str(settings.MEDIA_ROOT), name, render_profile(), known
+    )
+    _pending.add(future)
+    future.add_done_callback(_record_result)
+    return future
+
+
+def wait_for_pending():
+    """Block until every scheduled optimization has been recorded."""
+    while _pending:
+        time.sleep(0.01)
+
+
+def optimize_on_commit(instance, *fields):
+    """
+    post_save hook: once the save commits, queue the instance's images
+    (``fields``) for optimization. Only active with the local backend.
+    """
+    if settings.IMAGE_VARIANTS.get('backend') != 'local':
+        return
+    names = [source_name(getattr(instance, field)) for field in fields if getattr(instance, field)]
+    if names:
+        transaction.on_commit(lambda: [schedule_optimize(name) for name in names])
@@ -77,6 +77,16 @@ DATABASES = {
     )
 }
 
+# Cache (catalog responses, catalog versions). Per-process unless pointed
+# at a shared backend.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'polo-fashions',
+    }
+}
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=60 * 60, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -117,12 +127,46 @@ cloudinary.config(
     secure=True
 )
 
-# Set Cloudinary as default file storage
-DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
+MEDIA_URL = config('MEDIA_URL', default='/media/')
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Files saved through Django's storage API are content addressed: identical
+# uploads share one blob (polo_fashions/storage.py). Every model image is a
+# CloudinaryField, whose uploads go straight to Cloudinary, so today this
+# covers files written by code (e.g. `manage.py dedupe_media`), not uploads.
+# "staticfiles" keeps what Django >= 5.1 already uses, since it no longer
+# reads STATICFILES_STORAGE.
+CONTENT_STORAGE_BACKEND = 'django.core.files.storage.FileSystemStorage'
+STORAGES = {
+    'default': {'BACKEND': 'polo_fashions.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
 
-# Print confirmation
-print("✅ DEFAULT_FILE_STORAGE set to:", DEFAULT_FILE_STORAGE)
-print("=" * 80)
+# Responsive variants emitted next to every catalog image (srcset).
+# backend "cloudinary" builds transformation URLs; "local" points at files
+# rendered into MEDIA_ROOT/variants by polo_fashions.media_pipeline
+# (`manage.py build_image_variants`, plus a hook on every upload).
+IMAGE_VARIANTS = {
+    'widths': [320, 640, 960, 1280],
+    'format': config('IMAGE_VARIANT_FORMAT', default='auto'),
+    'quality': config('IMAGE_VARIANT_QUALITY', default='auto'),
+    'backend': config('IMAGE_VARIANT_BACKEND', default='cloudinary'),
+}
+# Processes optimizing uploads in the background (local backend only)
+IMAGE_PIPELINE_WORKERS = config('IMAGE_PIPELINE_WORKERS', default=2, cast=int)
+
+# Rows each stocked item/size is split over (products.stock); more shards
+# means less waiting when many customers check out the same item at once
+STOCK_SHARDS = config('STOCK_SHARDS', default=4, cast=int)
+
+# Measurement appointments (bookings/slots.py): start times offered on
+# every open day and the seats per slot, unless a slot row says otherwise.
+# closed_weekdays uses date.weekday() numbers (0 = Monday).
+BOOKING_SLOTS = {
+    'times': ['10:00', '11:00', '12:00', '14:00', '15:00', '16:00', '17:00', '18:00', '19:00'],
+    'capacity': config('BOOKING_SLOT_CAPACITY', default=1, cast=int),
+    'closed_weekdays': [],
+}
 
 # REST Framework Configuration
 REST_FRAMEWORK = {
@@ -145,6 +189,8 @@ SIMPLE_JWT = {
 
 # CORS Configuration
 CORS_ALLOW_CREDENTIALS = True
+# Let the dashboard read delta-sync cursors and validators from responses
+CORS_EXPOSE_HEADERS = ['ETag', 'Last-Modified', 'X-Sync-Cursor']
 
 if DEBUG:
     # Development CORS settings
@@ -166,6 +212,17 @@ else:
         r"^https://.*\.vercel\.app$",
     ]
     
+# Order status push (orders/events.py). Swap for a shared pub/sub broker
+# when running more than one ASGI worker.
+ORDER_EVENT_BROKER = config('ORDER_EVENT_BROKER', default='orders.events.InProcessBroker')
+# Only enable when served through polo_fashions.asgi by an ASGI server
+# (uvicorn/daphne); under gunicorn's WSGI workers clients poll instead.
+# With more than one worker, also point CACHES at a shared backend: stream
+# tickets are marked as used in the cache.
+ORDER_EVENT_STREAM = config('ORDER_EVENT_STREAM', default=False, cast=bool)
+# Seconds a stream ticket stays valid (it is also single-use)
+ORDER_EVENT_TICKET_TTL = config('ORDER_EVENT_TICKET_TTL', default=30, cast=int)
+
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -0,0 +1,94 @@
+# polo_fashions/storage.py
+"""
+Content-addressed media storage.
+
+``ContentAddressedStorage`` wraps another storage backend (by default the
+local ``FileSystemStorage``) and saves every file under the SHA-256 of
+its bytes, ``blobs/ab/ab12…ef.jpeg``, whatever name it was uploaded
+with. Uploading the same picture twice therefore stores and transfers
+it once, and names never collide, so Django's ``_KOmPxBp`` suffixes go
+away. ``manage.py dedupe_media`` moves an existing tree onto this layout
+(local image backend only; Cloudinary rows hold public ids, not paths).
+
+A blob may be referenced by several rows, so ``delete`` leaves blobs in
+place; ``dedupe_media --prune`` removes the ones nothing refers to.
+"""
+import hashlib
+import posixpath
+
+from django.conf import settings
+from django.core.files.storage import Storage
+from django.utils.deconstruct import deconstructible
+from django.utils.module_loading import import_string
+
+BLOB_DIR = 'blobs'
+HASH_CHUNK = 1 << 20
+
+
+def blob_name(digest, extension):
+    return f'{BLOB_DIR}/{digest[:2]}/{digest}{extension.lower()}'
+
+
+def is_blob(name):
+    return name.startswith(f'{BLOB_DIR}/')
+
+
+def hash_file(content):
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in iter(lambda: content.read(HASH_CHUNK), b''):
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(Storage):
+    def __init__(self, backend=None, options=None):
+        self.backend = backend or settings.CONTENT_STORAGE_BACKEND
+        self.options = options or {}
+        self.inner = import_string(self.backend)(**self.options)
+
+    def _save(self, name, content):
+        digest = hash_file(content)
+        target = blob_name(digest, posixpath.splitext(name)[1])
+        if self.inner.exists(target):
+            return target  # identical bytes are already stored
+        return self.inner.save(target, content)
+
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content, so there is nothing to avoid
+        return name
+
+    def delete(self, name):
+        if not is_blob(name):
+            self.inner.delete(name)
+
+    def _open(self, name, mode='rb'):
+        return self.inner.open(name, mode)
+
+    def exists(self, name):
+        return self.inner.exists(name)
+
+    def url(self, name):
+        return self.inner.url(name)
+
+    def path(self, name):
+        return self.inner.path(name)
+
+    def size(self, name):
+        return self.inner.size(name)
+
+    def listdir(self, path):
+        return self.inner.listdir(path)
+
+    def get_accessed_time(self, name):
+        return self.inner.get_accessed_time(name)
+
+    def get_created_time(self, name):
+        return self.inner.get_created_time(name)
+
+    def get_modified_time(self, name):
+        return self.inner.get_modified_time(name)
@@ -1,9 +1,34 @@
 from django.contrib import admin
 from .models import Product, Fabric, ProductImage , RentalImage
-from .models import RentalItem, Accessory, Innerwear 
+from .models import RentalItem, Accessory, Innerwear, ItemSize, StockLevel, StockMovement
+from .sizes import COLLECTION_BY_MODEL as SIZED_COLLECTIONS
 
 admin.site.register(Accessory)
-admin.site.register(Innerwear)
+
+
+class SizeListFilter(admin.SimpleListFilter):
+    """Filter by size using the ItemSize table (kept in sync by products.signals)."""
+    title = "size"
+    parameter_name = "size"
+
+    def lookups(self, request, model_admin):
+        sizes = (
+            ItemSize.objects.filter(collection=SIZED_COLLECTIONS[model_admin.model])
+            .values_list("size", flat=True).distinct().order_by("size")
+        )
+        return [(size, size) for size in sizes]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(pk__in=ItemSize.objects.filter(
+                collection=SIZED_COLLECTIONS[queryset.model], size=self.value()
+            ).values("object_id"))
+        return queryset
+
+@admin.register(Innerwear)
+class InnerwearAdmin(admin.ModelAdmin):
+    list_display = ["name", "price", "is_active"]
+    list_filter = [SizeListFilter, "is_active"]
 
 class RentalImageInline(admin.TabularInline):
     model = RentalImage
@@ -17,7 +42,7 @@ class ProductImageInline(admin.TabularInline):
 class ProductAdmin(admin.ModelAdmin):
     inlines = [ProductImageInline]
     list_display = ['name', 'category', 'type', 'brand', 'price', 'is_active']
-    list_filter = ['category', 'type', 'is_active']
+    list_filter = ['category', 'type', SizeListFilter, 'is_active']
     search_fields = ['name', 'brand']
     fieldsets = (
         ("Basic Info", {
@@ -49,3 +74,28 @@ class FabricAdmin(admin.ModelAdmin):
 class RentalItemAdmin(admin.ModelAdmin):
     inlines = [RentalImageInline]
     list_display = ["name", "price_per_day", "deposit_amount", "is_active"]
+    list_filter = [SizeListFilter, "is_active"]
+
+@admin.register(StockLevel)
+class StockLevelAdmin(admin.ModelAdmin):
+    # Counts are changed through products.stock (PUT /api/stock/...) so the
+    # ledger stays complete; the admin only shows them
+    list_display = ["collection", "object_id", "size", "shard", "quantity"]
+    list_filter = ["collection"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ["created_at", "collection", "object_id", "size", "delta", "reason", "order_id"]
+    list_filter = ["reason", "collection"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
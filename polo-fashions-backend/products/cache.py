@@ -0,0 +1,124 @@
+# products/cache.py
+"""
+Response cache for the public catalog endpoints.
+
+Entries are keyed by collection *version* (products.versions) plus the
+request path and query string. The post_save / post_delete receivers in
+products.signals bump the version whenever an item or gallery image
+changes, so a write makes every older entry unreachable at once and the
+stale entries simply age out.
+
+A cold key is recomputed by one request only ("single flight"): threads
+in this process queue on a per-key lock, and other processes back off on
+a short-lived ``cache.add`` lock while the winner fills the entry.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+LOCK_TIMEOUT = 10      # seconds a recompute may hold the cross-process lock
+LOCK_WAIT = 2.0        # seconds a loser waits for the winner before computing itself
+LOCK_POLL = 0.05
+
+STAT_KEYS = ('hits', 'misses', 'coalesced')
+
+# Striped so the lock table stays a fixed size however many keys come and go
+_local_locks = [threading.Lock() for _ in range(64)]
+
+
+def _local_lock(key):
+    return _local_locks[hash(key) % len(_local_locks)]
+
+
+def _count(stat):
+    key = f'catalog-cache-stat:{stat}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def cache_stats():
+    counts = {stat: cache.get(f'catalog-cache-stat:{stat}', 0) for stat in STAT_KEYS}
+    lookups = sum(counts.values())
+    served_from_cache = counts['hits'] + counts['coalesced']
+    counts['hit_ratio'] = round(served_from_cache / lookups, 4) if lookups else None
+    return counts
+
+
+def get_or_compute(key, compute, timeout=None):
+    """
+    Return ``(value, outcome)`` where outcome is ``'hit'``, ``'coalesced'``
+    (another request computed it while we waited) or ``'miss'``.
+    ``compute`` returns ``(value, cacheable)``.
+    """
+    if timeout is None:
+        timeout = settings.CATALOG_CACHE_TIMEOUT
+
+    value = cache.get(key)
+    if value is not None:
+        _count('hits')
+        return value, 'hit'
+
+    with _local_lock(key):
+        value = cache.get(key)
+        if value is not None:
+            _count('coalesced')
+            return value, 'coalesced'
+
+        lock_key = f'{key}:lock'
+        if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+            deadline = time.monotonic() + LOCK_WAIT
+            while time.monotonic() < deadline:
+                time.sleep(LOCK_POLL)
+                value = cache.get(key)
+                if value is not None:
+                    _count('coalesced')
+                    return value, 'coalesced'
+            lock_key = None  # the other process is slow; compute ourselves
+
+        try:
+            _count('misses')
+            value, cacheable = compute()
+            if cacheable:
+                cache.set(key, value, timeout)
+            return value, 'miss'
+        finally:
+            if lock_key:
+                cache.delete(lock_key)
+
+
+class CatalogCacheMixin:
+    """Serve ``list`` / ``retrieve`` data from the catalog response cache."""
+
+    def get_cache_key(self, version):
+        request = self.request
+        return (
+            f'catalog:{self.catalog_collection}:v{version}:'
+            f'{request.accepted_media_type}:{request.get_full_path()}'
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(super().retrieve, request, *args, **kwargs)
+
+    def _cached_response(self, handler, request, *args, **kwargs):
+        version, _ = self.get_version()
+        produced = {}
+
+        def compute():
+            produced['response'] = response = handler(request, *args, **kwargs)
+            return response.data, response.status_code == 200
+
+        data, outcome = get_or_compute(self.get_cache_key(version), compute)
+        response = produced.get('response')
+        if response is None:
+            response = Response(data)
+        response['X-Cache'] = 'MISS' if outcome == 'miss' else 'HIT'
+        return response
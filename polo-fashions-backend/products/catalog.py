@@ -0,0 +1,61 @@
+# products/catalog.py
+"""
+The whole active catalog in one payload, for pages that show every section.
+
+The snapshot is built with one query per collection plus one per gallery
+(seven in total, however many items there are) and cached under the
+combined collection versions, so any catalog write makes it unreachable
+and the next reader rebuilds it once.
+"""
+from django.db.models import Prefetch
+
+from . import versions
+from .cache import get_or_compute
+from .models import Accessory, Fabric, Innerwear, Product, ProductImage, RentalImage, RentalItem
+from .serializers import (
+    AccessorySerializer, FabricSerializer, InnerwearSerializer, ProductSerializer,
+    RentalItemSerializer,
+)
+
+
+def product_queryset():
+    return Product.objects.filter(is_active=True).prefetch_related(
+        Prefetch('images', queryset=ProductImage.objects.order_by('id'))
+    )
+
+
+def rental_queryset():
+    return RentalItem.objects.filter(is_active=True).prefetch_related(
+        Prefetch('images', queryset=RentalImage.objects.order_by('id'))
+    )
+
+
+# Section name -> (queryset factory, serializer). Section names match the
+# collection names in products.versions.
+SECTIONS = {
+    versions.PRODUCTS: (product_queryset, ProductSerializer),
+    versions.FABRICS: (lambda: Fabric.objects.filter(is_active=True), FabricSerializer),
+    versions.RENTALS: (rental_queryset, RentalItemSerializer),
+    versions.ACCESSORIES: (lambda: Accessory.objects.filter(is_active=True), AccessorySerializer),
+    versions.INNERWEAR: (lambda: Innerwear.objects.filter(is_active=True), InnerwearSerializer),
+}
+
+
+def catalog_version():
+    """``(token, last_modified)`` covering every collection."""
+    rows = versions.catalog_versions(versions.COLLECTIONS)
+    token = '.'.join(str(rows[name][0]) for name in versions.COLLECTIONS)
+    changed = [updated_at for _, updated_at in rows.values() if updated_at]
+    return token, max(changed) if changed else None
+
+
+def build_snapshot():
+    return {
+        name: serializer(queryset(), many=True).data
+        for name, (queryset, serializer) in SECTIONS.items()
+    }
+
+
+def catalog_snapshot(token):
+    """Return ``(snapshot, outcome)``; see ``cache.get_or_compute``."""
+    return get_or_compute(f'catalog-snapshot:v{token}', lambda: (build_snapshot(), True))
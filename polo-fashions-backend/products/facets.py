@@ -0,0 +1,156 @@
+# products/facets.py
+"""
+Filters and facet counts for the catalog list endpoints.
+
+Each collection declares which attributes it can be filtered and faceted
+on. The counts for every scalar facet and the price buckets come out of
+one GROUP BY over the filtered queryset (one row per distinct
+combination, folded here), and the size counts from one grouped query on
+the ItemSize table, so the cost does not depend on how many facet values
+exist.
+"""
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Case, CharField, Count, Value, When
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from . import versions
+from .models import Accessory, Fabric, Innerwear, Product, RentalItem
+from .sizes import items_in_sizes, size_counts
+
+# Upper bounds of the price buckets; the last bucket is open ended
+PRICE_BUCKETS = (500, 1000, 2000, 5000)
+
+# Collection -> (model, scalar facet fields, price field, has sizes)
+FACETS = {
+    versions.PRODUCTS: (Product, ('category', 'type', 'brand'), 'price', True),
+    versions.FABRICS: (Fabric, ('type', 'color'), 'price', False),
+    versions.RENTALS: (RentalItem, ('color',), 'price_per_day', True),
+    versions.ACCESSORIES: (Accessory, ('category',), 'price', False),
+    versions.INNERWEAR: (Innerwear, (), 'price', True),
+}
+
+
+def price_bucket_labels():
+    labels, lower = [], 0
+    for upper in PRICE_BUCKETS:
+        labels.append(f'{lower}-{upper}')
+        lower = upper
+    labels.append(f'{lower}+')
+    return labels
+
+
+def _price_bucket(price_field):
+    labels = price_bucket_labels()
+    whens = [
+        When(**{f'{price_field}__lt': upper}, then=Value(label))
+        for upper, label in zip(PRICE_BUCKETS, labels)
+    ]
+    return Case(
+        *whens,
+        When(**{f'{price_field}__isnull': False}, then=Value(labels[-1])),
+        default=Value(None),
+        output_field=CharField(),
+    )
+
+
+def _list_param(params, name):
+    values = []
+    for raw in params.getlist(name):
+        values.extend(v.strip() for v in raw.split(',') if v.strip())
+    return values
+
+
+def _decimal_param(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValidationError({name: "Must be a number."})
+
+
+def filter_catalog(queryset, collection, params):
+    """
+    Apply the catalog list query parameters.
+
+    Every facet field of the collection accepts one or more values
+    (comma separated or repeated); choice fields reject unknown values.
+    ``price_min`` / ``price_max`` are inclusive and ``size`` matches items
+    offering any of the given sizes.
+    """
+    model, fields, price_field, has_sizes = FACETS[collection]
+
+    for field in fields:
+        values = _list_param(params, field)
+        if not values:
+            continue
+        choices = model._meta.get_field(field).choices
+        if choices:
+            valid = {key for key, _ in choices}
+            unknown = [v for v in values if v not in valid]
+            if unknown:
+                raise ValidationError({field: f"Unknown value(s): {', '.join(unknown)}"})
+        queryset = queryset.filter(**{f'{field}__in': values})
+
+    price_min = _decimal_param(params, 'price_min')
+    if price_min is not None:
+        queryset = queryset.filter(**{f'{price_field}__gte': price_min})
+    price_max = _decimal_param(params, 'price_max')
+    if price_max is not None:
+        queryset = queryset.filter(**{f'{price_field}__lte': price_max})
+
+    sizes = _list_param(params, 'size')
+    if sizes and has_sizes:
+        queryset = queryset.filter(pk__in=items_in_sizes(collection, sizes))
+
+    return queryset
+
+
+def facet_counts(queryset, collection):
+    """``{facet: {value: count}}`` for the items in ``queryset``."""
+    _, fields, price_field, has_sizes = FACETS[collection]
+    facets = {field: Counter() for field in fields}
+    facets['price'] = Counter()
+
+    rows = (
+        queryset.order_by()
+        .values(*fields, price_bucket=_price_bucket(price_field))
+        .annotate(count=Count('pk'))
+    )
+    for row in rows:
+        for field in fields:
+            if row[field]:
+                facets[field][row[field]] += row['count']
+        if row['price_bucket']:
+            facets['price'][row['price_bucket']] += row['count']
+
+    facets = {name: dict(counter.most_common()) for name, counter in facets.items()}
+    if has_sizes:
+        facets['size'] = size_counts(collection, queryset)
+    return facets
+
+
+class FacetedListMixin:
+    """
+    Filter ``list`` by the collection's facets; ``?facets=true`` returns
+    ``{"results": [...], "facets": {...}}`` instead of a bare list.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'list':
+            queryset = filter_catalog(queryset, self.catalog_collection, self.request.query_params)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('facets') not in ('1', 'true'):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response({
+            'results': self.get_serializer(queryset, many=True).data,
+            'facets': facet_counts(queryset, self.catalog_collection),
+        })
@@ -0,0 +1,56 @@
+import time
+from decimal import Decimal
+
+import cloudinary
+from cloudinary import CloudinaryResource
+from django.core.management.base import BaseCommand
+from polo_fashions.images import clear_image_url_cache, image_url
+from products.models import Accessory
+from products.serializers import AccessorySerializer
+
+
+class Command(BaseCommand):
+    help = 'Measure the per-row cost of resolving image URLs, uncached vs memoized'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        if not cloudinary.config().cloud_name:
+            cloudinary.config(cloud_name='benchmark')
+
+        # In-memory rows: the benchmark needs no database
+        items = [
+            Accessory(
+                id=i, name=f'Item {i}', category='belt', price=Decimal('299.00'),
+                image=CloudinaryResource(
+                    public_id=f'accessories/item_{i}', version='1712345678',
+                    format='jpg', type='upload', resource_type='image',
+                ),
+            )
+            for i in range(rows)
+        ]
+
+        def per_row(fn):
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fn()
+                best = min(best, time.perf_counter() - start)
+            return best / rows * 1e6
+
+        def serialize_cold():
+            clear_image_url_cache()
+            AccessorySerializer(items, many=True).data
+
+        results = [
+            ('resource.url (before)', per_row(lambda: [item.image.url for item in items])),
+            ('image_url, warm', per_row(lambda: [image_url(item.image) for item in items])),
+            ('serializer, cold cache', per_row(serialize_cold)),
+            ('serializer, warm cache', per_row(lambda: AccessorySerializer(items, many=True).data)),
+        ]
+        self.stdout.write(f'{rows} rows, best of {repeat}:')
+        for label, micros in results:
+            self.stdout.write(f'  {label:<24} {micros:8.2f} µs/row')
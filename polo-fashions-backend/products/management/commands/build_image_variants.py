@@ -0,0 +1,25 @@
+import os
+
+from django.core.management.base import BaseCommand
+from polo_fashions.media_pipeline import optimize_media
+
+
+class Command(BaseCommand):
+    help = 'Render resized / re-encoded variants of every image under MEDIA_ROOT'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help='Worker processes (default: one per CPU)')
+        parser.add_argument('--force', action='store_true',
+                            help='Re-render files whose content has not changed')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rendering image variants...')
+        counts = optimize_media(workers=options['workers'], force=options['force'])
+        for name, error in sorted(counts['failed'].items()):
+            self.stderr.write(self.style.ERROR(f'❌ {name}: {error}'))
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Rendered {counts['rendered']} images, "
+            f"{counts['unchanged']} unchanged, {counts['removed']} removed"
+            + (f", {len(counts['failed'])} failed" if counts['failed'] else '')
+        ))
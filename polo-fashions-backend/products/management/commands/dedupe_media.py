@@ -0,0 +1,115 @@
+import os
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from polo_fashions.media_pipeline import VARIANT_DIR, rename_manifest_entries, source_name
+from polo_fashions.storage import BLOB_DIR, ContentAddressedStorage, blob_name, hash_file
+from products.models import Accessory, Fabric, Innerwear, Product, ProductImage, RentalImage, RentalItem
+
+
+def image_fields():
+    return [
+        (Product, 'image'), (ProductImage, 'image'), (Fabric, 'image'),
+        (RentalItem, 'image'), (RentalImage, 'image'), (Accessory, 'image'),
+        (Innerwear, 'image'), (get_user_model(), 'measurement_photo'),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Move MEDIA_ROOT onto content-addressed blobs, merging duplicate uploads. '
+        "Only runs with IMAGE_VARIANTS['backend'] == 'local': under Cloudinary the "
+        'image columns hold Cloudinary public ids, not MEDIA_ROOT paths '
+        '(--dry-run still reports)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report savings without changing anything')
+        parser.add_argument('--prune', action='store_true', help='Also delete blobs no row refers to')
+
+    def handle(self, *args, **options):
+        root = Path(settings.MEDIA_ROOT)
+        storage = ContentAddressedStorage(
+            backend='django.core.files.storage.FileSystemStorage',
+            options={'location': str(root), 'base_url': settings.MEDIA_URL},
+        )
+
+        # 1. Group the existing files by content
+        groups = defaultdict(list)
+        for path in sorted(root.rglob('*')):
+            relative = path.relative_to(root)
+            if not path.is_file() or relative.parts[0] in (VARIANT_DIR, BLOB_DIR):
+                continue
+            with open(path, 'rb') as content:
+                groups[hash_file(content)].append(relative.as_posix())
+
+        files = sum(len(names) for names in groups.values())
+        duplicate_bytes = sum(
+            (root / name).stat().st_size for names in groups.values() for name in names[1:]
+        )
+        self.stdout.write(
+            f'{files} files, {len(groups)} distinct; '
+            f'{files - len(groups)} duplicates holding {duplicate_bytes / 1e6:.1f} MB'
+        )
+        if options['dry_run']:
+            return
+        # 🚫 Cloudinary rows would be rewritten to blob names it can't serve
+        if settings.IMAGE_VARIANTS['backend'] != 'local':
+            raise CommandError(
+                "dedupe_media only runs with IMAGE_VARIANTS['backend'] == 'local'"
+            )
+
+        # 2. One blob per distinct content
+        renamed = {}
+        for digest, names in groups.items():
+            target = blob_name(digest, os.path.splitext(names[0])[1])
+            if not storage.exists(target):
+                with open(root / names[0], 'rb') as content:
+                    target = storage.save(names[0], content)
+            for name in names:
+                renamed[name] = target
+
+        # 3. Point every row at its blob; save() so search, snapshots and
+        #    catalog versions follow as they do for any other edit
+        rows = 0
+        with transaction.atomic():
+            for model, field_name in image_fields():
+                field = model._meta.get_field(field_name)
+                for obj in model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True}):
+                    name = source_name(getattr(obj, field_name))
+                    if name in renamed:
+                        setattr(obj, field_name, field.to_python(renamed[name]))
+                        obj.save(update_fields=[field_name])
+                        rows += 1
+
+        # 4. Variants already rendered now belong to the blob names
+        rename_manifest_entries(renamed)
+
+        # 5. Only now that nothing refers to them, drop the old copies
+        for name in renamed:
+            (root / name).unlink(missing_ok=True)
+
+        pruned = self.prune(root, storage) if options['prune'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Stored {len(groups)} blobs, rewrote {rows} rows, '
+            f'freed {duplicate_bytes / 1e6:.1f} MB'
+            + (f', pruned {pruned} unreferenced blobs' if pruned else '')
+        ))
+
+    def prune(self, root, storage):
+        referenced = set()
+        for model, field_name in image_fields():
+            for value in model.objects.values_list(field_name, flat=True):
+                if value:
+                    referenced.add(source_name(value))
+        pruned = 0
+        for path in (root / BLOB_DIR).rglob('*'):
+            name = path.relative_to(root).as_posix()
+            if path.is_file() and name not in referenced:
+                path.unlink()
+                pruned += 1
+        return pruned
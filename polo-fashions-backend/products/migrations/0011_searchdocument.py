@@ -0,0 +1,132 @@
+# Generated by Django 6.0 on 2026-10-18 16:34
+
+from django.db import migrations, models
+
+# Backend-specific full-text index over products_searchdocument; see
+# products/search.py for the queries that use it.
+
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE products_searchdocument_fts USING fts5("
+    "title, keywords, body, content='products_searchdocument', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER products_searchdocument_ai AFTER INSERT ON products_searchdocument BEGIN "
+    "INSERT INTO products_searchdocument_fts(rowid, title, keywords, body) "
+    "VALUES (new.id, new.title, new.keywords, new.body); END",
+    "CREATE TRIGGER products_searchdocument_ad AFTER DELETE ON products_searchdocument BEGIN "
+    "INSERT INTO products_searchdocument_fts(products_searchdocument_fts, rowid, title, keywords, body) "
+    "VALUES ('delete', old.id, old.title, old.keywords, old.body); END",
+    "CREATE TRIGGER products_searchdocument_au AFTER UPDATE ON products_searchdocument BEGIN "
+    "INSERT INTO products_searchdocument_fts(products_searchdocument_fts, rowid, title, keywords, body) "
+    "VALUES ('delete', old.id, old.title, old.keywords, old.body); "
+    "INSERT INTO products_searchdocument_fts(rowid, title, keywords, body) "
+    "VALUES (new.id, new.title, new.keywords, new.body); END",
+]
+
+POSTGRES_TSVECTOR = [
+    "ALTER TABLE products_searchdocument ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(keywords, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(body, '')), 'C')"
+    ") STORED",
+    "CREATE INDEX products_searchdocument_vector_idx "
+    "ON products_searchdocument USING gin (search_vector)",
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {"sqlite": SQLITE_FTS, "postgresql": POSTGRES_TSVECTOR}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            schema_editor.execute(
+                f"DROP TRIGGER IF EXISTS products_searchdocument_{suffix}"
+            )
+        schema_editor.execute("DROP TABLE IF EXISTS products_searchdocument_fts")
+    elif vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS products_searchdocument_vector_idx")
+        schema_editor.execute(
+            "ALTER TABLE products_searchdocument DROP COLUMN IF EXISTS search_vector"
+        )
+
+
+# Frozen copy of products.search.document_fields as it was when this
+# migration was written
+KEYWORD_FIELDS = ("brand", "category", "type", "color")
+
+
+def document_fields(obj):
+    keywords = []
+    for field in KEYWORD_FIELDS:
+        value = getattr(obj, field, None)
+        if value:
+            keywords.append(str(value))
+    return {
+        "title": obj.name,
+        "keywords": " ".join(keywords)[:500],
+        "body": obj.description or "",
+        "is_active": obj.is_active,
+    }
+
+
+def index_catalog(apps, schema_editor):
+    SearchDocument = apps.get_model("products", "SearchDocument")
+    collections = {
+        "products": "Product",
+        "fabrics": "Fabric",
+        "rentals": "RentalItem",
+        "accessories": "Accessory",
+        "innerwear": "Innerwear",
+    }
+    documents = [
+        SearchDocument(collection=collection, object_id=obj.pk, **document_fields(obj))
+        for collection, model_name in collections.items()
+        for obj in apps.get_model("products", model_name).objects.iterator()
+    ]
+    SearchDocument.objects.bulk_create(documents, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0010_catalogversion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("collection", models.CharField(max_length=20)),
+                ("object_id", models.PositiveIntegerField()),
+                ("title", models.CharField(max_length=200)),
+                ("keywords", models.CharField(blank=True, max_length=500)),
+                ("body", models.TextField(blank=True)),
+                ("is_active", models.BooleanField(default=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("collection", "object_id"),
+                        name="unique_search_document",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(index_catalog, migrations.RunPython.noop),
+    ]
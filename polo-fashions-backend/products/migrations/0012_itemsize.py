@@ -0,0 +1,78 @@
+# Generated by Django 6.0 on 2026-10-18 16:36
+
+from django.db import migrations, models
+
+# Frozen copy of products.sizes.normalize_sizes as it was when this
+# migration was written
+MAX_SIZE_LENGTH = 20
+
+
+def normalize_sizes(sizes):
+    if not isinstance(sizes, list):
+        return []
+    labels = (
+        str(size).strip().upper()[:MAX_SIZE_LENGTH]
+        for size in sizes
+        if size is not None
+    )
+    return list(dict.fromkeys(label for label in labels if label))
+
+
+def populate_item_sizes(apps, schema_editor):
+    ItemSize = apps.get_model("products", "ItemSize")
+    collections = {
+        "products": "Product",
+        "rentals": "RentalItem",
+        "innerwear": "Innerwear",
+    }
+    rows = [
+        ItemSize(collection=collection, object_id=pk, size=size)
+        for collection, model_name in collections.items()
+        for pk, sizes in apps.get_model("products", model_name)
+        .objects.values_list("pk", "sizes")
+        .iterator()
+        for size in normalize_sizes(sizes)
+    ]
+    ItemSize.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0011_searchdocument"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ItemSize",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("collection", models.CharField(max_length=20)),
+                ("object_id", models.PositiveIntegerField()),
+                ("size", models.CharField(max_length=20)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["collection", "size", "object_id"],
+                        name="item_size_lookup_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("collection", "object_id", "size"),
+                        name="unique_item_size",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_item_sizes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 6.0 on 2026-10-18 16:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0012_itemsize"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockLevel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("collection", models.CharField(max_length=20)),
+                ("object_id", models.PositiveIntegerField()),
+                ("size", models.CharField(blank=True, default="", max_length=20)),
+                ("shard", models.PositiveSmallIntegerField(default=0)),
+                ("quantity", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("collection", "object_id", "size", "shard"),
+                        name="unique_stock_shard",
+                    ),
+                    models.CheckConstraint(
+                        condition=models.Q(("quantity__gte", 0)),
+                        name="stock_quantity_non_negative",
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="StockMovement",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("collection", models.CharField(max_length=20)),
+                ("object_id", models.PositiveIntegerField()),
+                ("size", models.CharField(blank=True, default="", max_length=20)),
+                ("delta", models.IntegerField()),
+                (
+                    "reason",
+                    models.CharField(
+                        choices=[
+                            ("adjust", "Adjustment"),
+                            ("order", "Order"),
+                            ("release", "Release"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "order_id",
+                    models.PositiveIntegerField(blank=True, db_index=True, null=True),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["collection", "object_id", "size"],
+                        name="stock_movement_item_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -126,4 +126,121 @@ class Fabric(models.Model):
         return f"{self.name} - {self.color}"
 
     class Meta:
-        ordering = ['name']
\ No newline at end of file
+        ordering = ['name']
+
+class CatalogVersion(models.Model):
+    """
+    Per-collection change counter for the catalog.
+
+    Bumped by products.signals whenever an item (or one of its gallery
+    images) is saved or deleted. Reading one row tells a client whether
+    the collection changed, which is what the ETags are built from.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class SearchDocument(models.Model):
+    """
+    One row per catalog item, flattened for full-text search.
+
+    Kept in step with the catalog by products.signals; the backend-specific
+    index (SQLite FTS5 table or PostgreSQL tsvector column) is maintained by
+    the database itself from these columns, see products.search.
+    """
+    collection = models.CharField(max_length=20)
+    object_id = models.PositiveIntegerField()
+    title = models.CharField(max_length=200)
+    keywords = models.CharField(max_length=500, blank=True)
+    body = models.TextField(blank=True)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['collection', 'object_id'], name='unique_search_document'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.collection}:{self.object_id} {self.title}"
+
+
+class ItemSize(models.Model):
+    """
+    One row per (catalog item, size), mirrored from the item's ``sizes``
+    JSON by products.signals so size filters and counts are index lookups.
+    """
+    collection = models.CharField(max_length=20)
+    object_id = models.PositiveIntegerField()
+    size = models.CharField(max_length=20)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['collection', 'object_id', 'size'], name='unique_item_size'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['collection', 'size', 'object_id'], name='item_size_lookup_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.collection}:{self.object_id} {self.size}"
+
+
+class StockLevel(models.Model):
+    """
+    Units on hand of one catalog item in one size (``''`` for items without
+    sizes). A hot item's stock is split over several ``shard`` rows so
+    concurrent checkouts update different rows; the stock is their sum.
+    Items with no rows at all are not stock-tracked. See products.stock.
+    """
+    collection = models.CharField(max_length=20)
+    object_id = models.PositiveIntegerField()
+    size = models.CharField(max_length=20, blank=True, default='')
+    shard = models.PositiveSmallIntegerField(default=0)
+    quantity = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['collection', 'object_id', 'size', 'shard'], name='unique_stock_shard'
+            ),
+            models.CheckConstraint(
+                condition=models.Q(quantity__gte=0), name='stock_quantity_non_negative'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.collection}:{self.object_id} {self.size or '-'} #{self.shard} = {self.quantity}"
+
+
+class StockMovement(models.Model):
+    """Append-only ledger of every stock change; sums to the current stock."""
+    REASON_CHOICES = [
+        ('adjust', 'Adjustment'),
+        ('order', 'Order'),
+        ('release', 'Release'),
+    ]
+
+    collection = models.CharField(max_length=20)
+    object_id = models.PositiveIntegerField()
+    size = models.CharField(max_length=20, blank=True, default='')
+    delta = models.IntegerField()
+    reason = models.CharField(max_length=10, choices=REASON_CHOICES)
+    # orders.Order id; not a FK so the catalog app does not depend on orders
+    order_id = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['collection', 'object_id', 'size'], name='stock_movement_item_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.collection}:{self.object_id} {self.size or '-'} {self.delta:+d} ({self.reason})"
@@ -0,0 +1,149 @@
+# products/search.py
+"""
+Full-text search over the whole catalog.
+
+Every item is mirrored into a ``SearchDocument`` row (title / keywords /
+body) by products.signals, in the same transaction as the write. The
+database indexes those rows itself:
+
+* SQLite: an external-content FTS5 table, ``products_searchdocument_fts``,
+  kept in sync by triggers and ranked with bm25().
+* PostgreSQL: a stored, generated ``search_vector`` tsvector column with a
+  GIN index, ranked with ts_rank().
+
+Both are created by migration 0011. Other backends fall back to
+``icontains`` so the endpoint still works, just without the index.
+
+``python manage.py rebuild_search_index`` regenerates every document, e.g.
+after changing what goes into one.
+"""
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from . import versions
+from .models import Accessory, Fabric, Innerwear, Product, RentalItem, SearchDocument
+
+MODEL_BY_COLLECTION = {
+    versions.PRODUCTS: Product,
+    versions.FABRICS: Fabric,
+    versions.RENTALS: RentalItem,
+    versions.ACCESSORIES: Accessory,
+    versions.INNERWEAR: Innerwear,
+}
+COLLECTION_BY_MODEL = {model: name for name, model in MODEL_BY_COLLECTION.items()}
+
+# Relative weight of a match in the title, keywords and body
+FTS_WEIGHTS = (10.0, 4.0, 1.0)
+
+MAX_TERMS = 8
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+# Attributes folded into ``keywords`` when the model has them
+KEYWORD_FIELDS = ('brand', 'category', 'type', 'color')
+
+
+def document_fields(obj):
+    """Column values of the ``SearchDocument`` for a catalog item."""
+    keywords = []
+    for field in KEYWORD_FIELDS:
+        value = getattr(obj, field, None)
+        if value:
+            keywords.append(str(value))
+    return {
+        'title': obj.name,
+        'keywords': ' '.join(keywords)[:500],
+        'body': obj.description or '',
+        'is_active': obj.is_active,
+    }
+
+
+def index_item(obj):
+    SearchDocument.objects.update_or_create(
+        collection=COLLECTION_BY_MODEL[type(obj)], object_id=obj.pk,
+        defaults=document_fields(obj),
+    )
+
+
+def unindex_item(model, pk):
+    SearchDocument.objects.filter(collection=COLLECTION_BY_MODEL[model], object_id=pk).delete()
+
+
+@transaction.atomic
+def rebuild_search_index():
+    """Regenerate every document from the catalog tables; returns the count."""
+    SearchDocument.objects.all().delete()
+    documents = [
+        SearchDocument(collection=collection, object_id=obj.pk, **document_fields(obj))
+        for collection, model in MODEL_BY_COLLECTION.items()
+        for obj in model.objects.iterator()
+    ]
+    SearchDocument.objects.bulk_create(documents, batch_size=500)
+    return len(documents)
+
+
+def search_terms(q):
+    """Lower-cased word tokens of a user query; punctuation never reaches SQL."""
+    return _TERM.findall(q.lower())[:MAX_TERMS]
+
+
+def search_catalog(q, limit=20):
+    """
+    ``[(collection, object_id, score), ...]`` for active items matching every
+    word of ``q`` (the last word may be a prefix), best match first.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return []
+    if connection.vendor == 'sqlite':
+        return _fts5_search(terms, limit)
+    if connection.vendor == 'postgresql':
+        return _tsvector_search(terms, limit)
+    return _fallback_search(terms, limit)
+
+
+def _fts5_search(terms, limit):
+    # Quoted terms are literal strings to FTS5; a trailing * makes a prefix match
+    match = ' '.join(f'"{term}"*' for term in terms)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT d.collection, d.object_id, -bm25(products_searchdocument_fts, %s, %s, %s) AS score
+            FROM products_searchdocument_fts
+            JOIN products_searchdocument d ON d.id = products_searchdocument_fts.rowid
+            WHERE products_searchdocument_fts MATCH %s AND d.is_active
+            ORDER BY score DESC
+            LIMIT %s
+            """,
+            [*FTS_WEIGHTS, match, limit],
+        )
+        return cursor.fetchall()
+
+
+def _tsvector_search(terms, limit):
+    query = ' & '.join(f'{term}:*' for term in terms)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT collection, object_id, ts_rank(search_vector, query) AS score
+            FROM products_searchdocument, to_tsquery('english', %s) query
+            WHERE search_vector @@ query AND is_active
+            ORDER BY score DESC
+            LIMIT %s
+            """,
+            [query, limit],
+        )
+        return cursor.fetchall()
+
+
+def _fallback_search(terms, limit):
+    documents = SearchDocument.objects.filter(is_active=True)
+    for term in terms:
+        documents = documents.filter(
+            Q(title__icontains=term) | Q(keywords__icontains=term) | Q(body__icontains=term)
+        )
+    return [
+        (collection, object_id, 1.0)
+        for collection, object_id in documents.values_list('collection', 'object_id')[:limit]
+    ]
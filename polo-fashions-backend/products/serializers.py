@@ -1,30 +1,37 @@
 from rest_framework import serializers
+from polo_fashions.images import image_url, image_variants
 from .models import Product, Fabric, ProductImage, RentalItem, Accessory, Innerwear, RentalImage
 
 
 class ProductImageSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
     
     def get_image(self, obj):
         """Return full Cloudinary URL"""
-        if obj.image:
-            return obj.image.url  # ✅ This returns full URL
-        return None
+        return image_url(obj.image)  # ✅ This returns full URL
+
+    def get_image_variants(self, obj):
+        """Resized copies for srcset, from settings.IMAGE_VARIANTS"""
+        return image_variants(obj.image)
     
     class Meta:
         model = ProductImage
-        fields = ["id", "image"]
+        fields = ["id", "image", "image_variants"]
 
 
 class ProductSerializer(serializers.ModelSerializer):
     images = ProductImageSerializer(many=True, read_only=True)
     image = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
     
     def get_image(self, obj):
         """Return full Cloudinary URL for main image"""
-        if obj.image:
-            return obj.image.url
-        return None
+        return image_url(obj.image)
+
+    def get_image_variants(self, obj):
+        """Resized copies for srcset, from settings.IMAGE_VARIANTS"""
+        return image_variants(obj.image)
     
     class Meta:
         model = Product
@@ -33,27 +40,33 @@ class ProductSerializer(serializers.ModelSerializer):
 
 class RentalImageSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
     
     def get_image(self, obj):
         """Return full Cloudinary URL"""
-        if obj.image:
-            return obj.image.url
-        return None
+        return image_url(obj.image)
+
+    def get_image_variants(self, obj):
+        """Resized copies for srcset, from settings.IMAGE_VARIANTS"""
+        return image_variants(obj.image)
     
     class Meta:
         model = RentalImage
-        fields = ["id", "image"]
+        fields = ["id", "image", "image_variants"]
 
 
 class RentalItemSerializer(serializers.ModelSerializer):
     images = RentalImageSerializer(many=True, read_only=True)
     image = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
     
     def get_image(self, obj):
         """Return full Cloudinary URL for main image"""
-        if obj.image:
-            return obj.image.url
-        return None
+        return image_url(obj.image)
+
+    def get_image_variants(self, obj):
+        """Resized copies for srcset, from settings.IMAGE_VARIANTS"""
+        return image_variants(obj.image)
 
     class Meta:
         model = RentalItem
@@ -62,12 +75,15 @@ class RentalItemSerializer(serializers.ModelSerializer):
 
 class AccessorySerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
     
     def get_image(self, obj):
         """Return full Cloudinary URL"""
-        if obj.image:
-            return obj.image.url
-        return None
+        return image_url(obj.image)
+
+    def get_image_variants(self, obj):
+        """Resized copies for srcset, from settings.IMAGE_VARIANTS"""
+        return image_variants(obj.image)
     
     class Meta:
         model = Accessory
@@ -76,12 +92,15 @@ class AccessorySerializer(serializers.ModelSerializer):
 
 class InnerwearSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
     
     def get_image(self, obj):
         """Return full Cloudinary URL"""
-        if obj.image:
-            return obj.image.url
-        return None
+        return image_url(obj.image)
+
+    def get_image_variants(self, obj):
+        """Resized copies for srcset, from settings.IMAGE_VARIANTS"""
+        return image_variants(obj.image)
     
     class Meta:
         model = Innerwear
@@ -90,12 +109,15 @@ class InnerwearSerializer(serializers.ModelSerializer):
 
 class FabricSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
     
     def get_image(self, obj):
         """Return full Cloudinary URL"""
-        if obj.image:
-            return obj.image.url
-        return None
+        return image_url(obj.image)
+
+    def get_image_variants(self, obj):
+        """Resized copies for srcset, from settings.IMAGE_VARIANTS"""
+        return image_variants(obj.image)
     
     class Meta:
         model = Fabric
@@ -0,0 +1,68 @@
+# products/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from polo_fashions.media_pipeline import optimize_on_commit
+
+from .models import Accessory, Fabric, Innerwear, Product, ProductImage, RentalImage, RentalItem
+from .search import COLLECTION_BY_MODEL as SEARCHABLE_MODELS, index_item, unindex_item
+from .sizes import COLLECTION_BY_MODEL as SIZED_MODELS, clear_item_sizes, sync_item_sizes
+from .stock import STOCKED_COLLECTIONS, clear_stock
+from .versions import (
+    ACCESSORIES, FABRICS, INNERWEAR, PRODUCTS, RENTALS, bump_catalog_version,
+)
+
+COLLECTION_BY_MODEL = {
+    Product: PRODUCTS,
+    ProductImage: PRODUCTS,
+    Fabric: FABRICS,
+    RentalItem: RENTALS,
+    RentalImage: RENTALS,
+    Accessory: ACCESSORIES,
+    Innerwear: INNERWEAR,
+}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_version_on_catalog_change(sender, raw=False, **kwargs):
+    collection = COLLECTION_BY_MODEL.get(sender)
+    if collection and not raw:
+        bump_catalog_version(collection)
+
+
+# The search document is written in the same transaction as the item, so
+# search never sees an item the catalog doesn't (or vice versa).
+@receiver(post_save)
+def index_catalog_item(sender, instance, raw=False, **kwargs):
+    if sender in SEARCHABLE_MODELS and not raw:
+        index_item(instance)
+
+
+@receiver(post_delete)
+def unindex_catalog_item(sender, instance, **kwargs):
+    if sender in SEARCHABLE_MODELS:
+        unindex_item(sender, instance.pk)
+
+
+@receiver(post_save)
+def sync_sizes_on_save(sender, instance, raw=False, **kwargs):
+    if sender in SIZED_MODELS and not raw:
+        sync_item_sizes(instance)
+
+
+@receiver(post_delete)
+def clear_sizes_on_delete(sender, instance, **kwargs):
+    if sender in SIZED_MODELS:
+        clear_item_sizes(sender, instance.pk)
+
+
+@receiver(post_delete)
+def clear_stock_on_delete(sender, instance, **kwargs):
+    if sender in STOCKED_COLLECTIONS:
+        clear_stock(sender, instance.pk)
+
+
+@receiver(post_save)
+def optimize_catalog_images(sender, instance, raw=False, **kwargs):
+    if sender in COLLECTION_BY_MODEL and not raw:
+        optimize_on_commit(instance, 'image')
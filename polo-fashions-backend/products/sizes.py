@@ -0,0 +1,79 @@
+# products/sizes.py
+"""
+Normalized sizes for the catalog items that have a ``sizes`` JSON list.
+
+The JSON stays the source of truth (the admin and the API edit it); every
+save rewrites the item's ``ItemSize`` rows in the same transaction, so
+"which items come in XL" is an indexed lookup on
+``(collection, size, object_id)`` on any database backend.
+"""
+from django.db import transaction
+from django.db.models import Count
+
+from . import versions
+from .models import Innerwear, ItemSize, Product, RentalItem
+
+COLLECTION_BY_MODEL = {
+    Product: versions.PRODUCTS,
+    RentalItem: versions.RENTALS,
+    Innerwear: versions.INNERWEAR,
+}
+
+MAX_SIZE_LENGTH = 20
+
+
+def normalize_size(size):
+    return str(size).strip().upper()[:MAX_SIZE_LENGTH]
+
+
+def normalize_sizes(sizes):
+    """Distinct, normalized labels from a ``sizes`` value, in their original order."""
+    if not isinstance(sizes, list):
+        return []
+    labels = (normalize_size(size) for size in sizes if size is not None)
+    return list(dict.fromkeys(label for label in labels if label))
+
+
+def size_rows(collection, obj):
+    return [
+        ItemSize(collection=collection, object_id=obj.pk, size=size)
+        for size in normalize_sizes(obj.sizes)
+    ]
+
+
+def sync_item_sizes(obj):
+    """Replace an item's size rows with the ones its JSON describes."""
+    collection = COLLECTION_BY_MODEL[type(obj)]
+    wanted = set(normalize_sizes(obj.sizes))
+    rows = ItemSize.objects.filter(collection=collection, object_id=obj.pk)
+    current = set(rows.values_list('size', flat=True))
+    if current == wanted:
+        return
+    with transaction.atomic():
+        rows.exclude(size__in=wanted).delete()
+        ItemSize.objects.bulk_create(
+            [ItemSize(collection=collection, object_id=obj.pk, size=s) for s in wanted - current],
+            ignore_conflicts=True,
+        )
+
+
+def clear_item_sizes(model, pk):
+    ItemSize.objects.filter(collection=COLLECTION_BY_MODEL[model], object_id=pk).delete()
+
+
+def items_in_sizes(collection, sizes):
+    """Subquery of the ids of items offering any of ``sizes``."""
+    return ItemSize.objects.filter(
+        collection=collection, size__in=[normalize_size(size) for size in sizes]
+    ).values('object_id')
+
+
+def size_counts(collection, queryset):
+    """``{size: item count}`` over the items in ``queryset``, in one grouped query."""
+    rows = (
+        ItemSize.objects.filter(collection=collection, object_id__in=queryset.values('pk'))
+        .values('size')
+        .annotate(count=Count('object_id'))
+        .order_by('-count', 'size')
+    )
+    return {row['size']: row['count'] for row in rows}
@@ -0,0 +1,207 @@
+# products/stock.py
+"""
+Per-item, per-size stock.
+
+``StockLevel`` holds the units on hand of an item in a size, split over
+``settings.STOCK_SHARDS`` rows. A checkout takes its units from one shard
+with a single conditional UPDATE:
+
+    UPDATE products_stocklevel SET quantity = quantity - n
+    WHERE <item, size, shard> AND quantity >= n
+
+so the check and the decrement are one statement and two checkouts can
+never both take the last unit (the CHECK constraint backs this up). Each
+checkout starts at a random shard, so concurrent buyers of a hot item
+mostly wait on different rows. Only when no single shard holds enough are
+all of the item's shards locked and drained together.
+
+Every change is also appended to the ``StockMovement`` ledger, tagged
+with the order it belongs to; that is how ``release_order_stock`` knows
+what a deleted order or a returned rental gives back. Items without any
+StockLevel rows are not tracked and never run out.
+"""
+import random
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+
+from . import versions
+from .models import Accessory, Innerwear, Product, RentalItem, StockLevel, StockMovement
+from .sizes import COLLECTION_BY_MODEL as SIZED_MODELS, normalize_size
+
+STOCKED_COLLECTIONS = {
+    Product: versions.PRODUCTS,
+    RentalItem: versions.RENTALS,
+    Accessory: versions.ACCESSORIES,
+    Innerwear: versions.INNERWEAR,
+}
+
+# Order FKs that take stock (fabric is sold by the meter and not counted)
+STOCK_SOURCES = ('product', 'rental_item', 'accessory', 'innerwear')
+
+
+class InsufficientStock(Exception):
+    """Raised when an order asks for more units than are on hand."""
+
+    def __init__(self, item, size, requested, available):
+        self.item = item
+        self.size = size
+        self.requested = requested
+        self.available = available
+        label = f"{item.name} ({size})" if size else item.name
+        if available:
+            message = f"Only {available} left of {label}"
+        else:
+            message = f"{label} is out of stock"
+        super().__init__(message)
+
+
+def stock_key(item, size=''):
+    """Lookup of an item's stock rows; sizes only count for sized items."""
+    return {
+        'collection': STOCKED_COLLECTIONS[type(item)],
+        'object_id': item.pk,
+        'size': normalize_size(size) if size and type(item) in SIZED_MODELS else '',
+    }
+
+
+def _split(quantity, shards):
+    base, extra = divmod(quantity, shards)
+    return [base + (1 if shard < extra else 0) for shard in range(shards)]
+
+
+def _put_back(key, quantity):
+    """Add units to the emptiest shard; False if the item/size is not tracked."""
+    shard = (
+        StockLevel.objects.filter(**key)
+        .order_by('quantity', 'shard')
+        .values_list('shard', flat=True)
+        .first()
+    )
+    if shard is None:
+        return False
+    StockLevel.objects.filter(**key, shard=shard).update(quantity=F('quantity') + quantity)
+    return True
+
+
+@transaction.atomic
+def set_stock(item, quantity, size='', shards=None):
+    """Set the units on hand of an item/size, spread evenly over the shards."""
+    key = stock_key(item, size)
+    shards = shards or settings.STOCK_SHARDS
+    rows = StockLevel.objects.filter(**key)
+    previous = sum(rows.select_for_update().values_list('quantity', flat=True))
+    rows.delete()
+    StockLevel.objects.bulk_create([
+        StockLevel(**key, shard=shard, quantity=units)
+        for shard, units in enumerate(_split(quantity, shards))
+    ])
+    if quantity != previous:
+        StockMovement.objects.create(**key, delta=quantity - previous, reason='adjust')
+
+
+@transaction.atomic
+def add_stock(item, quantity, size=''):
+    """Receive ``quantity`` more units, starting to track the item/size if needed."""
+    key = stock_key(item, size)
+    if not _put_back(key, quantity):
+        return set_stock(item, quantity, size)
+    StockMovement.objects.create(**key, delta=quantity, reason='adjust')
+
+
+def clear_stock(model, pk):
+    StockLevel.objects.filter(collection=STOCKED_COLLECTIONS[model], object_id=pk).delete()
+
+
+def stock_levels(item):
+    """``{size: units}`` for a tracked item (``''`` for no size), ``{}`` if untracked."""
+    rows = (
+        StockLevel.objects.filter(collection=STOCKED_COLLECTIONS[type(item)], object_id=item.pk)
+        .values('size')
+        .annotate(units=Sum('quantity'))
+        .order_by('size')
+    )
+    return {row['size']: row['units'] for row in rows}
+
+
+def _take_across_shards(item, key, quantity):
+    # Lock every shard in shard order (so two of these cannot deadlock) and
+    # drain them one after the other
+    levels = list(StockLevel.objects.select_for_update().filter(**key).order_by('shard'))
+    available = sum(level.quantity for level in levels)
+    if available < quantity:
+        raise InsufficientStock(item, key['size'], quantity, available)
+    remaining = quantity
+    for level in levels:
+        take = min(level.quantity, remaining)
+        if take:
+            StockLevel.objects.filter(pk=level.pk).update(quantity=F('quantity') - take)
+            remaining -= take
+        if not remaining:
+            break
+
+
+def reserve_stock(item, quantity, size='', order_id=None):
+    """
+    Take ``quantity`` units of an item/size for an order.
+
+    Must run inside the order's transaction, so a failed checkout gives the
+    units back with the rollback. Returns False when the item is not
+    stock-tracked and raises InsufficientStock when the units aren't there.
+    """
+    key = stock_key(item, size)
+    rows = list(StockLevel.objects.filter(
+        collection=key['collection'], object_id=key['object_id'],
+    ).values_list('size', 'shard'))
+    if not rows:
+        return False
+    shards = [shard for row_size, shard in rows if row_size == key['size']]
+    if not shards:
+        # Tracked, but never stocked in this size
+        raise InsufficientStock(item, key['size'], quantity, 0)
+
+    start = random.randrange(len(shards))
+    for shard in shards[start:] + shards[:start]:
+        taken = StockLevel.objects.filter(**key, shard=shard, quantity__gte=quantity).update(
+            quantity=F('quantity') - quantity
+        )
+        if taken:
+            break
+    else:
+        _take_across_shards(item, key, quantity)
+
+    StockMovement.objects.create(**key, delta=-quantity, reason='order', order_id=order_id)
+    return True
+
+
+def reserve_order_stock(order, sources=STOCK_SOURCES):
+    """Reserve stock for every tracked item an order points at."""
+    for source in sources:
+        item = getattr(order, source)
+        if item is not None:
+            reserve_stock(item, order.quantity, order.size, order_id=order.pk)
+
+
+def release_order_stock(order_ids):
+    """
+    Give back whatever the orders still hold (deleted orders, returned
+    rentals). Safe to call twice: the ledger already nets out what was
+    released. Call inside the transaction that changes the orders.
+    """
+    held = (
+        StockMovement.objects.filter(order_id__in=order_ids)
+        .values('order_id', 'collection', 'object_id', 'size')
+        .annotate(net=Sum('delta'))
+        .filter(net__lt=0)
+        .order_by()
+    )
+    movements = []
+    for row in held:
+        key = {field: row[field] for field in ('collection', 'object_id', 'size')}
+        _put_back(key, -row['net'])
+        movements.append(StockMovement(
+            **key, delta=-row['net'], reason='release', order_id=row['order_id'],
+        ))
+    StockMovement.objects.bulk_create(movements)
+    return len(movements)
@@ -1,3 +1,566 @@
-from django.test import TestCase
+import shutil
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
 
-# Create your tests here.
+import cloudinary
+from cloudinary import CloudinaryResource
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from polo_fashions.images import clear_image_url_cache, image_url, image_url_cache_info, image_variants
+from polo_fashions.media_pipeline import clear_manifest_cache, load_manifest, source_name, wait_for_pending
+from polo_fashions.storage import ContentAddressedStorage
+from rest_framework.test import APIClient
+
+from .cache import cache_stats, get_or_compute
+from .models import Accessory, CatalogVersion, Fabric, ItemSize, Product, ProductImage, RentalItem, SearchDocument
+
+
+class CatalogTestMixin:
+    @classmethod
+    def setUpTestData(cls):
+        # Image URLs are built locally, but cloudinary refuses to without a cloud name.
+        if not cloudinary.config().cloud_name:
+            cloudinary.config(cloud_name='polo-test')
+        cls.product = Product.objects.create(
+            name='Formal Shirt', category='shirt', type='readymade',
+            description='Cotton shirt', image='products/shirt', brand='Polo',
+            price=Decimal('799.00'), sizes=['M', 'L'],
+        )
+        cls.accessory = Accessory.objects.create(
+            name='Leather Belt', category='belt', price=Decimal('299.00'),
+            image='accessories/belt',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+
+class CatalogConditionalGetTests(CatalogTestMixin, TestCase):
+    def test_unchanged_collection_is_not_modified(self):
+        first = self.client.get('/api/products/')
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('Last-Modified', first)
+        with self.assertNumQueries(0):  # version comes from the cache
+            again = self.client.get('/api/products/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+        again = self.client.get('/api/products/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(again.status_code, 304)
+
+    def test_item_and_gallery_changes_invalidate(self):
+        etag = self.client.get('/api/products/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductImage.objects.create(product=self.product, image='products/shirt_1')
+        response = self.client.get('/api/products/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.price = Decimal('699.00')
+            self.product.save()
+        response = self.client.get('/api/products/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_models_without_updated_at_are_versioned(self):
+        etag = self.client.get(f'/api/accessories/{self.accessory.id}/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.accessory.delete()
+        response = self.client.get(f'/api/accessories/{self.accessory.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 404)
+
+
+class CatalogResponseCacheTests(CatalogTestMixin, TestCase):
+    def test_warm_reads_skip_queries_and_serializer(self):
+        first = self.client.get('/api/products/', {'page': 'x'})
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/products/', {'page': 'x'})
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+        # Different query string, different entry
+        self.assertEqual(self.client.get('/api/products/')['X-Cache'], 'MISS')
+
+    def test_writes_invalidate_cached_responses(self):
+        self.client.get(f'/api/products/{self.product.id}/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.name = 'Oxford Shirt'
+            self.product.save()
+        response = self.client.get(f'/api/products/{self.product.id}/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['name'], 'Oxford Shirt')
+
+    def test_missing_items_are_not_cached(self):
+        self.assertEqual(self.client.get('/api/products/999999/').status_code, 404)
+        self.assertEqual(self.client.get('/api/products/999999/').status_code, 404)
+        self.assertEqual(cache_stats()['hits'], 0)
+
+    def test_stats_endpoint_is_admin_only(self):
+        User = get_user_model()
+        admin = User.objects.create_user(username='admin', password='pass', role='admin')
+        self.client.get('/api/products/')
+        self.client.get('/api/products/')
+        self.client.force_authenticate(admin)
+        stats = self.client.get('/api/catalog/cache-stats/').data
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.client.force_authenticate(User.objects.create_user(username='c', password='pass'))
+        self.assertEqual(self.client.get('/api/catalog/cache-stats/').status_code, 403)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'rows': 42}, True
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(get_or_compute('k', compute)))
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual({value['rows'] for value, _ in results}, {42})
+        self.assertEqual(sorted(outcome for _, outcome in results).count('miss'), 1)
+
+
+class UnifiedCatalogTests(CatalogTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        ProductImage.objects.create(product=cls.product, image='products/shirt_1')
+        ProductImage.objects.create(product=cls.product, image='products/shirt_2')
+        Product.objects.create(
+            name='Old Shirt', category='shirt', type='readymade', image='products/old',
+            price=Decimal('99.00'), sizes=['M'], is_active=False,
+        )
+        RentalItem.objects.create(
+            name='Sherwani', sizes=['M'], color='Gold', price_per_day=Decimal('1500.00'),
+            deposit_amount=Decimal('5000.00'), image='rentals/sherwani',
+        )
+
+    def test_snapshot_is_built_with_fixed_queries(self):
+        # One version lookup, then one query per collection and gallery
+        with self.assertNumQueries(8):
+            response = self.client.get('/api/catalog/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(
+            set(response.data), {'products', 'fabrics', 'rentals', 'accessories', 'innerwear'}
+        )
+        self.assertEqual([p['name'] for p in response.data['products']], ['Formal Shirt'])
+        self.assertEqual(len(response.data['products'][0]['images']), 2)
+
+        for i in range(3):
+            Product.objects.create(
+                name=f'Shirt {i}', category='shirt', type='readymade', image=f'products/s{i}',
+                price=Decimal('499.00'), sizes=['L'],
+            )
+        cache.clear()
+        with self.assertNumQueries(8):
+            self.client.get('/api/catalog/')
+
+    def test_include_selects_sections_from_one_snapshot(self):
+        self.client.get('/api/catalog/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/catalog/', {'include': 'accessories,fabrics'})
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(set(response.data), {'accessories', 'fabrics'})
+
+        response = self.client.get('/api/catalog/', {'include': 'products,shoes'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_writes_rebuild_the_snapshot(self):
+        first = self.client.get('/api/catalog/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.accessory.name = 'Suede Belt'
+            self.accessory.save()
+        response = self.client.get('/api/catalog/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['accessories'][0]['name'], 'Suede Belt')
+
+        again = self.client.get('/api/catalog/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+
+class CatalogSearchTests(CatalogTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.fabric = Fabric.objects.create(
+            name='Linen Blend', type='linen', color='White', price=Decimal('450.00'),
+            description='Breathable fabric for summer shirts',
+        )
+        Product.objects.create(
+            name='Silk Kurta', category='traditional', type='readymade', image='products/kurta',
+            brand='Polo', price=Decimal('1999.00'), description='Festive wear',
+        )
+
+    def search(self, q, **params):
+        response = self.client.get('/api/search/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(r['collection'], r['item']['name']) for r in response.data['results']]
+
+    def test_ranks_title_matches_above_description_matches(self):
+        self.assertEqual(
+            self.search('shirt'),
+            [('products', 'Formal Shirt'), ('fabrics', 'Linen Blend')],
+        )
+
+    def test_matches_keywords_prefixes_and_stems(self):
+        self.assertEqual(self.search('white lin'), [('fabrics', 'Linen Blend')])
+        self.assertEqual(self.search('belts'), [('accessories', 'Leather Belt')])
+        self.assertEqual(len(self.search('polo')), 2)
+        self.assertEqual(self.search('"; DROP TABLE x --'), [])
+
+    def test_index_follows_catalog_writes(self):
+        self.accessory.name = 'Silk Tie'
+        self.accessory.category = 'tie'
+        self.accessory.save()
+        self.assertEqual(self.search('belt'), [])
+        self.assertEqual(self.search('silk tie'), [('accessories', 'Silk Tie')])
+
+        self.fabric.is_active = False
+        self.fabric.save()
+        self.assertEqual(self.search('linen'), [])
+
+        self.product.delete()
+        self.assertEqual(SearchDocument.objects.filter(collection='products').count(), 1)
+
+    def test_rebuild_command(self):
+        SearchDocument.objects.all().delete()
+        self.assertEqual(self.search('kurta'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.search('kurta'), [('products', 'Silk Kurta')])
+
+    def test_validates_parameters(self):
+        self.assertEqual(self.client.get('/api/search/').status_code, 400)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'x', 'limit': 500}).status_code, 400)
+        self.assertEqual(len(self.search('polo', limit=1)), 1)
+
+
+class CatalogFacetTests(CatalogTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for name, category, brand, price, sizes in [
+            ('Chinos', 'pant', 'Polo', '1200.00', ['32', '34']),
+            ('Jeans', 'pant', 'Levis', '2500.00', [32, 36]),
+            ('Kurta', 'traditional', None, '450.00', None),
+        ]:
+            Product.objects.create(
+                name=name, category=category, type='readymade', image='products/x',
+                brand=brand, price=Decimal(price), sizes=sizes,
+            )
+
+    def get(self, **params):
+        response = self.client.get('/api/products/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_filters(self):
+        names = lambda data: sorted(p['name'] for p in data)
+        self.assertEqual(names(self.get(category='pant')), ['Chinos', 'Jeans'])
+        self.assertEqual(names(self.get(category='pant,traditional', brand='Polo')), ['Chinos'])
+        self.assertEqual(names(self.get(price_min='500', price_max='1200')), ['Chinos', 'Formal Shirt'])
+        self.assertEqual(names(self.get(size='32')), ['Chinos', 'Jeans'])
+        self.assertEqual(names(self.get(size='M,36')), ['Formal Shirt', 'Jeans'])
+
+        self.assertEqual(self.client.get('/api/products/', {'category': 'hat'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/products/', {'price_min': 'abc'}).status_code, 400)
+
+    def test_facet_counts_follow_the_filter(self):
+        with self.assertNumQueries(5):  # version, items, gallery, grouped facets, sizes
+            data = self.get(facets='true')
+        self.assertEqual(len(data['results']), 4)
+        facets = data['facets']
+        self.assertEqual(facets['category'], {'pant': 2, 'shirt': 1, 'traditional': 1})
+        self.assertEqual(facets['brand'], {'Polo': 2, 'Levis': 1})
+        self.assertEqual(facets['price'], {'0-500': 1, '500-1000': 1, '1000-2000': 1, '2000-5000': 1})
+        self.assertEqual(facets['size'], {'32': 2, 'M': 1, 'L': 1, '34': 1, '36': 1})
+
+        facets = self.get(facets='true', category='pant')['facets']
+        self.assertEqual(facets['category'], {'pant': 2})
+        self.assertEqual(facets['type'], {'readymade': 2})
+
+    def test_other_collections_have_their_own_facets(self):
+        facets = self.client.get('/api/accessories/', {'facets': 'true'}).data['facets']
+        self.assertEqual(facets, {'category': {'belt': 1}, 'price': {'0-500': 1}})
+
+
+class ItemSizeSyncTests(CatalogTestMixin, TestCase):
+    def sizes(self, obj):
+        return set(
+            ItemSize.objects.filter(object_id=obj.pk, collection='products')
+            .values_list('size', flat=True)
+        )
+
+    def test_rows_follow_the_json(self):
+        self.assertEqual(self.sizes(self.product), {'M', 'L'})
+        self.product.sizes = ['l', ' XL ', 'XL', 42, None]
+        self.product.save()
+        self.assertEqual(self.sizes(self.product), {'L', 'XL', '42'})
+
+        self.product.sizes = None
+        self.product.save()
+        self.assertEqual(self.sizes(self.product), set())
+
+    def test_delete_clears_rows(self):
+        product_id = self.product.id
+        self.product.delete()
+        self.assertFalse(ItemSize.objects.filter(collection='products', object_id=product_id).exists())
+
+    def test_size_filter_is_a_table_lookup(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/products/', {'size': 'm'})
+        self.assertEqual([p['name'] for p in response.data], ['Formal Shirt'])
+        self.assertTrue(any('products_itemsize' in q['sql'] for q in queries))
+        self.assertEqual(self.client.get('/api/products/', {'size': 'XXL'}).data, [])
+
+
+class ImageUrlCacheTests(SimpleTestCase):
+    def setUp(self):
+        if not cloudinary.config().cloud_name:
+            cloudinary.config(cloud_name='polo-test')
+        clear_image_url_cache()
+
+    def resource(self, version='1', **kwargs):
+        return CloudinaryResource(
+            public_id='products/shirt', version=version, format='jpg',
+            type='upload', resource_type='image', **kwargs,
+        )
+
+    def test_matches_cloudinary_and_is_memoized(self):
+        self.assertEqual(image_url(self.resource()), self.resource().url)
+        image_url(self.resource())
+        info = image_url_cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_changed_image_gets_a_new_url(self):
+        self.assertNotEqual(image_url(self.resource('1')), image_url(self.resource('2')))
+        self.assertIn('/v2/', image_url(self.resource('2')))
+
+    def test_empty_and_transformed_images(self):
+        self.assertIsNone(image_url(None))
+        resized = self.resource(url_options={'width': 200, 'crop': 'fill'})
+        self.assertEqual(image_url(resized), resized.url)
+        self.assertEqual(image_url_cache_info().currsize, 0)
+
+
+class ImageVariantTests(CatalogTestMixin, TestCase):
+    def test_cloudinary_variants_are_transformations(self):
+        variants = self.client.get(f'/api/products/{self.product.id}/').data['image_variants']
+        self.assertEqual([v['width'] for v in variants], [320, 640, 960, 1280])
+        self.assertIn('/image/upload/c_limit,f_auto,q_auto,w_320/v1/products/shirt', variants[0]['url'])
+
+    @override_settings(IMAGE_VARIANTS={'widths': [200, 100], 'format': 'webp', 'quality': 70})
+    def test_profile_is_configurable(self):
+        variants = image_variants(Product.objects.get(pk=self.product.pk).image)
+        self.assertEqual([v['width'] for v in variants], [100, 200])
+        self.assertIn('c_limit,q_70,w_100/v1/products/shirt.webp', variants[0]['url'])
+
+
+LOCAL_VARIANTS = {'widths': [320, 1280], 'format': 'auto', 'quality': 'auto', 'backend': 'local'}
+
+
+class LocalImagePipelineTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root, MEDIA_URL='/media/', IMAGE_VARIANTS=LOCAL_VARIANTS,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(clear_manifest_cache)
+        Image.new('RGB', (800, 400), 'navy').save(f'{self.media_root}/belt.png')
+        Accessory.objects.filter(pk=self.accessory.pk).update(image='belt.png')
+
+    def build(self, *args):
+        out = StringIO()
+        call_command('build_image_variants', '--workers', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def variants(self):
+        return self.client.get(f'/api/accessories/{self.accessory.id}/').data['image_variants']
+
+    def test_renders_variants_the_serializers_read_from_the_manifest(self):
+        self.assertEqual(self.variants(), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertIn('Rendered 1 images', self.build())
+
+        # The manifest write bumped the catalog version, so no stale cached response
+        variants = self.variants()
+        # 1280 is wider than the 800px original, so it is skipped, not upscaled
+        self.assertEqual([v['width'] for v in variants], [320])
+        self.assertRegex(variants[0]['url'], r'^/media/variants/belt\.[0-9a-f]{12}_w320\.webp$')
+        with Image.open(self.media_root + variants[0]['url'].removeprefix('/media')) as small:
+            self.assertEqual(small.size, (320, 160))
+
+    @override_settings(IMAGE_VARIANTS={**LOCAL_VARIANTS, 'widths': [320, 320, 640, 1280]})
+    def test_variant_widths_are_the_rendered_widths(self):
+        Image.new('RGB', (1000, 300), 'navy').save(f'{self.media_root}/belt.png')
+        self.build()
+        variants = load_manifest()['belt.png']['variants']
+        self.assertEqual([v['width'] for v in variants], [320, 640])
+        for variant in variants:
+            with Image.open(Path(self.media_root, variant['name'])) as copy:
+                self.assertEqual(copy.width, variant['width'])
+
+    def test_runs_are_incremental_by_content_hash(self):
+        self.build()
+        manifest = load_manifest()['belt.png']
+        self.assertIn('0 images, 1 unchanged', self.build())
+
+        Image.new('RGB', (640, 640), 'gold').save(f'{self.media_root}/belt.png')
+        self.assertIn('Rendered 1 images', self.build())
+        clear_manifest_cache()
+        updated = load_manifest()['belt.png']
+        self.assertNotEqual(updated['hash'], manifest['hash'])
+        # The previous content's variants are cleaned up
+        self.assertFalse(Path(self.media_root, manifest['variants'][0]['name']).exists())
+
+        Path(self.media_root, 'belt.png').unlink()
+        self.assertIn('1 removed', self.build())
+        clear_manifest_cache()
+        self.assertEqual(load_manifest(), {})
+
+    def test_a_corrupt_file_does_not_stop_the_run(self):
+        Path(self.media_root, 'broken.jpg').write_bytes(b'not an image')
+        out, err = StringIO(), StringIO()
+        call_command('build_image_variants', '--workers', '2', stdout=out, stderr=err)
+        self.assertIn('Rendered 1 images, 0 unchanged, 0 removed, 1 failed', out.getvalue())
+        self.assertIn('broken.jpg: UnidentifiedImageError', err.getvalue())
+        clear_manifest_cache()
+        self.assertEqual(list(load_manifest()), ['belt.png'])
+
+
+class UploadHookTests(TransactionTestCase):
+    """The hook records results from a background thread, so it needs real commits."""
+
+    def setUp(self):
+        if not cloudinary.config().cloud_name:
+            cloudinary.config(cloud_name='polo-test')
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root, MEDIA_URL='/media/', IMAGE_VARIANTS=LOCAL_VARIANTS,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(clear_manifest_cache)
+
+    def test_upload_hook_optimizes_in_the_background(self):
+        Image.new('RGB', (500, 500), 'white').save(f'{self.media_root}/tie.png')
+        Accessory.objects.create(name='Tie', category='tie', price=Decimal('99.00'), image='tie.png')
+        wait_for_pending()
+        self.assertEqual([v['width'] for v in load_manifest()['tie.png']['variants']], [320])
+        # A flat name could be any item's, so every collection is bumped
+        self.assertEqual(CatalogVersion.objects.get(name='products').version, 1)
+
+
+class ContentAddressedMediaTests(CatalogTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_URL='/media/')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def write(self, name, data):
+        path = Path(self.media_root, name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    def test_identical_uploads_share_one_blob(self):
+        storage = ContentAddressedStorage()
+        first = storage.save('products/shirt.JPEG', ContentFile(b'same bytes'))
+        second = storage.save('accessories/belt.jpeg', ContentFile(b'same bytes'))
+        third = storage.save('products/shirt.jpeg', ContentFile(b'other bytes'))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, third)
+        self.assertRegex(first, r'^blobs/[0-9a-f]{2}/[0-9a-f]{64}\.jpeg$')
+        self.assertEqual(len(list(Path(self.media_root, 'blobs').rglob('*.jpeg'))), 2)
+
+        storage.delete(first)  # still referenced elsewhere
+        self.assertTrue(storage.exists(first))
+
+    @override_settings(IMAGE_VARIANTS={**LOCAL_VARIANTS, 'backend': 'cloudinary'})
+    def test_dedupe_command_refuses_cloudinary_rows(self):
+        self.write('products/shirt.png', b'shirt')
+        Product.objects.filter(pk=self.product.pk).update(image='products/shirt.png')
+        out = StringIO()
+        call_command('dedupe_media', '--dry-run', stdout=out)
+        self.assertIn('1 files, 1 distinct', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('dedupe_media', stdout=StringIO())
+        self.assertEqual(source_name(Product.objects.get(pk=self.product.pk).image), 'products/shirt.png')
+        self.assertTrue(Path(self.media_root, 'products/shirt.png').exists())
+
+    @override_settings(IMAGE_VARIANTS=LOCAL_VARIANTS)
+    def test_dedupe_command_merges_files_and_rewrites_rows(self):
+        self.write('accessories/belt.png', b'belt')
+        self.write('accessories/belt_KOmPxBp.png', b'belt')
+        self.write('products/shirt.png', b'shirt')
+        Accessory.objects.filter(pk=self.accessory.pk).update(image='accessories/belt_KOmPxBp.png')
+        Product.objects.filter(pk=self.product.pk).update(image='products/shirt.png')
+        other = Accessory.objects.create(
+            name='Belt 2', category='belt', price=Decimal('10.00'), image='accessories/belt.png',
+        )
+
+        out = StringIO()
+        call_command('dedupe_media', '--dry-run', stdout=out)
+        self.assertIn('3 files, 2 distinct; 1 duplicates', out.getvalue())
+        self.assertTrue(Path(self.media_root, 'accessories/belt_KOmPxBp.png').exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('dedupe_media', '--prune', stdout=StringIO())
+        belt = Accessory.objects.get(pk=self.accessory.pk).image
+        self.assertEqual(source_name(Accessory.objects.get(pk=other.pk).image), source_name(belt))
+        self.assertTrue(source_name(belt).startswith('blobs/'))
+        self.assertTrue(Path(self.media_root, source_name(belt)).exists())
+        self.assertEqual(list(Path(self.media_root, 'accessories').iterdir()), [])
+        self.assertEqual(len(list(Path(self.media_root, 'blobs').rglob('*.png'))), 2)
+
+    @override_settings(IMAGE_VARIANTS=LOCAL_VARIANTS)
+    def test_dedupe_command_moves_the_variant_manifest(self):
+        self.addCleanup(clear_manifest_cache)
+        for name in ('accessories/belt.png', 'accessories/belt_KOmPxBp.png'):
+            Path(self.media_root, name).parent.mkdir(parents=True, exist_ok=True)
+            Image.new('RGB', (800, 400), 'navy').save(Path(self.media_root, name))
+        Accessory.objects.filter(pk=self.accessory.pk).update(image='accessories/belt_KOmPxBp.png')
+        call_command('build_image_variants', '--workers', '2', stdout=StringIO())
+        self.assertEqual(len(list(Path(self.media_root, 'variants').rglob('*.webp'))), 2)
+
+        call_command('dedupe_media', stdout=StringIO())
+        clear_manifest_cache()
+        image = Accessory.objects.get(pk=self.accessory.pk).image
+        belt = source_name(image)
+        self.assertEqual(list(load_manifest()), [belt])
+        # The duplicate's variants went with it; the kept ones are still served
+        variants = list(Path(self.media_root, 'variants').rglob('*.webp'))
+        self.assertEqual([v.relative_to(self.media_root).as_posix() for v in variants],
+                         [v['name'] for v in load_manifest()[belt]['variants']])
+        self.assertEqual(len(image_variants(image)), 1)
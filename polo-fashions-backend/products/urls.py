@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProductViewSet, FabricViewSet, RentalItemViewSet, AccessoryViewSet, InnerwearViewSet
+from .views import ProductViewSet, FabricViewSet, RentalItemViewSet, AccessoryViewSet, InnerwearViewSet, CatalogView, catalog_cache_stats, catalog_search, item_stock
 
 
 router = DefaultRouter()
@@ -12,5 +12,9 @@ router.register(r"innerwear", InnerwearViewSet)
 
 
 urlpatterns = [
+    path('catalog/', CatalogView.as_view(), name='catalog'),
+    path('search/', catalog_search, name='catalog-search'),
+    path('catalog/cache-stats/', catalog_cache_stats, name='catalog-cache-stats'),
+    path('stock/<str:collection>/<int:pk>/', item_stock, name='item-stock'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
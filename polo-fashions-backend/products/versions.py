@@ -0,0 +1,67 @@
+# products/versions.py
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CatalogVersion
+
+# Collection name per catalog model (gallery images count as their parent)
+PRODUCTS = 'products'
+FABRICS = 'fabrics'
+RENTALS = 'rentals'
+ACCESSORIES = 'accessories'
+INNERWEAR = 'innerwear'
+
+COLLECTIONS = (PRODUCTS, FABRICS, RENTALS, ACCESSORIES, INNERWEAR)
+
+# Versions are cached so warm catalog reads need no query at all. The entry
+# is dropped when a bump commits; the TTL bounds how long a reader racing
+# that commit can keep an old version around.
+VERSION_CACHE_TIMEOUT = 30
+
+
+def _version_cache_key(name):
+    return f'catalog-version:{name}'
+
+
+def bump_catalog_version(name):
+    """Mark a catalog collection as changed."""
+    transaction.on_commit(lambda: cache.delete(_version_cache_key(name)))
+    bumped = CatalogVersion.objects.filter(name=name).update(
+        version=F('version') + 1, updated_at=timezone.now()
+    )
+    if bumped:
+        return
+    try:
+        with transaction.atomic():
+            CatalogVersion.objects.create(name=name, version=1)
+    except IntegrityError:
+        bump_catalog_version(name)
+
+
+def catalog_version(name):
+    """``(version, updated_at)`` for a collection; ``(0, None)`` if never changed."""
+    key = _version_cache_key(name)
+    row = cache.get(key)
+    if row is None:
+        row = CatalogVersion.objects.filter(name=name).values_list('version', 'updated_at').first()
+        row = row or (0, None)
+        cache.set(key, row, VERSION_CACHE_TIMEOUT)
+    return row
+
+
+def catalog_versions(names=COLLECTIONS):
+    """``catalog_version`` for several collections with one cache round trip."""
+    keys = {name: _version_cache_key(name) for name in names}
+    cached = cache.get_many(keys.values())
+    missing = [name for name, key in keys.items() if key not in cached]
+    if missing:
+        rows = CatalogVersion.objects.filter(name__in=missing).values_list(
+            'name', 'version', 'updated_at'
+        )
+        rows = {name: (version, updated_at) for name, version, updated_at in rows}
+        fresh = {keys[name]: rows.get(name, (0, None)) for name in missing}
+        cache.set_many(fresh, VERSION_CACHE_TIMEOUT)
+        cached.update(fresh)
+    return {name: cached[key] for name, key in keys.items()}
@@ -1,31 +1,188 @@
 from django.shortcuts import render
 
 # Create your views here.
-from rest_framework import viewsets
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
-from .models import Product, Fabric,RentalItem, Accessory, Innerwear
+from rest_framework import status, viewsets
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from polo_fashions.conditional import ConditionalGetMixin
+from .cache import CatalogCacheMixin, cache_stats
+from .facets import FacetedListMixin
+from .catalog import SECTIONS, catalog_snapshot, catalog_version, product_queryset, rental_queryset
+from .models import Fabric, Accessory, Innerwear
 from .serializers import ProductSerializer, FabricSerializer , RentalItemSerializer, AccessorySerializer, InnerwearSerializer
+from . import versions
+from .search import MODEL_BY_COLLECTION, search_catalog
+from .stock import STOCKED_COLLECTIONS, set_stock, stock_levels
 
 
-class ProductViewSet(viewsets.ModelViewSet):
-    queryset = Product.objects.filter(is_active=True)
+class CatalogViewMixin(ConditionalGetMixin, CatalogCacheMixin, FacetedListMixin):
+    """
+    ETags and cached responses keyed on the collection's CatalogVersion.
+    Warm reads (200 or 304) run no queries and no serializer. Lists take
+    the facet filters from products.facets.
+    """
+    catalog_collection = None
+
+    def get_version(self):
+        return versions.catalog_version(self.catalog_collection)
+
+
+class ProductViewSet(CatalogViewMixin, viewsets.ModelViewSet):
+    queryset = product_queryset()
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    catalog_collection = versions.PRODUCTS
 
-class RentalItemViewSet(viewsets.ModelViewSet):
-    queryset = RentalItem.objects.filter(is_active=True)
+class RentalItemViewSet(CatalogViewMixin, viewsets.ModelViewSet):
+    queryset = rental_queryset()
     serializer_class = RentalItemSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-class AccessoryViewSet(viewsets.ModelViewSet):
+    catalog_collection = versions.RENTALS
+class AccessoryViewSet(CatalogViewMixin, viewsets.ModelViewSet):
     queryset = Accessory.objects.filter(is_active=True)
     serializer_class = AccessorySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-class InnerwearViewSet(viewsets.ModelViewSet):
+    catalog_collection = versions.ACCESSORIES
+class InnerwearViewSet(CatalogViewMixin, viewsets.ModelViewSet):
     queryset = Innerwear.objects.filter(is_active=True)
     serializer_class = InnerwearSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    catalog_collection = versions.INNERWEAR
 
-class FabricViewSet(viewsets.ModelViewSet):
+class FabricViewSet(CatalogViewMixin, viewsets.ModelViewSet):
     queryset = Fabric.objects.filter(is_active=True)
     serializer_class = FabricSerializer
-    permission_classes = [IsAuthenticatedOrReadOnly]
\ No newline at end of file
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    catalog_collection = versions.FABRICS
+
+
+class CatalogView(ConditionalGetMixin, APIView):
+    """
+    Every active catalog item in one response:
+    ``{"products": [...], "fabrics": [...], "rentals": [...], ...}``.
+    ``?include=products,fabrics`` limits the sections returned.
+    """
+    permission_classes = [AllowAny]
+    _version = None
+
+    def get_version(self):
+        # Read once per request so the ETag and the body agree
+        if self._version is None:
+            self._version = catalog_version()
+        return self._version
+
+    def get(self, request):
+        include = request.query_params.get('include')
+        if include:
+            sections = [name.strip() for name in include.split(',') if name.strip()]
+            unknown = [name for name in sections if name not in SECTIONS]
+            if unknown:
+                return Response(
+                    {"error": f"Unknown catalog section(s): {', '.join(unknown)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            sections = list(SECTIONS)
+        return self._conditional_response(self._snapshot_response, request, sections)
+
+    def _snapshot_response(self, request, sections):
+        token, _ = self.get_version()
+        snapshot, outcome = catalog_snapshot(token)
+        response = Response({name: snapshot[name] for name in sections})
+        response['X-Cache'] = 'MISS' if outcome == 'miss' else 'HIT'
+        return response
+
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 50
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def catalog_search(request):
+    """
+    Relevance-ranked search across every catalog collection.
+    ``?q=`` is required; ``?limit=`` defaults to 20 (max 50).
+    """
+    q = request.query_params.get('q', '').strip()
+    if not q:
+        return Response(
+            {"error": "q is required"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        limit = int(request.query_params.get('limit', SEARCH_DEFAULT_LIMIT))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= SEARCH_MAX_LIMIT:
+        return Response(
+            {"error": f"limit must be between 1 and {SEARCH_MAX_LIMIT}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    hits = search_catalog(q, limit)
+
+    # One query per collection that has hits (plus its gallery, if any)
+    wanted = {}
+    for collection, object_id, _ in hits:
+        wanted.setdefault(collection, []).append(object_id)
+    items = {}
+    for collection, ids in wanted.items():
+        queryset, serializer = SECTIONS[collection]
+        for obj in queryset().filter(pk__in=ids):
+            items[collection, obj.pk] = serializer(obj).data
+
+    results = [
+        {"collection": collection, "score": round(score, 4), "item": items[collection, object_id]}
+        for collection, object_id, score in hits
+        if (collection, object_id) in items
+    ]
+    return Response({"query": q, "count": len(results), "results": results})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def catalog_cache_stats(request):
+    if not request.user.role == "admin":
+        return Response(
+            {"error": "Only admin can view cache stats"},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    return Response(cache_stats())
+
+
+@api_view(['GET', 'PUT'])
+@permission_classes([IsAuthenticatedOrReadOnly])
+def item_stock(request, collection, pk):
+    """
+    Units on hand per size of one item; ``{}`` when it is not stock-tracked.
+    Admins PUT ``{"size": "M", "quantity": 12}`` to set a count (``size``
+    is omitted for items without sizes).
+    """
+    model = MODEL_BY_COLLECTION.get(collection)
+    if model not in STOCKED_COLLECTIONS:
+        return Response(
+            {"error": f"{collection} is not stock-tracked"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    item = model.objects.filter(pk=pk).first()
+    if item is None:
+        return Response({"error": "Item not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'PUT':
+        if not request.user.role == "admin":
+            return Response(
+                {"error": "Only admin can update stock"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        quantity = request.data.get("quantity")
+        if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 0:
+            return Response(
+                {"error": "quantity must be a whole number of at least 0"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        set_stock(item, quantity, request.data.get("size") or '')
+
+    return Response({"collection": collection, "id": item.pk, "stock": stock_levels(item)})
@@ -1,9 +1,13 @@
 import React from "react";
 import { Card, Badge, Carousel, Typography, Space } from "antd";
+import { getImageSrcSet } from "../utils/imageUtils";
 
 
 const { Title, Text } = Typography;
 
+// Cards are one column on phones and up to four across on desktop
+const CARD_IMAGE_SIZES = "(max-width: 576px) 100vw, (max-width: 992px) 50vw, 25vw";
+
 export default function ProductCard({ product, onClick }) {
   return (
     <Card
@@ -21,6 +25,8 @@ export default function ProductCard({ product, onClick }) {
               <div key={img.id}>
                 <img
                   src={img.image}
+                  srcSet={getImageSrcSet(img.image_variants)}
+                  sizes={CARD_IMAGE_SIZES}
                   alt="product"
                   style={{
                     height: 220,
@@ -34,6 +40,8 @@ export default function ProductCard({ product, onClick }) {
             <div>
               <img
                 src={product.image}
+                srcSet={getImageSrcSet(product.image_variants)}
+                sizes={CARD_IMAGE_SIZES}
                 alt="product"
                 style={{
                   height: 220,
@@ -1,4 +1,4 @@
-import React, { useState } from "react";
+import React, { useState, useEffect } from "react";
 import {
   Modal,
   Button,
@@ -16,15 +16,10 @@ import {
 import { ShoppingOutlined } from "@ant-design/icons";
 import { useNavigate } from "react-router-dom";
 import ProductImageGallery from "../ProductImageGallery";
+import { ordersAPI } from "../../services/api";
 
 const { Text, Paragraph, Title } = Typography;
 
-const STITCHING_CHARGES = {
-  shirt: 350,
-  pant: 450,
-  kurta: 400,
-};
-
 const DEFAULT_METERS = {
   shirt: 2.3,
   pant: 1.6,
@@ -46,6 +41,21 @@ export default function FabricModal({
   const [orderError, setOrderError] = useState("");
   const [orderSuccess, setOrderSuccess] = useState("");
   const [placing, setPlacing] = useState(false);
+  const [stitchingCharges, setStitchingCharges] = useState({});
+
+  // ✅ Charges come from the server, the same ones it prices orders with
+  useEffect(() => {
+    let active = true;
+    ordersAPI
+      .getConfig()
+      .then((config) => {
+        if (active) setStitchingCharges(config.stitching_charges);
+      })
+      .catch((error) => console.error("🔴 Stitching charges error:", error));
+    return () => {
+      active = false;
+    };
+  }, []);
 
   const measurementDone =
     (currentUser &&
@@ -70,7 +80,7 @@ export default function FabricModal({
 
   const calcStitchCharge = () => {
     if (!wantStitching || !stitchType) return 0;
-    return STITCHING_CHARGES[stitchType] || 0;
+    return Number(stitchingCharges[stitchType] || 0);
   };
 
   const calcTotal = () =>
@@ -239,7 +249,7 @@ export default function FabricModal({
             {/* ✅ Stitch Type Tags - Mobile Wrap */}
             {wantStitching && (
               <Space wrap style={{ marginBottom: 16 }}>
-                {Object.keys(STITCHING_CHARGES).map((type) => (
+                {Object.keys(stitchingCharges).map((type) => (
                   <Tag.CheckableTag
                     key={type}
                     checked={stitchType === type}
@@ -250,7 +260,7 @@ export default function FabricModal({
                       borderRadius: 6,
                     }}
                   >
-                    {type.toUpperCase()} — ₹{STITCHING_CHARGES[type]}
+                    {type.toUpperCase()} — ₹{Number(stitchingCharges[type])}
                   </Tag.CheckableTag>
                 ))}
               </Space>
@@ -1,4 +1,4 @@
-import React, { useState } from "react";
+import React, { useState, useEffect } from "react";
 import {
   Modal,
   Button,
@@ -16,15 +16,10 @@ import {
 import { ShoppingOutlined } from "@ant-design/icons";
 import { useNavigate } from "react-router-dom";
 import ProductImageGallery from "../ProductImageGallery";
+import { ordersAPI } from "../../services/api";
 
 const { Title, Text, Paragraph } = Typography;
 
-const STITCHING_CHARGES = {
-  shirt: 350,
-  dhoti: 300,
-  both: 550,
-};
-
 export default function TraditionalModal({
   show,
   onHide,
@@ -40,10 +35,25 @@ export default function TraditionalModal({
   const [orderError, setOrderError] = useState("");
   const [orderSuccess, setOrderSuccess] = useState("");
   const [placing, setPlacing] = useState(false);
+  const [stitchingCharges, setStitchingCharges] = useState({});
+
+  // ✅ Charges come from the server, the same ones it prices orders with
+  useEffect(() => {
+    let active = true;
+    ordersAPI
+      .getConfig()
+      .then((config) => {
+        if (active) setStitchingCharges(config.traditional_stitching_charges);
+      })
+      .catch((error) => console.error("🔴 Stitching charges error:", error));
+    return () => {
+      active = false;
+    };
+  }, []);
 
   const calcStitchCharge = () => {
     if (!wantStitching || !stitchType) return 0;
-    return STITCHING_CHARGES[stitchType] || 0;
+    return Number(stitchingCharges[stitchType] || 0);
   };
 
   const handlePlaceOrder = async () => {
@@ -246,11 +256,10 @@ export default function TraditionalModal({
                     onChange={setStitchType}
                     placeholder="Select"
                     size="large"
-                    options={[
-                      { label: "Shirt", value: "shirt" },
-                      { label: "Dhoti", value: "dhoti" },
-                      { label: "Both", value: "both" },
-                    ]}
+                    options={Object.keys(stitchingCharges).map((type) => ({
+                      label: type.charAt(0).toUpperCase() + type.slice(1),
+                      value: type,
+                    }))}
                   />
                 </div>
 
@@ -1,4 +1,4 @@
-import React, { createContext, useState, useContext, useEffect } from "react";
+import React, { createContext, useState, useContext, useEffect, useRef, useCallback } from "react";
 import { authAPI, bookingsAPI, ordersAPI } from "../services/api";
 
 /* eslint-disable react-refresh/only-export-components */
@@ -10,14 +10,54 @@ export function AuthProvider({ children }) {
   const [bookings, setBookings] = useState([]);
   const [orders, setOrders] = useState([]);
   const [authLoading, setAuthLoading] = useState(true);
-  const refreshOrders = async () => {
+  // Delta-sync cursor from the last order fetch (see syncOrders)
+  const ordersCursor = useRef(null);
+
+  const refreshOrders = useCallback(async () => {
     try {
-      const ordersData = await ordersAPI.getAll();
+      const { orders: ordersData, cursor } = await ordersAPI.getAllWithCursor();
+      ordersCursor.current = cursor;
       setOrders(ordersData);
     } catch (error) {
       console.error("Failed to refresh orders:", error);
     }
-  };
+  }, []);
+
+  // Fetch only the orders changed (or deleted) since the last fetch
+  const syncOrders = useCallback(async () => {
+    if (!ordersCursor.current) return refreshOrders();
+    try {
+      const { results, deleted, cursor } = await ordersAPI.changesSince(ordersCursor.current);
+      ordersCursor.current = cursor;
+      if (!results.length && !deleted.length) return;
+      setOrders((prev) => {
+        const changed = new Map(results.map((o) => [o.id, o]));
+        const gone = new Set(deleted);
+        const known = new Set(prev.map((o) => o.id));
+        const added = results.filter((o) => !known.has(o.id) && !gone.has(o.id));
+        return [
+          ...added,
+          ...prev.filter((o) => !gone.has(o.id)).map((o) => changed.get(o.id) || o),
+        ];
+      });
+    } catch (error) {
+      if (error.response?.status === 410) return refreshOrders(); // cursor too old
+      console.error("Failed to sync orders:", error);
+    }
+  }, [refreshOrders]);
+
+  // Views showing order status call this (through useLiveOrders) while mounted
+  const watchOrders = useCallback(
+    () =>
+      ordersAPI.subscribeToStatusEvents((event) => {
+        setOrders((prev) =>
+          prev.map((o) =>
+            o.id === event.order_id ? { ...o, status: event.new_status } : o
+          )
+        );
+      }, syncOrders),
+    [syncOrders]
+  );
 
   // ========================================
   // Initialize user from token on refresh
@@ -71,12 +111,7 @@ export function AuthProvider({ children }) {
           console.error("Failed to load bookings:", error);
         }
 
-        try {
-          const ordersData = await ordersAPI.getAll();
-          setOrders(ordersData);
-        } catch (error) {
-          console.error("Failed to load orders:", error);
-        }
+        await refreshOrders();
 
         return;
       }
@@ -91,18 +126,13 @@ export function AuthProvider({ children }) {
         console.error("Failed to load bookings:", error);
       }
 
-      try {
-        const ordersData = await ordersAPI.getAll();
-        setOrders(ordersData);
-      } catch (error) {
-        console.error("Failed to load orders:", error);
-      }
+      await refreshOrders();
     };
 
     if (!authLoading) {
       fetchData();
     }
-  }, [currentUser, authLoading]);
+  }, [currentUser, authLoading, refreshOrders]);
 
   // ========================================
   // LOGIN
@@ -171,6 +201,7 @@ export function AuthProvider({ children }) {
     setUsers([]);
     setBookings([]);
     setOrders([]);
+    ordersCursor.current = null;
     localStorage.removeItem("access_token");
     localStorage.removeItem("refresh_token");
   };
@@ -187,7 +218,10 @@ export function AuthProvider({ children }) {
       console.error("Failed to create booking:", error);
       return {
         success: false,
-        message: error.response?.data?.detail || "Failed to create booking",
+        message:
+          error.response?.data?.error ||
+          error.response?.data?.detail ||
+          "Failed to create booking",
       };
     }
   };
@@ -280,6 +314,7 @@ export function AuthProvider({ children }) {
     updateUserMeasurement,
     addOrder,
     refreshOrders,
+    watchOrders,
     updateOrderStatus,
   };
 
@@ -293,3 +328,14 @@ export function useAuth() {
   }
   return context;
 }
+
+// Keep the orders in context up to date while the calling view is mounted:
+// pushed status events when the server streams them, otherwise a delta-sync
+// poll while the tab is visible
+export function useLiveOrders() {
+  const { currentUser, watchOrders } = useAuth();
+  useEffect(() => {
+    if (!currentUser) return undefined;
+    return watchOrders();
+  }, [currentUser, watchOrders]);
+}
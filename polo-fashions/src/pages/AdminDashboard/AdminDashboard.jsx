@@ -1,6 +1,6 @@
 import React, { useState } from "react";
 import { message, Table, Tabs, Card, Empty } from "antd";
-import { useAuth } from "../../context/AuthContext";
+import { useAuth, useLiveOrders } from "../../context/AuthContext";
 import { useNavigate } from "react-router-dom";
 
 import DashboardHeader from "./DashboardHeader";
@@ -30,6 +30,7 @@ export default function AdminDashboard() {
     updateUserMeasurement,
     updateOrderStatus,
   } = useAuth();
+  useLiveOrders();
 
   const navigate = useNavigate();
 
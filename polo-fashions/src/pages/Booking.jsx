@@ -1,4 +1,5 @@
 import React, { useState } from "react";
+import { bookingsAPI } from "../services/api";
 import {
   Row,
   Col,
@@ -32,11 +33,30 @@ export default function Booking() {
 
   const [form] = Form.useForm();
 
-  const timeSlots = [
+  const defaultSlots = [
     "10:00 AM", "11:00 AM", "12:00 PM",
     "2:00 PM", "3:00 PM", "4:00 PM",
     "5:00 PM", "6:00 PM", "7:00 PM",
-  ];
+  ].map((label) => ({ label, free: 1 }));
+
+  // ✅ Slots with their free seats for the picked day, from the server
+  const [timeSlots, setTimeSlots] = useState(defaultSlots);
+
+  const handleDateChange = async (date) => {
+    form.resetFields(["time"]);
+    if (!date) {
+      setTimeSlots(defaultSlots);
+      return;
+    }
+    const day = date.format("YYYY-MM-DD");
+    try {
+      const { days } = await bookingsAPI.availability(day, day);
+      setTimeSlots(days.length ? days[0].slots : []);
+    } catch (err) {
+      console.error("Failed to load slot availability:", err);
+      setTimeSlots(defaultSlots);
+    }
+  };
 
   const handleSubmit = async (values) => {
     setSuccess("");
@@ -70,6 +90,8 @@ export default function Booking() {
       setTimeout(() => {
         navigate("/dashboard");
       }, 2000);
+    } else {
+      setError(result.message);
     }
   };
 
@@ -170,6 +192,7 @@ export default function Booking() {
                 <DatePicker
                   style={{ width: "100%" }}
                   disabledDate={(d) => d.isBefore(dayjs(), "day")}
+                  onChange={handleDateChange}
                 />
               </Form.Item>
 
@@ -183,8 +206,12 @@ export default function Booking() {
                   suffixIcon={<ClockCircleOutlined />}
                 >
                   {timeSlots.map((slot) => (
-                    <Select.Option key={slot} value={slot}>
-                      {slot}
+                    <Select.Option
+                      key={slot.label}
+                      value={slot.label}
+                      disabled={slot.free < 1}
+                    >
+                      {slot.free < 1 ? `${slot.label} (full)` : slot.label}
                     </Select.Option>
                   ))}
                 </Select>
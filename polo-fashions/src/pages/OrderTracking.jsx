@@ -13,7 +13,7 @@ import {
 } from "antd";
 import { ArrowLeftOutlined, CheckCircleFilled } from "@ant-design/icons";
 import { useParams, useNavigate } from "react-router-dom";
-import { useAuth } from "../context/AuthContext";
+import { useAuth, useLiveOrders } from "../context/AuthContext";
 import { getOrderImage } from "../utils/imageUtils";
 import { ORDER_STATUS_CONFIG, normalizeStatus } from "../constants/orderStatus";
 import "../orderStatusAnimations.css";
@@ -46,6 +46,7 @@ const getCurrentStepIndex = (order) => {
 export default function OrderTracking() {
   const { id } = useParams();
   const { orders } = useAuth();
+  useLiveOrders();
   const navigate = useNavigate();
   const screens = useBreakpoint();
 
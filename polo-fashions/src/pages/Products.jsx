@@ -1,13 +1,7 @@
 import React, { useState, useEffect, useMemo } from "react";
 import { Tabs, Row, Col, Skeleton, Empty } from "antd";
 import { useAuth } from "../context/AuthContext";
-import {
-  productsAPI,
-  fabricsAPI,
-  rentalsAPI,
-  accessoriesAPI,
-  innerwearAPI,
-} from "../services/api";
+import { catalogAPI } from "../services/api";
 import ProductCard from "../components/ProductCard";
 
 // Product modals
@@ -29,19 +23,7 @@ export default function Products() {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const rentalData = await rentalsAPI.getAll();
-        const accessoryData = await accessoriesAPI.getAll();
-        const innerwearData = await innerwearAPI.getAll();
-        const productData = await productsAPI.getAll();
-        const fabricData = await fabricsAPI.getAll();
-
-        setProducts({
-          products: productData,
-          fabrics: fabricData,
-          rentals: rentalData,
-          accessories: accessoryData,
-          innerwear: innerwearData,
-        });
+        setProducts(await catalogAPI.getAll());
       } catch (error) {
         console.error("Failed to fetch products:", error);
       } finally {
@@ -22,7 +22,7 @@ import {
 } from "@ant-design/icons";
 
 import "./UserDashboard.css";
-import { useAuth } from "../context/AuthContext";
+import { useAuth, useLiveOrders } from "../context/AuthContext";
 import { Link, useNavigate } from "react-router-dom";
 import { getOrderImage } from "../utils/imageUtils";
 
@@ -35,6 +35,7 @@ import {
 export default function UserDashboard() {
   const navigate = useNavigate();
   const { currentUser, bookings = [], orders = [] } = useAuth();
+  useLiveOrders();
 
   const userBookings = bookings.filter((b) => b.user === currentUser?.id);
   const userOrders = orders.filter((o) => o.user === currentUser?.id);
@@ -2,6 +2,14 @@ import axios from 'axios';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://127.0.0.1:8000/api';
 
+// Order status refresh when the server doesn't stream live updates
+// (only while an order view is open and the tab is visible)
+const ORDER_POLL_INTERVAL = 30000;
+const ORDER_STREAM_RETRY = 5000;
+
+// GET /orders/config/ once per page load
+let orderConfig = null;
+
 // Create axios instance with base configuration
 const api = axios.create({
   baseURL: API_BASE_URL,
@@ -89,6 +97,11 @@ export const authAPI = {
 // ------------------- RENTALS -------------------
 export const rentalsAPI = {
   getAll: () => api.get("/rentals/").then(r => r.data),
+  // from/to: 'YYYY-MM-DD' (to = return day); items: array of ids (optional)
+  availability: (from, to, items, size) =>
+    api.get("/orders/rental-availability/", {
+      params: { from, to, items: items?.join(","), size },
+    }).then(r => r.data),
 };
 
 // ------------------- ACCESSORIES -------------------
@@ -122,6 +135,44 @@ export const fabricsAPI = {
   },
 };
 
+// Whole catalog in one request; `include` is an optional list of sections
+export const catalogAPI = {
+  getAll: async (include) => {
+    const params = include ? { include: include.join(',') } : undefined;
+    const response = await api.get('/catalog/', { params });
+    return response.data;
+  },
+
+  // One collection filtered by facets, e.g. filter("products", { category: "pant" });
+  // resolves to { results, facets }
+  filter: async (collection, filters) => {
+    const response = await api.get(`/${collection}/`, {
+      params: { ...filters, facets: true },
+    });
+    return response.data;
+  },
+};
+
+// Full-text search across the catalog, best match first
+export const searchAPI = {
+  search: async (q, limit) => {
+    const response = await api.get('/search/', { params: { q, limit } });
+    return response.data;
+  },
+};
+
+// Stock APIs (collection: products | rentals | accessories | innerwear)
+export const stockAPI = {
+  get: async (collection, id) => {
+    const response = await api.get(`/stock/${collection}/${id}/`);
+    return response.data;
+  },
+  set: async (collection, id, quantity, size) => {
+    const response = await api.put(`/stock/${collection}/${id}/`, { quantity, size });
+    return response.data;
+  },
+};
+
 // Bookings APIs
 export const bookingsAPI = {
   getAll: async () => {
@@ -139,6 +190,14 @@ export const bookingsAPI = {
     return response.data;
   },
 
+  // Free seats per slot for every day in [from, to] ('YYYY-MM-DD')
+  availability: async (from, to) => {
+    const response = await api.get('/bookings/availability/', {
+      params: { from, to },
+    });
+    return response.data;
+  },
+
   updateStatus: async (id, status) => {
     const response = await api.patch(
       `/bookings/${id}/`,
@@ -150,8 +209,49 @@ export const bookingsAPI = {
 
 // ================= ORDERS API (COMPREHENSIVE FIX) =================
 export const ordersAPI = {
-  getAll: async () => {
+  // params: { status, order_type, date_from, date_to, user, search }
+  getAll: async (params) => {
+    const response = await api.get('/orders/', { params });
+    return response.data;
+  },
+  // Full list plus the delta-sync cursor to pass to changesSince later
+  getAllWithCursor: async () => {
     const response = await api.get('/orders/');
+    return { orders: response.data, cursor: response.headers['x-sync-cursor'] };
+  },
+  // Only what changed: { results, deleted, cursor }; rejects with 410 when
+  // the cursor is too old (reload the full list then)
+  changesSince: async (cursor) => {
+    const response = await api.get('/orders/', { params: { changed_since: cursor } });
+    return response.data;
+  },
+  // { live_updates, stitching_charges, traditional_stitching_charges }: whether
+  // the server pushes status events, and the charges it prices stitching with
+  getConfig: () => {
+    if (!orderConfig) {
+      orderConfig = api.get('/orders/config/').then(r => r.data).catch((error) => {
+        orderConfig = null;
+        throw error;
+      });
+    }
+    return orderConfig;
+  },
+  getStats: async (days = 30) => {
+    const response = await api.get('/orders/stats/', { params: { days } });
+    return response.data;
+  },
+  // Server-side prices for a cart: lines like { product, quantity, meters, stitch_type, rental_days }
+  quote: async (lines) => {
+    const response = await api.post('/orders/quote/', { lines });
+    return response.data;
+  },
+  // Place a whole cart in one request; every line is ordered or none is (409 when sold out)
+  checkout: async (lines, totalPrice) => {
+    const payload = { lines };
+    if (totalPrice !== undefined) {
+      payload.total_price = totalPrice;
+    }
+    const response = await api.post('/orders/checkout/', payload);
     return response.data;
   },
     // ✅ ADD THIS METHOD
@@ -197,6 +297,11 @@ export const ordersAPI = {
       payload.rental_deposit = Number(orderData.rentalDeposit) || 0;
       payload.rental_price_per_day = Number(orderData.rentalPricePerDay) || 0;
 
+      // Optional booked dates; the server rejects clashing bookings (409)
+      if (orderData.rentalStart) {
+        payload.rental_start = orderData.rentalStart;
+      }
+
       if (orderData.size) {
         payload.size = orderData.size;
       }
@@ -286,6 +391,86 @@ export const ordersAPI = {
     );
     return response.data;
   },
+
+  // Live status changes over Server-Sent Events. When the server doesn't
+  // stream (WSGI deployments, see getConfig), onPoll is called every
+  // ORDER_POLL_INTERVAL ms while the tab is visible instead. Returns an
+  // unsubscribe function.
+  subscribeToStatusEvents: (onEvent, onPoll) => {
+    let source = null;
+    let timer = null;
+    let polling = false;
+    let closed = false;
+
+    const stopTimer = () => {
+      if (timer) clearInterval(timer);
+      timer = null;
+    };
+    const startTimer = () => {
+      if (!closed && polling && !timer && document.visibilityState === 'visible') {
+        timer = setInterval(onPoll, ORDER_POLL_INTERVAL);
+      }
+    };
+    const onVisibility = () => {
+      if (document.visibilityState === 'visible') {
+        onPoll(); // catch up on what changed while hidden
+        startTimer();
+      } else {
+        stopTimer();
+      }
+    };
+    const poll = () => {
+      if (closed || !onPoll || polling) return;
+      polling = true;
+      document.addEventListener('visibilitychange', onVisibility);
+      startTimer();
+    };
+
+    const connect = async () => {
+      try {
+        // Single-use ticket, so the access token never goes in a URL
+        const { data } = await api.post('/orders/events/ticket/');
+        if (closed) return;
+        source = new EventSource(
+          `${API_BASE_URL}/orders/events/?ticket=${encodeURIComponent(data.ticket)}`
+        );
+        source.addEventListener('order_status', (e) => onEvent(JSON.parse(e.data)));
+        source.onerror = () => {
+          // The ticket is spent, so reconnect with a fresh one
+          source.close();
+          if (!closed) setTimeout(connect, ORDER_STREAM_RETRY);
+        };
+      } catch {
+        poll();
+      }
+    };
+
+    ordersAPI.getConfig()
+      .then(({ live_updates }) => {
+        if (closed) return;
+        if (live_updates && typeof EventSource !== 'undefined') {
+          connect();
+        } else {
+          poll();
+        }
+      })
+      .catch(poll);
+
+    return () => {
+      closed = true;
+      if (source) source.close();
+      stopTimer();
+      document.removeEventListener('visibilitychange', onVisibility);
+    };
+  },
+
+  bulkUpdateStatus: async (orderIds, status) => {
+    const response = await api.post('/orders/bulk-update-status/', {
+      order_ids: orderIds,
+      status,
+    });
+    return response.data;
+  },
 };
 
 export default api;
\ No newline at end of file
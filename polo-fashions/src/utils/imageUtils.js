@@ -23,6 +23,18 @@ export const normalizeImageUrl = (url) => {
 };
 
 
+/**
+ * Builds an <img srcSet> value from the image_variants the catalog
+ * serializers return next to each image ([{ width, url }, ...]).
+ * Local-storage variants come back as /media/... paths.
+ */
+export const getImageSrcSet = (variants) => {
+  if (!variants?.length) return undefined;
+  return variants
+    .map(({ width, url }) => `${url.startsWith("http") ? url : BASE_URL + url} ${width}w`)
+    .join(", ");
+};
+
 /**
  * Gets the first available image from an order object
  * with proper priority handling
@@ -30,10 +42,13 @@ export const normalizeImageUrl = (url) => {
 export const getOrderImage = (order) => {
   if (!order) return "https://via.placeholder.com/120?text=No+Image";
 
-  let imageUrl = null;
+  // Order lists carry a snapshot of the item's primary image
+  let imageUrl = order.item_image || null;
 
   // Priority 1: Multi-image arrays
-  if (order.product_details?.images?.length > 0) {
+  if (imageUrl) {
+    // already resolved
+  } else if (order.product_details?.images?.length > 0) {
     imageUrl = order.product_details.images[0].image;
   } else if (order.rental_item_details?.images?.length > 0) {
     imageUrl = order.rental_item_details.images[0].image;